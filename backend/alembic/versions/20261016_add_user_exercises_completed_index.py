@@ -0,0 +1,41 @@
+"""Add (user_id, completed_at) index on user_exercises
+
+Revision ID: user_exercises_completed_idx
+Revises: db_opt_indexes
+Create Date: 2026-10-16
+
+Progress statistics (period filters), the recent performance trend and
+progress exports all select one user's completions within a completed_at
+window, grouping by day. The existing (user_id, created_at) index does not
+cover completed_at, so those queries scan every row the user has.
+
+Progress history itself reads progress_snapshots, which is already indexed
+on (user_id, snapshot_date).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'user_exercises_completed_idx'
+down_revision = 'db_opt_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add composite index for completion-window progress queries."""
+    # Query: SELECT date(completed_at), ... FROM user_exercises
+    #        WHERE user_id = X AND completed_at >= Y GROUP BY date(completed_at)
+    op.create_index(
+        'idx_user_exercises_user_completed',
+        'user_exercises',
+        ['user_id', 'completed_at'],
+        unique=False,
+        comment='Composite index for progress statistics, trends and exports'
+    )
+
+
+def downgrade() -> None:
+    """Remove the completion-window index."""
+    op.drop_index('idx_user_exercises_user_completed', table_name='user_exercises')
@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from src.logging_config import get_logger
-from src.middleware.error_handler import APIError
+from src.middleware.error_handler import APIError, validation_error_details
 from src.middleware.auth_middleware import require_auth, get_current_user_id
 from src.middleware.rate_limiter import rate_limit
 from src.middleware.csrf_protection import inject_csrf_token_on_login, clear_csrf_token_on_logout, csrf_protect
@@ -131,6 +131,7 @@ async def register() -> Dict[str, Any]:
         raise APIError(
             f"Validation error: {'; '.join(error_messages)}",
             status_code=400,
+            details=validation_error_details(validation_error),
         )
 
     # Extract validated fields
@@ -239,6 +240,7 @@ async def login() -> Dict[str, Any]:
         raise APIError(
             f"Validation error: {'; '.join(error_messages)}",
             status_code=400,
+            details=validation_error_details(validation_error),
         )
 
     email = validated_data.email.lower()
@@ -774,6 +776,7 @@ async def request_password_reset() -> Dict[str, Any]:
         raise APIError(
             f"Validation error: {'; '.join(error_messages)}",
             status_code=400,
+            details=validation_error_details(validation_error),
         )
 
     email = validated_data.email.lower()
@@ -839,6 +842,7 @@ async def resend_verification_email() -> Dict[str, Any]:
         raise APIError(
             f"Validation error: {'; '.join(error_messages)}",
             status_code=400,
+            details=validation_error_details(validation_error),
         )
 
     email = validated_data.email.lower()
@@ -919,6 +923,7 @@ async def confirm_password_reset() -> Dict[str, Any]:
         raise APIError(
             f"Validation error: {'; '.join(error_messages)}",
             status_code=400,
+            details=validation_error_details(validation_error),
         )
 
     token = validated_data.token
@@ -7,7 +7,7 @@ from typing import Dict, Any, Optional
 from sqlalchemy import select, desc
 from datetime import datetime
 from src.logging_config import get_logger
-from src.middleware.error_handler import APIError
+from src.middleware.error_handler import APIError, validation_error_details
 from src.middleware.auth_middleware import require_auth, require_verified_email, get_current_user_id
 from src.middleware.rate_limiter import llm_rate_limit
 from src.middleware.csrf_protection import csrf_protect
@@ -15,6 +15,7 @@ from src.models.conversation import Conversation, Message, MessageRole
 from src.models.user import User
 from src.models.user_memory import UserMemory
 from src.services.llm.base_provider import Message as LLMMessage
+from src.services.llm.cost_tracker import daily_cost_limit_for_role
 from src.services.llm.prompt_templates import PromptTemplateManager, PromptType
 from src.utils.database import get_async_db_session as get_session
 from src.schemas.chat import SendMessageRequest
@@ -63,6 +64,7 @@ async def send_message() -> Dict[str, Any]:
             raise APIError(
                 f"Validation error: {'; '.join(error_messages)}",
                 status_code=400,
+                details=validation_error_details(validation_error),
             )
 
         user_message = validated_data.message  # Already sanitized by schema
@@ -157,7 +159,8 @@ async def send_message() -> Dict[str, Any]:
                 user_id=str(user_id),
                 system_prompt=system_prompt,
                 use_cache=True,
-                trim_context=True
+                trim_context=True,
+                daily_cost_limit=daily_cost_limit_for_role(user.role)
             )
 
             # Store user message
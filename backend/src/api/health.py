@@ -2,16 +2,44 @@
 Health check API endpoints.
 Provides health and readiness checks for monitoring and load balancing.
 """
-from quart import Blueprint, jsonify
-from typing import Dict, Any
+import orjson
+from quart import Blueprint, Response
 from src.logging_config import get_logger
 
 logger = get_logger(__name__)
 health_bp = Blueprint("health", __name__)
 
+# Probe responses are constant, so their JSON bodies are serialized once
+# at import rather than on every probe
+HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "checks": {
+        "database": "not_implemented",
+        "redis": "not_implemented",
+        "llm_service": "not_implemented"
+    }
+})
+
+READINESS_BODY = orjson.dumps({
+    "status": "ready",
+    "dependencies": {
+        "database": "not_checked",
+        "redis": "not_checked"
+    }
+})
+
+LIVENESS_BODY = orjson.dumps({
+    "status": "alive"
+})
+
+
+def _json_response(body: bytes) -> Response:
+    """Wrap pre-serialized JSON bytes in a response."""
+    return Response(body, content_type="application/json")
+
 
 @health_bp.route("/", methods=["GET"])
-async def health_check() -> Dict[str, Any]:
+async def health_check() -> Response:
     """
     Health check endpoint.
 
@@ -22,18 +50,11 @@ async def health_check() -> Dict[str, Any]:
     # TODO: Add Redis connection check
     # TODO: Add external service checks (LLM, GitHub, etc.)
 
-    return jsonify({
-        "status": "healthy",
-        "checks": {
-            "database": "not_implemented",
-            "redis": "not_implemented",
-            "llm_service": "not_implemented"
-        }
-    })
+    return _json_response(HEALTH_BODY)
 
 
 @health_bp.route("/ready", methods=["GET"])
-async def readiness_check() -> Dict[str, Any]:
+async def readiness_check() -> Response:
     """
     Readiness check endpoint for load balancers.
 
@@ -42,23 +63,15 @@ async def readiness_check() -> Dict[str, Any]:
     """
     # TODO: Verify all dependencies are ready
 
-    return jsonify({
-        "status": "ready",
-        "dependencies": {
-            "database": "not_checked",
-            "redis": "not_checked"
-        }
-    })
+    return _json_response(READINESS_BODY)
 
 
 @health_bp.route("/live", methods=["GET"])
-async def liveness_check() -> Dict[str, Any]:
+async def liveness_check() -> Response:
     """
     Liveness check endpoint for Kubernetes.
 
     Returns:
         JSON response confirming service is alive
     """
-    return jsonify({
-        "status": "alive"
-    })
+    return _json_response(LIVENESS_BODY)
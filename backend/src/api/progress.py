@@ -2,8 +2,9 @@
 Progress tracking and achievement API endpoints.
 Handles user progress metrics, achievements, streaks, and statistics.
 """
+from datetime import date
 from quart import Blueprint, request, jsonify, Response
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, List
 from src.logging_config import get_logger
 from src.middleware.error_handler import APIError
 from src.middleware.auth_middleware import require_auth, get_current_user_id
@@ -190,12 +191,10 @@ async def get_progress_history() -> Dict[str, Any]:
         end_date = None
 
         if start_date_str:
-            from datetime import datetime
-            start_date = datetime.fromisoformat(start_date_str).date()
+            start_date = date.fromisoformat(start_date_str)
 
         if end_date_str:
-            from datetime import datetime
-            end_date = datetime.fromisoformat(end_date_str).date()
+            end_date = date.fromisoformat(end_date_str)
 
         async with get_session() as session:
             service = ProgressService(session)
@@ -294,6 +293,7 @@ async def calculate_skill_level() -> Dict[str, Any]:
             result = await service.calculate_skill_level(user_id, calc_request.topic)
 
             await session.commit()
+            await service.invalidate_cached_skill_levels(user_id)
 
             return jsonify(result), 200
 
@@ -326,22 +326,53 @@ async def export_progress() -> Any:
         # Validate format
         ExportRequest(format=export_format)
 
+        if export_format == "csv":
+            # Stream CSV as text/csv; rows are written as they are read.
+            # The header and first batch are read before the response
+            # starts, so a failing query is still reported as a 500.
+            chunks = _stream_csv_export(user_id)
+            prefetched = [await anext(chunks), await anext(chunks, "")]
+            return Response(
+                _chain_chunks(prefetched, chunks),
+                mimetype="text/csv",
+                headers={
+                    "Content-Disposition": f"attachment; filename=progress_export_{user_id}.csv"
+                }
+            )
+
         async with get_session() as session:
             service = ProgressService(session)
             export_data = await service.export_progress_data(user_id, export_format)
 
-            if export_format == "json":
-                return jsonify(export_data), 200
-            elif export_format == "csv":
-                # Return CSV as text/csv
-                return Response(
-                    export_data,
-                    mimetype="text/csv",
-                    headers={
-                        "Content-Disposition": f"attachment; filename=progress_export_{user_id}.csv"
-                    }
-                )
+            return jsonify(export_data), 200
 
     except Exception as error:
         logger.error("Error exporting progress", extra={"error": str(error), "user_id": user_id})
         raise APIError(f"Failed to export progress: {str(error)}", status_code=500)
+
+
+async def _stream_csv_export(user_id: int) -> AsyncIterator[str]:
+    """
+    Yield CSV export chunks for a user.
+
+    The response body is produced after the handler returns, so the
+    generator owns its database session for the lifetime of the stream.
+    """
+    try:
+        async with get_session() as session:
+            service = ProgressService(session)
+            async for chunk in service.stream_csv_export(user_id):
+                yield chunk
+    except Exception as error:
+        # Past the prefetch the status line is already sent; re-raise so
+        # the transfer is aborted rather than ending as a short 200
+        logger.error("Error streaming progress export", extra={"error": str(error), "user_id": user_id})
+        raise
+
+
+async def _chain_chunks(prefetched: List[str], chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Yield chunks already read from a stream, then the rest of it."""
+    for chunk in prefetched:
+        yield chunk
+    async for chunk in chunks:
+        yield chunk
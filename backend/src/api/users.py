@@ -6,7 +6,7 @@ from quart import Blueprint, request, jsonify
 from typing import Dict, Any
 from pydantic import ValidationError
 from src.logging_config import get_logger
-from src.middleware.error_handler import APIError
+from src.middleware.error_handler import APIError, validation_error_details
 from src.middleware.auth_middleware import require_auth, require_verified_email, get_current_user_id
 from src.middleware.csrf_protection import csrf_protect
 from src.services.profile_service import ProfileService
@@ -111,7 +111,8 @@ async def update_current_user() -> Dict[str, Any]:
         )
         raise APIError(
             f"Validation error: {validation_error}",
-            status_code=400
+            status_code=400,
+            details=validation_error_details(validation_error)
         )
 
 
@@ -279,7 +280,8 @@ async def complete_onboarding() -> Dict[str, Any]:
         )
         raise APIError(
             f"Validation error: {validation_error}",
-            status_code=400
+            status_code=400,
+            details=validation_error_details(validation_error)
         )
 
 
@@ -380,7 +382,8 @@ async def update_user_preferences() -> Dict[str, Any]:
         )
         raise APIError(
             f"Validation error: {validation_error}",
-            status_code=400
+            status_code=400,
+            details=validation_error_details(validation_error)
         )
 
 
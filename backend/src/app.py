@@ -2,8 +2,12 @@
 Quart application factory for CodeMentor backend.
 Creates and configures the async Flask application instance.
 """
+import os
 from typing import Optional
-from quart import Quart, jsonify
+
+import orjson
+from quart import Quart, Response, jsonify
+from quart.json.provider import DefaultJSONProvider
 from quart_cors import cors
 import structlog
 
@@ -12,7 +16,53 @@ from .utils.logger import setup_logging, get_logger, log_request
 from .utils.database import init_database, get_database
 from .utils.redis_client import init_redis, get_redis
 from .services.monitoring_service import init_monitoring_service, get_monitoring_service
-from .services.metrics_collector import init_metrics_collector, get_metrics_collector
+from .services.metrics_collector import (
+    METRICS_EXPOSITION_TTL_SECONDS,
+    OTHER_ENDPOINT_LABEL,
+    init_metrics_collector,
+    get_metrics_collector,
+)
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that parses and serializes with orjson.
+
+    The wire format matches the default provider's: datetimes and dates
+    are passed through to its ``default`` hook, so they stay RFC 822
+    (HTTP date) strings rather than orjson's ISO 8601, and keys are
+    sorted as before. Types orjson does not know (e.g. Decimal) use the
+    same hook. The only difference is that non-ASCII text is sent as
+    UTF-8 rather than ``\\u`` escapes, which decodes to the same values.
+    """
+
+    def _options(self, indent: bool = False) -> int:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(
+            obj,
+            default=self.default,
+            option=self._options(indent) | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
 
 
 def create_app(config_override: Optional[dict] = None) -> Quart:
@@ -57,6 +107,8 @@ def create_app(config_override: Optional[dict] = None) -> Quart:
         # Restore original init
         FlaskConfig.__init__ = original_init
 
+    app.json = OrjsonJSONProvider(app)
+
     # Apply configuration
     app.config.update(
         {
@@ -106,6 +158,17 @@ def create_app(config_override: Optional[dict] = None) -> Quart:
         }
     )
 
+    # Evaluate alert thresholds in the background while serving (OPS-1)
+    @app.before_serving
+    async def start_alert_checks():
+        """Start the periodic alert threshold task."""
+        get_monitoring_service().start_alert_checks()
+
+    @app.after_serving
+    async def stop_alert_checks():
+        """Stop the periodic alert threshold task."""
+        await get_monitoring_service().stop_alert_checks()
+
     # Register request/response hooks
     @app.before_request
     async def before_request():
@@ -115,8 +178,9 @@ def create_app(config_override: Optional[dict] = None) -> Quart:
 
         log_request(request)
 
-        # Start request timer for metrics (OPS-1)
-        g.request_start_time = time.time()
+        # Start request timer for metrics (OPS-1); monotonic so clock
+        # adjustments cannot produce negative or inflated durations
+        g.request_start_ns = time.monotonic_ns()
 
     @app.after_request
     async def after_request(response):
@@ -127,12 +191,19 @@ def create_app(config_override: Optional[dict] = None) -> Quart:
         log_request(request, response)
 
         # Record request metrics (OPS-1)
-        if settings.metrics_enabled and hasattr(g, 'request_start_time'):
-            duration = time.time() - g.request_start_time
+        if settings.metrics_enabled and hasattr(g, 'request_start_ns'):
+            duration = (time.monotonic_ns() - g.request_start_ns) / 1e9
             metrics_collector = get_metrics_collector()
 
+            # Label by route template so /api/exercises/1 and /api/exercises/2
+            # share one series; unrouted paths (404s) share the overflow label
+            if request.url_rule is not None:
+                endpoint = request.url_rule.rule
+            else:
+                endpoint = OTHER_ENDPOINT_LABEL
+
             metrics_collector.record_request_latency(
-                endpoint=request.path,
+                endpoint=endpoint,
                 method=request.method,
                 status_code=response.status_code,
                 duration_seconds=duration
@@ -258,7 +329,11 @@ def create_app(config_override: Optional[dict] = None) -> Quart:
             health_status["monitoring"] = {"status": "error"}
 
         status_code = 200 if health_status["status"] == "healthy" else 503
-        return jsonify(health_status), status_code
+        return Response(
+            orjson.dumps(health_status),
+            status=status_code,
+            content_type="application/json"
+        )
 
     # Root endpoint
     @app.route("/", methods=["GET"])
@@ -307,10 +382,10 @@ def create_app(config_override: Optional[dict] = None) -> Quart:
             metrics_collector = get_metrics_collector()
             prometheus_data = metrics_collector.generate_prometheus_metrics()
 
-            from quart import Response
             return Response(
                 prometheus_data,
-                mimetype=metrics_collector.get_content_type()
+                mimetype=metrics_collector.get_content_type(),
+                headers={"Cache-Control": f"max-age={int(METRICS_EXPOSITION_TTL_SECONDS)}"}
             )
         except Exception as exception:
             logger.error(
@@ -388,6 +463,11 @@ async def shutdown_app(app: Quart):
             extra={"exception": str(exception)},
         )
 
+    # Drop this worker's live gauge samples from shared Prometheus files
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(os.getpid())
+
     logger.info("Application shutdown complete")
 
 
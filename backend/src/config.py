@@ -89,6 +89,10 @@ class Settings(BaseSettings):
     # Rate Limiting - General
     rate_limit_per_minute: int = Field(default=60, env="RATE_LIMIT_PER_MINUTE")
     rate_limit_burst: int = Field(default=10, env="RATE_LIMIT_BURST")
+    # "sliding_window" (exact, one sorted-set entry per request in the window)
+    # or "fixed_window" (one counter per window, O(1) memory, allows bursts
+    # of up to twice the limit across a window boundary)
+    rate_limit_algorithm: str = Field(default="sliding_window", env="RATE_LIMIT_ALGORITHM")
 
     # Rate Limiting - Tiered by User Role (SEC-3)
     # Chat endpoints (per minute)
@@ -28,6 +28,35 @@ class APIError(Exception):
         self.details = details or {}
 
 
+def validation_error_details(validation_error: ValidationError) -> Dict[str, Any]:
+    """
+    Build structured per-field details from a Pydantic validation error.
+
+    Clients and tests can look up the failing field directly instead of
+    parsing the human-readable message.
+
+    Args:
+        validation_error: Pydantic validation error
+
+    Returns:
+        Details dict with an "errors" list of {"field", "code", "limit"?} entries
+    """
+    errors = []
+    for err in validation_error.errors():
+        field_error = {
+            "field": ".".join(str(part) for part in err["loc"]),
+            "code": err["type"],
+        }
+        context = err.get("ctx") or {}
+        for limit_key in ("max_length", "min_length"):
+            if limit_key in context:
+                field_error["limit"] = context[limit_key]
+                break
+        errors.append(field_error)
+
+    return {"errors": errors}
+
+
 def register_error_handlers(app: Quart) -> None:
     """
     Register error handlers for the application.
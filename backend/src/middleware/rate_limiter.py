@@ -9,10 +9,14 @@ SEC-3 Enhancement:
 - Per-endpoint rate limits for expensive operations
 """
 from functools import wraps
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, NamedTuple
 import time
+import uuid
 from datetime import datetime
-from quart import request, jsonify
+from weakref import WeakKeyDictionary
+from quart import Response, request, jsonify, make_response
+from redis.asyncio import Redis as AsyncRedis
+from redis.commands.core import AsyncScript
 from sqlalchemy import select
 from src.logging_config import get_logger
 from src.middleware.error_handler import APIError
@@ -22,6 +26,77 @@ from src.models.user import User, UserRole
 
 logger = get_logger(__name__)
 
+# Sliding window log decided in one atomic round trip: drop entries older
+# than the window, count the rest and, if under the limit, record this
+# request. KEYS: window key, optionally a key to read in the same trip.
+# ARGV: now, window seconds, limit, unique member.
+# Returns {allowed, count, reset_at, value of KEYS[2] or nil}.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('EXPIRE', KEYS[1], window)
+    count = count + 1
+    allowed = 1
+end
+-- The window frees a slot once its oldest request ages out
+local reset_at = now + window
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset_at = tonumber(oldest[2]) + window
+end
+local extra = false
+if KEYS[2] then
+    extra = redis.call('GET', KEYS[2])
+end
+return {allowed, count, reset_at, extra}
+"""
+
+# Fixed window counter: one INCR per request, expiring with its window.
+# KEYS: counter key for the current window, optionally a key to read in the
+# same trip. ARGV: window seconds.
+# Returns {count including this request, value of KEYS[2] or nil}.
+FIXED_WINDOW_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+local extra = false
+if KEYS[2] then
+    extra = redis.call('GET', KEYS[2])
+end
+return {count, extra}
+"""
+
+
+# Window scripts registered per Redis client. Script objects call by SHA
+# (EVALSHA) and only send the source again if the server does not have it
+_window_scripts: "WeakKeyDictionary[AsyncRedis, Dict[str, AsyncScript]]" = WeakKeyDictionary()
+
+
+def _window_script(client: AsyncRedis, source: str) -> AsyncScript:
+    """Get the script object for a window script, registering it on first use."""
+    scripts = _window_scripts.setdefault(client, {})
+    script = scripts.get(source)
+    if script is None:
+        script = scripts[source] = client.register_script(source)
+    return script
+
+
+class RateLimitStatus(NamedTuple):
+    """Outcome of one rate limit check, with the values its headers report."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+    retry_after: Optional[int]
+    daily_cost: Optional[float] = None
+
 
 def get_client_identifier() -> str:
     """
@@ -45,6 +120,74 @@ def get_client_identifier() -> str:
     return f"ip:{ip_address}"
 
 
+async def evaluate_rate_limit(
+    identifier: str,
+    limit: int,
+    window: int,
+    endpoint: str,
+    cost_key: Optional[str] = None,
+) -> RateLimitStatus:
+    """
+    Decide a request against its rate limit in a single Redis round trip.
+
+    Args:
+        identifier: Unique client identifier
+        limit: Maximum requests allowed
+        window: Time window in seconds
+        endpoint: API endpoint being accessed
+        cost_key: Daily cost key to read in the same round trip, if any
+
+    Returns:
+        RateLimitStatus with the decision, header values and daily cost
+        (None when cost_key is not given)
+    """
+    redis_manager = get_redis()
+    current_time = int(time.time())
+    keys = [cost_key] if cost_key else []
+
+    if settings.rate_limit_algorithm == "fixed_window":
+        window_index = current_time // window
+        key = f"rate_limit:{endpoint}:{identifier}:{window_index}"
+
+        script = _window_script(redis_manager.async_client, FIXED_WINDOW_SCRIPT)
+        request_count, cost = await script(keys=[key, *keys], args=[window])
+        allowed = request_count <= limit
+        reset = (window_index + 1) * window
+    else:
+        # Use sorted set to track requests in time window; members are
+        # unique so requests within the same second are counted separately
+        key = f"rate_limit:{endpoint}:{identifier}"
+
+        script = _window_script(redis_manager.async_client, SLIDING_WINDOW_SCRIPT)
+        allowed, request_count, reset, cost = await script(
+            keys=[key, *keys],
+            args=[current_time, window, limit, uuid.uuid4().hex],
+        )
+        allowed = bool(allowed)
+
+    retry_after = None
+    if not allowed:
+        logger.warning(
+            "Rate limit exceeded",
+            extra={
+                "identifier": identifier,
+                "endpoint": endpoint,
+                "count": request_count,
+                "limit": limit,
+            },
+        )
+        retry_after = max(1, reset - current_time)
+
+    return RateLimitStatus(
+        allowed=allowed,
+        limit=limit,
+        remaining=max(0, limit - request_count),
+        reset=reset,
+        retry_after=retry_after,
+        daily_cost=float(cost) if cost is not None else (0.0 if cost_key else None),
+    )
+
+
 async def check_rate_limit(
     identifier: str,
     limit: int,
@@ -63,43 +206,27 @@ async def check_rate_limit(
     Returns:
         Tuple of (allowed, retry_after_seconds)
     """
-    redis_manager = get_redis()
-    current_time = int(time.time())
-    window_start = current_time - window
-
-    # Use sorted set to track requests in time window
-    key = f"rate_limit:{endpoint}:{identifier}"
-
-    # Remove old requests outside the window
-    await redis_manager.async_client.zremrangebyscore(key, 0, window_start)
-
-    # Count requests in current window
-    request_count = await redis_manager.async_client.zcard(key)
-
-    if request_count >= limit:
-        # Get oldest request in window
-        oldest = await redis_manager.async_client.zrange(key, 0, 0, withscores=True)
-        if oldest:
-            oldest_time = int(oldest[0][1])
-            retry_after = window - (current_time - oldest_time)
-            logger.warning(
-                "Rate limit exceeded",
-                extra={
-                    "identifier": identifier,
-                    "endpoint": endpoint,
-                    "count": request_count,
-                    "limit": limit,
-                },
-            )
-            return False, max(1, retry_after)
+    status = await evaluate_rate_limit(identifier, limit, window, endpoint)
+    return status.allowed, status.retry_after
+
 
-    # Add current request
-    await redis_manager.async_client.zadd(key, {str(current_time): current_time})
+def set_rate_limit_headers(response: Response, status: RateLimitStatus) -> Response:
+    """
+    Set X-RateLimit headers on a response from a rate limit check.
 
-    # Set expiration on the key
-    await redis_manager.async_client.expire(key, window)
+    Args:
+        response: Response to annotate
+        status: Result of the check the response is subject to
 
-    return True, None
+    Returns:
+        The same response
+    """
+    response.headers["X-RateLimit-Limit"] = str(status.limit)
+    response.headers["X-RateLimit-Remaining"] = str(status.remaining)
+    response.headers["X-RateLimit-Reset"] = str(status.reset)
+    if status.retry_after is not None:
+        response.headers["Retry-After"] = str(status.retry_after)
+    return response
 
 
 def rate_limit(
@@ -132,49 +259,49 @@ def rate_limit(
             else:
                 rpm = settings.rate_limit_per_minute
 
-            allowed, retry_after = await check_rate_limit(
+            status = await evaluate_rate_limit(
                 identifier,
                 limit=rpm,
                 window=60,
                 endpoint=endpoint,
             )
 
-            if not allowed:
+            if not status.allowed:
                 response = jsonify({
                     "error": {
                         "code": "RATE_LIMIT_EXCEEDED",
-                        "message": f"Too many requests. Please try again in {retry_after} seconds.",
+                        "message": f"Too many requests. Please try again in {status.retry_after} seconds.",
                     }
                 })
                 response.status_code = 429
-                response.headers["Retry-After"] = str(retry_after)
-                response.headers["X-RateLimit-Limit"] = str(rpm)
-                response.headers["X-RateLimit-Remaining"] = "0"
-                response.headers["X-RateLimit-Reset"] = str(int(time.time()) + retry_after)
-                return response
+                return set_rate_limit_headers(response, status)
 
             # Check hour limit if specified
             if requests_per_hour is not None:
-                allowed, retry_after = await check_rate_limit(
+                hour_status = await evaluate_rate_limit(
                     identifier,
                     limit=requests_per_hour,
                     window=3600,
                     endpoint=f"{endpoint}:hour",
                 )
 
-                if not allowed:
+                if not hour_status.allowed:
                     response = jsonify({
                         "error": {
                             "code": "RATE_LIMIT_EXCEEDED",
-                            "message": f"Hourly rate limit exceeded. Please try again in {retry_after // 60} minutes.",
+                            "message": (
+                                "Hourly rate limit exceeded. "
+                                f"Please try again in {hour_status.retry_after // 60} minutes."
+                            ),
                         }
                     })
                     response.status_code = 429
-                    response.headers["Retry-After"] = str(retry_after)
-                    return response
+                    return set_rate_limit_headers(response, hour_status)
 
-            # Request is allowed, execute the endpoint
-            return await func(*args, **kwargs)
+            # Request is allowed, execute the endpoint; headers report the
+            # minute limit, which is the one clients run into first
+            response = await make_response(await func(*args, **kwargs))
+            return set_rate_limit_headers(response, status)
 
         return wrapper
 
@@ -271,51 +398,62 @@ def llm_rate_limit(endpoint_type: str):
             identifier = f"user:{user_id}"
             endpoint = request.path
 
+            # Today's cost is read in the same round trip as the first
+            # limit check rather than with a separate GET
+            from src.services.llm.cost_tracker import CostTracker, daily_cost_limit_for_role
+            cost_key = CostTracker.daily_cost_key(user_id)
+            status = None
+
             # Check minute limit if applicable
             if "per_minute" in limits:
-                allowed, retry_after = await check_rate_limit(
+                status = await evaluate_rate_limit(
                     identifier,
                     limit=limits["per_minute"],
                     window=60,
                     endpoint=endpoint,
+                    cost_key=cost_key,
                 )
 
-                if not allowed:
+                if not status.allowed:
                     response = jsonify({
                         "error": {
                             "code": "RATE_LIMIT_EXCEEDED",
-                            "message": f"Rate limit exceeded: {limits['per_minute']} requests per minute. Retry in {retry_after}s.",
+                            "message": (
+                                f"Rate limit exceeded: {limits['per_minute']} requests per minute. "
+                                f"Retry in {status.retry_after}s."
+                            ),
                         }
                     })
                     response.status_code = 429
-                    response.headers["Retry-After"] = str(retry_after)
-                    response.headers["X-RateLimit-Limit"] = str(limits["per_minute"])
-                    response.headers["X-RateLimit-Remaining"] = "0"
-                    response.headers["X-RateLimit-Reset"] = str(int(time.time()) + retry_after)
-                    return response
+                    return set_rate_limit_headers(response, status)
 
             # Check hourly limit if applicable
             if "per_hour" in limits:
-                allowed, retry_after = await check_rate_limit(
+                hour_status = await evaluate_rate_limit(
                     identifier,
                     limit=limits["per_hour"],
                     window=3600,
                     endpoint=f"{endpoint}:hour",
+                    cost_key=cost_key if status is None else None,
                 )
 
-                if not allowed:
+                if not hour_status.allowed:
                     response = jsonify({
                         "error": {
                             "code": "RATE_LIMIT_EXCEEDED",
-                            "message": f"Hourly rate limit exceeded: {limits['per_hour']} requests per hour. Retry in {retry_after // 60} minutes.",
+                            "message": (
+                                f"Hourly rate limit exceeded: {limits['per_hour']} requests per hour. "
+                                f"Retry in {hour_status.retry_after // 60} minutes."
+                            ),
                         }
                     })
                     response.status_code = 429
-                    response.headers["Retry-After"] = str(retry_after)
-                    return response
+                    return set_rate_limit_headers(response, hour_status)
+
+                if status is None:
+                    status = hour_status
 
             # Check daily cost limit
-            from src.services.llm.cost_tracker import CostTracker
             from src.utils.redis_client import get_redis
 
             redis = get_redis()
@@ -329,13 +467,13 @@ def llm_rate_limit(endpoint_type: str):
                 )
                 user_role = result.scalar_one_or_none()
 
-            is_admin = user_role in [UserRole.ADMIN, UserRole.MODERATOR] if user_role else False
-            daily_cost_limit = settings.daily_cost_limit_admin if is_admin else settings.daily_cost_limit_student
+            daily_cost_limit = daily_cost_limit_for_role(user_role)
 
             # Check if user is within cost limit
             within_limit, current_cost = await cost_tracker.check_cost_limit(
                 user_id,
-                daily_cost_limit
+                daily_cost_limit,
+                current_cost=status.daily_cost if status else None,
             )
 
             if not within_limit:
@@ -351,7 +489,12 @@ def llm_rate_limit(endpoint_type: str):
                 return response
 
             # Check if approaching cost limit (warning)
-            if await cost_tracker.check_cost_warning(user_id, daily_cost_limit, settings.cost_warning_threshold):
+            if await cost_tracker.check_cost_warning(
+                user_id,
+                daily_cost_limit,
+                settings.cost_warning_threshold,
+                current_cost=current_cost,
+            ):
                 logger.warning(
                     "User approaching daily cost limit",
                     extra={
@@ -363,7 +506,10 @@ def llm_rate_limit(endpoint_type: str):
                 )
 
             # Request is allowed, execute the endpoint
-            return await func(*args, **kwargs)
+            response = await make_response(await func(*args, **kwargs))
+            if status is not None:
+                set_rate_limit_headers(response, status)
+            return response
 
         return wrapper
 
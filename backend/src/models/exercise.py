@@ -162,8 +162,11 @@ class UserExercise(Base):
     # DB-OPT: Add composite index for streak calculations and exercise history
     # Query: SELECT * FROM user_exercises WHERE user_id = X ORDER BY created_at DESC
     # This composite index optimizes both the filter and sort operations
+    # Progress statistics, trends and exports filter a user's completions by
+    # a completed_at window and group by day, so they get their own index
     __table_args__ = (
         Index('idx_user_exercises_user_created', 'user_id', 'created_at'),
+        Index('idx_user_exercises_user_completed', 'user_id', 'completed_at'),
     )
 
     def __repr__(self) -> str:
@@ -19,6 +19,7 @@ from typing import Optional
 from pydantic import BaseModel, Field, field_validator, EmailStr
 import re
 import html
+from src.utils.sanitization import effective_length
 
 
 def sanitize_html(text: str) -> str:
@@ -112,7 +113,7 @@ class RegisterRequest(BaseModel):
         """
         stripped = value.strip()
 
-        if not stripped:
+        if effective_length(stripped) == 0:
             raise ValueError("Name cannot be empty")
 
         # Sanitize HTML to prevent XSS
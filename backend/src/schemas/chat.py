@@ -15,7 +15,7 @@ Security Features:
 """
 from typing import Optional
 from pydantic import BaseModel, Field, field_validator
-import bleach
+from src.utils.sanitization import effective_length, get_cleaner, needs_html_cleaning
 
 
 # ===================================================================
@@ -61,14 +61,12 @@ def sanitize_markdown(text: str) -> str:
     # First strip leading/trailing whitespace
     stripped = text.strip()
 
+    # Plain text passes through bleach unchanged
+    if not needs_html_cleaning(stripped):
+        return stripped
+
     # Use bleach to sanitize
-    sanitized = bleach.clean(
-        stripped,
-        tags=ALLOWED_TAGS,
-        attributes=ALLOWED_ATTRIBUTES,
-        protocols=ALLOWED_PROTOCOLS,
-        strip=True  # Strip disallowed tags instead of escaping
-    )
+    sanitized = get_cleaner(ALLOWED_TAGS, ALLOWED_ATTRIBUTES, ALLOWED_PROTOCOLS).clean(stripped)
 
     # Linkify is optional - only if we want to auto-convert URLs to links
     # For now, we'll skip it to avoid unexpected behavior
@@ -115,7 +113,7 @@ class SendMessageRequest(BaseModel):
         """
         stripped = value.strip()
 
-        if not stripped:
+        if effective_length(stripped) == 0:
             raise ValueError("Message cannot be empty or only whitespace")
 
         # Sanitize markdown content
@@ -10,7 +10,7 @@ from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator
 from src.models.user import SkillLevel, UserRole
-from src.utils.sanitization import sanitize_html, sanitize_markdown
+from src.utils.sanitization import effective_length, sanitize_html, sanitize_markdown
 
 
 class OnboardingRequest(BaseModel):
@@ -69,7 +69,7 @@ class OnboardingRequest(BaseModel):
     def validate_career_goals(cls, value: str) -> str:
         """Validate career goals field."""
         stripped = value.strip()
-        if len(stripped) < 10:
+        if effective_length(stripped) < 10:
             raise ValueError("Career goals must be at least 10 characters")
         return stripped
 
@@ -111,6 +111,8 @@ class ProfileUpdateRequest(BaseModel):
         """Sanitize name field (SEC-3-INPUT)."""
         if value is None:
             return None
+        if effective_length(value) == 0:
+            raise ValueError("Name cannot be empty")
         return sanitize_html(value)
 
     @field_validator('bio')
@@ -127,6 +129,8 @@ class ProfileUpdateRequest(BaseModel):
         """Sanitize career_goals field (SEC-3-INPUT)."""
         if value is None:
             return None
+        if effective_length(value) < 10:
+            raise ValueError("Career goals must be at least 10 characters")
         # career_goals can have markdown but no images
         return sanitize_markdown(value, allow_images=False)
 
@@ -5,10 +5,12 @@ This service provides caching for:
 1. User profiles (TTL: 5 minutes)
 2. Exercises (TTL: 1 hour)
 3. Exercise lists (TTL: 2 minutes)
+4. Skill levels (TTL: 1 minute)
 
 Cache invalidation:
 - User profile: On profile update
 - Exercise: On exercise update (rare, exercises are mostly static)
+- Skill levels: After a commit that writes skill level rows
 
 Performance Impact:
 - User profile cache hit rate: Expected >80%
@@ -32,11 +34,13 @@ class CacheService:
     USER_PROFILE_PREFIX = "user:profile:"
     EXERCISE_PREFIX = "exercise:"
     EXERCISE_LIST_PREFIX = "exercise:list:"
+    SKILL_LEVELS_PREFIX = "user:skill_levels:"
 
     # Cache TTLs (in seconds)
     USER_PROFILE_TTL = 300  # 5 minutes
     EXERCISE_TTL = 3600  # 1 hour
     EXERCISE_LIST_TTL = 120  # 2 minutes
+    SKILL_LEVELS_TTL = 60  # 1 minute
 
     def __init__(self):
         """Initialize cache service with Redis client."""
@@ -450,6 +454,61 @@ class CacheService:
             )
             return False
 
+    # =========================================================================
+    # SKILL LEVEL CACHING
+    # =========================================================================
+
+    async def get_cached_skill_levels(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get user's skill levels from cache.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Skill levels dict if cached, None if not in cache
+        """
+        cache_key = f"{self.SKILL_LEVELS_PREFIX}{user_id}"
+        return await self.redis_client.get_cache(cache_key)
+
+    async def cache_skill_levels(
+        self,
+        user_id: int,
+        skill_levels: Dict[str, Any]
+    ) -> bool:
+        """
+        Cache user's skill levels in Redis.
+
+        Args:
+            user_id: User ID
+            skill_levels: JSON-serializable skill levels dict
+
+        Returns:
+            True if cached successfully, False otherwise
+        """
+        cache_key = f"{self.SKILL_LEVELS_PREFIX}{user_id}"
+        return await self.redis_client.set_cache(
+            cache_key,
+            skill_levels,
+            self.SKILL_LEVELS_TTL
+        )
+
+    async def invalidate_skill_levels(self, user_id: int) -> bool:
+        """
+        Invalidate (delete) user's skill levels from cache.
+
+        Call this after:
+        - Committing any write to the user's skill level rows
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            True if a cached entry was deleted
+        """
+        cache_key = f"{self.SKILL_LEVELS_PREFIX}{user_id}"
+        return await self.redis_client.delete_cache(cache_key)
+
     # =========================================================================
     # CACHE STATISTICS
     # =========================================================================
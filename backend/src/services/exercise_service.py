@@ -23,6 +23,7 @@ from src.schemas.exercise import (
     LLMHintContext,
     LLMEvaluationContext,
 )
+from src.services.llm.cost_tracker import daily_cost_limit_for_role
 from src.services.llm.llm_service import LLMService
 from src.logging_config import get_logger
 
@@ -142,7 +143,8 @@ class ExerciseService:
             interests=context.learning_goals or context.preferred_topics or "",
             recent_topics=context.previous_topics or [],
             difficulty=context.difficulty_override or "medium",
-            estimated_time=30
+            estimated_time=30,
+            daily_cost_limit=daily_cost_limit_for_role(user.role)
         )
 
         # Create Exercise record
@@ -353,7 +355,8 @@ class ExerciseService:
             exercise_description=exercise_description,
             student_code=solution,
             skill_level=user.skill_level or "intermediate",
-            learning_style=user.learning_style
+            learning_style=user.learning_style,
+            daily_cost_limit=daily_cost_limit_for_role(user.role)
         )
 
         # Update user exercise
@@ -446,7 +449,8 @@ class ExerciseService:
             student_code=current_code,
             student_question=context,
             skill_level=user.skill_level or "intermediate",
-            hints_count=user_exercise.hints_requested
+            hints_count=user_exercise.hints_requested,
+            daily_cost_limit=daily_cost_limit_for_role(user.role)
         )
 
         # Increment hint counter
@@ -12,13 +12,98 @@ Features:
 - Automatic Redis expiration
 """
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, NamedTuple, Optional
 from datetime import datetime, timedelta
+from weakref import WeakKeyDictionary
 import redis.asyncio as aioredis
+from redis.commands.core import AsyncScript
+from src.config import settings
 from src.logging_config import get_logger
+from src.models.user import UserRole
 
 logger = get_logger(__name__)
 
+# Daily cost keys outlive the day they count so nothing is lost at the
+# day boundary; operation metadata is kept for a week
+DAILY_COST_TTL_SECONDS = 86400 * 2
+OPERATION_METADATA_TTL_SECONDS = 86400 * 7
+
+# Increment the daily cost and check it against the limit in one atomic
+# round trip. The expiry is set only when the key has none, so it counts
+# from the first cost of the day rather than the latest. Checked with TTL
+# rather than EXPIRE NX, which needs Redis 7.
+# KEYS: daily cost key. ARGV: cost, TTL seconds, daily limit (0 for none),
+# warning threshold. Returns {new daily total, over limit, over threshold}.
+TRACK_COST_SCRIPT = """
+local total = redis.call('INCRBYFLOAT', KEYS[1], ARGV[1])
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+local limit = tonumber(ARGV[3])
+local over_limit, warning = 0, 0
+if limit > 0 then
+    if tonumber(total) >= limit then over_limit = 1 end
+    if tonumber(total) >= limit * tonumber(ARGV[4]) then warning = 1 end
+end
+return {total, over_limit, warning}
+"""
+
+# TRACK_COST_SCRIPT plus the operation metadata write.
+# KEYS: daily cost key, metadata key.
+# ARGV: cost, cost TTL seconds, daily limit (0 for none), warning threshold,
+# metadata JSON, metadata TTL seconds.
+TRACK_OPERATION_SCRIPT = """
+local total = redis.call('INCRBYFLOAT', KEYS[1], ARGV[1])
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+redis.call('SET', KEYS[2], ARGV[5], 'EX', ARGV[6])
+local limit = tonumber(ARGV[3])
+local over_limit, warning = 0, 0
+if limit > 0 then
+    if tonumber(total) >= limit then over_limit = 1 end
+    if tonumber(total) >= limit * tonumber(ARGV[4]) then warning = 1 end
+end
+return {total, over_limit, warning}
+"""
+
+
+# Tracking scripts registered per Redis client. Script objects call by SHA
+# (EVALSHA) and only send the source again if the server does not have it
+_cost_scripts: "WeakKeyDictionary[aioredis.Redis, Dict[str, AsyncScript]]" = WeakKeyDictionary()
+
+
+def _cost_script(client: aioredis.Redis, source: str) -> AsyncScript:
+    """Get the script object for a tracking script, registering it on first use."""
+    scripts = _cost_scripts.setdefault(client, {})
+    script = scripts.get(source)
+    if script is None:
+        script = scripts[source] = client.register_script(source)
+    return script
+
+
+def daily_cost_limit_for_role(role: Optional[UserRole]) -> float:
+    """
+    Get the daily LLM cost limit for a user role.
+
+    Args:
+        role: User role (None if unknown)
+
+    Returns:
+        Daily cost limit in dollars; admins and moderators get the higher limit
+    """
+    if role in (UserRole.ADMIN, UserRole.MODERATOR):
+        return settings.daily_cost_limit_admin
+    return settings.daily_cost_limit_student
+
+
+class CostTrackResult(NamedTuple):
+    """Daily total after tracking a cost, checked against the daily limit."""
+
+    total: float
+    over_limit: bool
+    warning: bool
+
 
 class CostTracker:
     """Track and enforce LLM API costs per user."""
@@ -42,12 +127,28 @@ class CostTracker:
         self.redis = redis_client
         self.logger = logger
 
+    @staticmethod
+    def daily_cost_key(user_id: int) -> str:
+        """
+        Get the Redis key holding a user's cost for today (UTC).
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            Daily cost key
+        """
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        return f"llm_cost:daily:{user_id}:{today}"
+
     async def track_cost(
         self,
         user_id: int,
         operation_type: str,
         cost: float,
-    ) -> None:
+        daily_limit: Optional[float] = None,
+        warning_threshold: float = 0.8,
+    ) -> CostTrackResult:
         """
         Track cost for a user's LLM operation.
 
@@ -55,26 +156,22 @@ class CostTracker:
             user_id: User identifier
             operation_type: Type of operation (chat, exercise_generation, hint)
             cost: Cost in dollars
-        """
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        cost_key = f"llm_cost:daily:{user_id}:{today}"
-
-        # Increment daily cost
-        await self.redis.incrbyfloat(cost_key, cost)
+            daily_limit: Daily cost limit to check the new total against
+                (None to skip the check)
+            warning_threshold: Warning threshold (0.0-1.0, default 0.8 = 80%)
 
-        # Set expiration to end of next day (ensure we don't lose data on day boundary)
-        await self.redis.expire(cost_key, 86400 * 2)
-
-        self.logger.info(
-            "LLM cost tracked",
-            extra={
-                "user_id": user_id,
-                "operation_type": operation_type,
-                "cost": cost,
-                "date": today,
-            },
+        Returns:
+            CostTrackResult with today's total, including this operation,
+            and whether it is over the limit or the warning threshold
+        """
+        result = await _cost_script(self.redis, TRACK_COST_SCRIPT)(
+            keys=[self.daily_cost_key(user_id)],
+            args=[cost, DAILY_COST_TTL_SECONDS, daily_limit or 0, warning_threshold],
         )
 
+        self._log_cost(user_id, operation_type, cost)
+        return self._track_result(user_id, result, daily_limit)
+
     async def track_operation(
         self,
         user_id: int,
@@ -83,7 +180,9 @@ class CostTracker:
         cost: float,
         tokens_used: int,
         model: str,
-    ) -> None:
+        daily_limit: Optional[float] = None,
+        warning_threshold: float = 0.8,
+    ) -> CostTrackResult:
         """
         Track operation with full metadata.
 
@@ -94,12 +193,14 @@ class CostTracker:
             cost: Cost in dollars
             tokens_used: Number of tokens consumed
             model: LLM model used
-        """
-        # Track daily cost
-        await self.track_cost(user_id, operation_type, cost)
+            daily_limit: Daily cost limit to check the new total against
+                (None to skip the check)
+            warning_threshold: Warning threshold (0.0-1.0, default 0.8 = 80%)
 
-        # Store operation metadata
-        metadata_key = f"llm_operation:{operation_id}"
+        Returns:
+            CostTrackResult with today's total, including this operation,
+            and whether it is over the limit or the warning threshold
+        """
         metadata = {
             "user_id": user_id,
             "operation_type": operation_type,
@@ -109,12 +210,65 @@ class CostTracker:
             "timestamp": datetime.utcnow().isoformat(),
         }
 
-        await self.redis.setex(
-            metadata_key,
-            86400 * 7,  # Keep metadata for 7 days
-            json.dumps(metadata),
+        # Daily cost and metadata are written together in one round trip
+        result = await _cost_script(self.redis, TRACK_OPERATION_SCRIPT)(
+            keys=[self.daily_cost_key(user_id), f"llm_operation:{operation_id}"],
+            args=[
+                cost,
+                DAILY_COST_TTL_SECONDS,
+                daily_limit or 0,
+                warning_threshold,
+                json.dumps(metadata),
+                OPERATION_METADATA_TTL_SECONDS,
+            ],
+        )
+
+        self._log_cost(user_id, operation_type, cost)
+        return self._track_result(user_id, result, daily_limit)
+
+    def _log_cost(self, user_id: int, operation_type: str, cost: float) -> None:
+        """Log a tracked cost."""
+        self.logger.info(
+            "LLM cost tracked",
+            extra={
+                "user_id": user_id,
+                "operation_type": operation_type,
+                "cost": cost,
+                "date": datetime.utcnow().strftime("%Y-%m-%d"),
+            },
         )
 
+    def _track_result(
+        self,
+        user_id: int,
+        result: list,
+        daily_limit: Optional[float],
+    ) -> CostTrackResult:
+        """Convert a tracking script's reply to a CostTrackResult, logging crossed limits."""
+        total, over_limit, warning = result
+        track_result = CostTrackResult(float(total), bool(over_limit), bool(warning))
+
+        if track_result.over_limit:
+            self.logger.warning(
+                "Daily cost limit exceeded",
+                extra={
+                    "user_id": user_id,
+                    "current_cost": track_result.total,
+                    "daily_limit": daily_limit,
+                },
+            )
+        elif track_result.warning:
+            self.logger.warning(
+                "Cost warning threshold exceeded",
+                extra={
+                    "user_id": user_id,
+                    "current_cost": track_result.total,
+                    "limit": daily_limit,
+                },
+            )
+
+        return track_result
+
     async def get_daily_cost(self, user_id: int) -> float:
         """
         Get total cost for user today.
@@ -125,10 +279,7 @@ class CostTracker:
         Returns:
             Total cost in dollars
         """
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        cost_key = f"llm_cost:daily:{user_id}:{today}"
-
-        cost_str = await self.redis.get(cost_key)
+        cost_str = await self.redis.get(self.daily_cost_key(user_id))
         if cost_str is None:
             return 0.0
 
@@ -156,6 +307,7 @@ class CostTracker:
         self,
         user_id: int,
         daily_limit: float,
+        current_cost: Optional[float] = None,
     ) -> tuple[bool, float]:
         """
         Check if user is within daily cost limit.
@@ -163,11 +315,14 @@ class CostTracker:
         Args:
             user_id: User identifier
             daily_limit: Maximum daily cost in dollars
+            current_cost: Today's cost if the caller already has it
+                (e.g. read alongside the rate limit); read from Redis otherwise
 
         Returns:
             Tuple of (is_within_limit, current_cost)
         """
-        current_cost = await self.get_daily_cost(user_id)
+        if current_cost is None:
+            current_cost = await self.get_daily_cost(user_id)
 
         is_within_limit = current_cost < daily_limit
 
@@ -188,6 +343,7 @@ class CostTracker:
         user_id: int,
         limit: float,
         threshold: float = 0.8,
+        current_cost: Optional[float] = None,
     ) -> bool:
         """
         Check if user has exceeded warning threshold.
@@ -196,11 +352,14 @@ class CostTracker:
             user_id: User identifier
             limit: Daily cost limit in dollars
             threshold: Warning threshold (0.0-1.0, default 0.8 = 80%)
+            current_cost: Today's cost if the caller already has it
+                (e.g. from check_cost_limit); read from Redis otherwise
 
         Returns:
             True if warning threshold exceeded
         """
-        current_cost = await self.get_daily_cost(user_id)
+        if current_cost is None:
+            current_cost = await self.get_daily_cost(user_id)
         warning_level = limit * threshold
 
         if current_cost >= warning_level:
@@ -264,12 +423,17 @@ class CostTracker:
         }
 
         today = datetime.utcnow()
+        dates = [
+            (today - timedelta(days=i)).strftime("%Y-%m-%d")
+            for i in range(days)
+        ]
 
-        for i in range(days):
-            date = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-            cost_key = f"llm_cost:daily:{user_id}:{date}"
+        # One MGET for the whole window rather than a GET per day
+        cost_strs = await self.redis.mget(
+            [f"llm_cost:daily:{user_id}:{date}" for date in dates]
+        ) if dates else []
 
-            cost_str = await self.redis.get(cost_key)
+        for date, cost_str in zip(dates, cost_strs):
             cost = float(cost_str) if cost_str else 0.0
 
             stats["daily_costs"][date] = cost
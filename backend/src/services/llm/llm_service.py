@@ -337,6 +337,7 @@ class LLMService:
         max_tokens: Optional[int] = None,
         use_cache: bool = True,
         trim_context: bool = True,
+        daily_cost_limit: Optional[float] = None,
     ) -> LLMResponse:
         """
         Generate a completion with rate limiting, caching, and context management.
@@ -350,6 +351,8 @@ class LLMService:
             max_tokens: Maximum tokens to generate
             use_cache: Whether to use cache
             trim_context: Whether to trim context
+            daily_cost_limit: User's daily cost limit to check the tracked cost
+                against (None to skip the check)
 
         Returns:
             LLMResponse object
@@ -416,6 +419,7 @@ class LLMService:
             if not response.cached and response.cost_usd:
                 try:
                     from .cost_tracker import CostTracker
+                    from src.config import settings
                     from src.utils.redis_client import get_redis
 
                     redis = get_redis()
@@ -426,10 +430,14 @@ class LLMService:
                     if hasattr(request, "operation_type"):
                         operation_type = request.operation_type
 
+                    # The limit is checked in the same script that records
+                    # the cost, which logs the user crossing it
                     await cost_tracker.track_cost(
                         user_id=int(user_id),
                         operation_type=operation_type,
-                        cost=response.cost_usd
+                        cost=response.cost_usd,
+                        daily_limit=daily_cost_limit,
+                        warning_threshold=settings.cost_warning_threshold,
                     )
                 except Exception as error:
                     # Don't fail the request if cost tracking fails
@@ -477,6 +485,7 @@ class LLMService:
         recent_topics: List[str],
         difficulty: str,
         estimated_time: int = 30,
+        daily_cost_limit: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Generate a personalized coding exercise using LLM.
@@ -489,6 +498,8 @@ class LLMService:
             recent_topics: Recently covered topics to avoid repetition
             difficulty: Target difficulty level
             estimated_time: Estimated completion time in minutes
+            daily_cost_limit: User's daily cost limit to check the tracked cost
+                against (None to skip the check)
 
         Returns:
             Dictionary with exercise data:
@@ -547,6 +558,7 @@ Ensure all fields are filled appropriately for a {difficulty} level {language} e
             system_prompt=system_prompt,
             temperature=0.8,  # Higher creativity for exercise generation
             max_tokens=2000,
+            daily_cost_limit=daily_cost_limit,
         )
 
         # Parse JSON response
@@ -607,6 +619,7 @@ Ensure all fields are filled appropriately for a {difficulty} level {language} e
         student_question: Optional[str],
         skill_level: str,
         hints_count: int,
+        daily_cost_limit: Optional[float] = None,
     ) -> str:
         """
         Generate a contextual hint for an exercise without revealing the solution.
@@ -618,6 +631,8 @@ Ensure all fields are filled appropriately for a {difficulty} level {language} e
             student_question: Student's specific question (if any)
             skill_level: User's skill level
             hints_count: Number of hints already given
+            daily_cost_limit: User's daily cost limit to check the tracked cost
+                against (None to skip the check)
 
         Returns:
             Hint text as string
@@ -653,6 +668,7 @@ Ensure all fields are filled appropriately for a {difficulty} level {language} e
             system_prompt=system_prompt,
             temperature=0.7,  # Balanced creativity
             max_tokens=500,
+            daily_cost_limit=daily_cost_limit,
         )
 
         return response.content
@@ -664,6 +680,7 @@ Ensure all fields are filled appropriately for a {difficulty} level {language} e
         student_code: str,
         skill_level: str,
         learning_style: Optional[str] = None,
+        daily_cost_limit: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Evaluate a student's code submission and provide feedback.
@@ -674,6 +691,8 @@ Ensure all fields are filled appropriately for a {difficulty} level {language} e
             student_code: Student's submitted code
             skill_level: User's skill level
             learning_style: User's preferred learning style (optional)
+            daily_cost_limit: User's daily cost limit to check the tracked cost
+                against (None to skip the check)
 
         Returns:
             Dictionary with evaluation results:
@@ -732,6 +751,7 @@ Be encouraging and constructive in your feedback."""
             system_prompt=system_prompt,
             temperature=0.6,  # Lower temperature for consistent evaluation
             max_tokens=1000,
+            daily_cost_limit=daily_cost_limit,
         )
 
         # Parse JSON response
@@ -13,12 +13,16 @@ Integrates with Prometheus for metrics export.
 OPS-1 Work Stream: Production Monitoring Setup
 """
 
+import os
 import time
-from typing import Dict, Any, List, Optional
-from collections import defaultdict, deque
+import logging
+import heapq
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+from collections import defaultdict
 from datetime import datetime, timedelta
 import statistics
 
+from hdrh.histogram import HdrHistogram
 from prometheus_client import (
     Counter,
     Histogram,
@@ -26,6 +30,7 @@ from prometheus_client import (
     Summary,
     CollectorRegistry,
     generate_latest,
+    multiprocess,
     CONTENT_TYPE_LATEST
 )
 
@@ -35,6 +40,116 @@ from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Latency histograms record integer microseconds from 1us up to 60s with
+# 2 significant digits, so percentiles are within 1% of the true value.
+# 32-bit counts are plenty for one window slot and halve each slot's size.
+LATENCY_HISTOGRAM_MIN_US = 1
+LATENCY_HISTOGRAM_MAX_US = 60_000_000
+LATENCY_HISTOGRAM_SIGNIFICANT_DIGITS = 2
+LATENCY_HISTOGRAM_WORD_SIZE = 4
+
+# Latency percentiles cover the last minute, split into 6 rotating slots
+LATENCY_WINDOW_SECONDS = 60
+LATENCY_WINDOW_SLOTS = 6
+
+# Archived daily cost totals are kept for one week
+COST_ARCHIVE_DAYS = 7
+
+# Number of slowest queries kept for get_slow_queries()
+SLOW_QUERY_TOP_K = 100
+
+# Users idle for longer than a day are dropped from activity tracking, and the
+# active_users gauge is refreshed at most once per interval outside scrapes
+ACTIVE_USER_RETENTION_SECONDS = 24 * 60 * 60
+ACTIVE_USER_REFRESH_SECONDS = 60
+
+# Endpoint label values are route templates, capped so that unexpected paths
+# cannot create unbounded label cardinality; overflow shares one label
+MAX_ENDPOINT_LABELS = 500
+OTHER_ENDPOINT_LABEL = "__other__"
+
+# Scrapes arriving within this many seconds of each other (e.g. Kubernetes
+# and a federating Prometheus) share one serialized /metrics body
+METRICS_EXPOSITION_TTL_SECONDS = 1.0
+
+
+def _new_latency_histogram() -> HdrHistogram:
+    """Create an empty latency histogram."""
+    return HdrHistogram(
+        LATENCY_HISTOGRAM_MIN_US,
+        LATENCY_HISTOGRAM_MAX_US,
+        LATENCY_HISTOGRAM_SIGNIFICANT_DIGITS,
+        word_size=LATENCY_HISTOGRAM_WORD_SIZE
+    )
+
+
+class SlidingWindowHistogram:
+    """
+    Latency histogram covering only the most recent time window.
+
+    The window is split into fixed time slots, each its own HdrHistogram.
+    A slot is cleared lazily when the clock comes back around to it, so
+    old samples age out one slot at a time instead of through a wholesale
+    reset, and no background eviction task is needed. Queries merge the
+    slots that are still inside the window.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = LATENCY_WINDOW_SECONDS,
+        slots: int = LATENCY_WINDOW_SLOTS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize sliding window histogram.
+
+        Args:
+            window_seconds: Length of the window in seconds
+            slots: Number of slots the window is divided into
+            clock: Monotonic clock returning seconds
+        """
+        self.slot_seconds = window_seconds / slots
+        self._clock = clock
+        self._slots = [_new_latency_histogram() for _ in range(slots)]
+        self._slot_epochs: List[Optional[int]] = [None] * slots
+
+    def _current_epoch(self) -> int:
+        return int(self._clock() // self.slot_seconds)
+
+    def record_value(self, value_us: int):
+        """Record one latency value in microseconds in the current slot."""
+        epoch = self._current_epoch()
+        index = epoch % len(self._slots)
+
+        if self._slot_epochs[index] != epoch:
+            self._slots[index].reset()
+            self._slot_epochs[index] = epoch
+
+        self._slots[index].record_value(value_us)
+
+    def record_seconds(self, duration_seconds: float):
+        """Record one latency in seconds, clamped to the histogram's range."""
+        duration_us = int(duration_seconds * 1_000_000)
+        self.record_value(
+            min(max(duration_us, LATENCY_HISTOGRAM_MIN_US), LATENCY_HISTOGRAM_MAX_US)
+        )
+
+    def snapshot(self) -> HdrHistogram:
+        """
+        Merge the slots inside the window into one histogram.
+
+        Returns:
+            New HdrHistogram holding only samples from the current window
+        """
+        oldest_epoch = self._current_epoch() - len(self._slots) + 1
+        merged = _new_latency_histogram()
+
+        for slot, epoch in zip(self._slots, self._slot_epochs):
+            if epoch is not None and epoch >= oldest_epoch:
+                merged.add(slot)
+
+        return merged
+
 
 class MetricsCollector:
     """
@@ -108,12 +223,14 @@ class MetricsCollector:
         self.database_pool_size = Gauge(
             'database_pool_size',
             'Database connection pool size',
+            multiprocess_mode='livesum',  # Each worker owns its own pool
             registry=self.registry
         )
 
         self.database_active_connections = Gauge(
             'database_active_connections',
             'Number of active database connections',
+            multiprocess_mode='livesum',
             registry=self.registry
         )
 
@@ -121,6 +238,7 @@ class MetricsCollector:
         self.active_users = Gauge(
             'active_users',
             'Number of active users in last hour',
+            multiprocess_mode='livemax',  # Workers see overlapping users
             registry=self.registry
         )
 
@@ -132,9 +250,23 @@ class MetricsCollector:
         )
 
         # Internal tracking for calculations
-        self.user_daily_costs = defaultdict(lambda: defaultdict(float))  # {user_id: {date: cost}}
-        self.user_activity_timestamps = defaultdict(list)  # {user_id: [timestamps]}
-        self.slow_queries = deque(maxlen=100)  # Keep last 100 slow queries
+        self.user_daily_costs = defaultdict(float)  # {user_id: cost} for cost_day
+        self.user_cost_archive = defaultdict(dict)  # {user_id: {date: cost}} for past days
+        self.cost_day = datetime.now().date().isoformat()
+        self.user_last_activity: Dict[int, float] = {}  # {user_id: last activity timestamp}
+        self._active_users_refreshed_at = 0.0
+        # Last /metrics body as (monotonic time generated, body)
+        self._exposition_cache: Optional[Tuple[float, bytes]] = None
+        # Slowest SLOW_QUERY_TOP_K slow queries as a min-heap of
+        # (duration, timestamp, query_type): fixed memory, O(log K) insert
+        self.slow_queries: List[Tuple[float, float, str]] = []
+        # Per-endpoint latency distribution over the last minute, in fixed
+        # logarithmic buckets: constant memory per endpoint and O(1) insert
+        self.latency_histograms: Dict[str, SlidingWindowHistogram] = defaultdict(SlidingWindowHistogram)
+        self.endpoint_labels: Set[str] = set()
+        # Labelled (histogram, counter) children per (method, endpoint, status),
+        # so the request path skips .labels() resolution after the first hit
+        self._request_metric_children: Dict[Tuple[str, str, int], Tuple[Any, Any]] = {}
 
         logger.info("Metrics collector initialized with Prometheus client")
 
@@ -149,34 +281,46 @@ class MetricsCollector:
         Record HTTP request latency.
 
         Args:
-            endpoint: API endpoint path (e.g., "/api/exercises/daily")
+            endpoint: API route template (e.g., "/api/exercises/<int:exercise_id>")
             method: HTTP method (GET, POST, etc.)
             status_code: HTTP status code (200, 404, etc.)
             duration_seconds: Request duration in seconds
         """
-        # Record histogram
-        self.http_request_duration.labels(
-            method=method,
-            endpoint=endpoint,
-            status=str(status_code)
-        ).observe(duration_seconds)
-
-        # Increment counter
-        self.http_requests_total.labels(
-            method=method,
-            endpoint=endpoint,
-            status=str(status_code)
-        ).inc()
-
-        logger.debug(
-            "Request latency recorded",
-            extra={
-                "endpoint": endpoint,
-                "method": method,
-                "status": status_code,
-                "duration_ms": duration_seconds * 1000
-            }
-        )
+        if endpoint not in self.endpoint_labels:
+            if len(self.endpoint_labels) >= MAX_ENDPOINT_LABELS:
+                endpoint = OTHER_ENDPOINT_LABEL
+            else:
+                self.endpoint_labels.add(endpoint)
+
+        key = (method, endpoint, status_code)
+        children = self._request_metric_children.get(key)
+        if children is None:
+            labels = {"method": method, "endpoint": endpoint, "status": str(status_code)}
+            children = (
+                self.http_request_duration.labels(**labels),
+                self.http_requests_total.labels(**labels),
+            )
+            self._request_metric_children[key] = children
+
+        # Record histogram and increment counter
+        duration_child, count_child = children
+        duration_child.observe(duration_seconds)
+        count_child.inc()
+
+        # Record in the endpoint's percentile histogram
+        self.latency_histograms[endpoint].record_seconds(duration_seconds)
+
+        # Skip building the log extras on every request unless they are emitted
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Request latency recorded",
+                extra={
+                    "endpoint": endpoint,
+                    "method": method,
+                    "status": status_code,
+                    "duration_ms": duration_seconds * 1000
+                }
+            )
 
     def record_llm_cost(
         self,
@@ -217,9 +361,10 @@ class MetricsCollector:
             status="success"
         ).inc()
 
-        # Track daily cost internally
-        today = datetime.now().date().isoformat()
-        self.user_daily_costs[user_id][today] += cost_usd
+        # Track daily cost internally (archiving yesterday's totals if the day rolled over)
+        if datetime.now().date().isoformat() != self.cost_day:
+            self.snapshot_and_archive()
+        self.user_daily_costs[user_id] += cost_usd
 
         logger.debug(
             "LLM cost recorded",
@@ -250,11 +395,11 @@ class MetricsCollector:
         ).observe(duration_seconds)
 
         if is_slow:
-            self.slow_queries.append({
-                "query_type": query_type,
-                "duration": duration_seconds,
-                "timestamp": time.time()
-            })
+            entry = (duration_seconds, time.time(), query_type)
+            if len(self.slow_queries) < SLOW_QUERY_TOP_K:
+                heapq.heappush(self.slow_queries, entry)
+            elif entry > self.slow_queries[0]:
+                heapq.heapreplace(self.slow_queries, entry)
 
         logger.debug(
             "Database query recorded",
@@ -305,11 +450,16 @@ class MetricsCollector:
             user_id: User ID
             activity_type: Type of activity (login, exercise_completion, etc.)
         """
-        timestamp = time.time()
-        self.user_activity_timestamps[user_id].append(timestamp)
+        # Only the latest activity decides whether a user is active
+        now = time.time()
+        self.user_last_activity[user_id] = now
 
-        # Update active users count
-        self._update_active_users_count()
+        # Evicting idle users and recounting is O(users), so it runs once per
+        # refresh interval instead of on every event
+        if now - self._active_users_refreshed_at >= ACTIVE_USER_REFRESH_SECONDS:
+            self._evict_idle_users(now)
+            self._update_active_users_count()
+            self._active_users_refreshed_at = now
 
         logger.debug(
             "User activity recorded",
@@ -348,8 +498,9 @@ class MetricsCollector:
         Returns:
             Total cost in USD for today
         """
-        today = datetime.now().date().isoformat()
-        return self.user_daily_costs[user_id].get(today, 0.0)
+        if datetime.now().date().isoformat() != self.cost_day:
+            return 0.0
+        return self.user_daily_costs.get(user_id, 0.0)
 
     def get_user_cost_history(self, user_id: int, days: int = 7) -> List[Dict[str, Any]]:
         """
@@ -365,7 +516,9 @@ class MetricsCollector:
         history = []
         for i in range(days):
             date = (datetime.now().date() - timedelta(days=i)).isoformat()
-            cost = self.user_daily_costs[user_id].get(date, 0.0)
+            cost = self.user_cost_archive.get(user_id, {}).get(date, 0.0)
+            if date == self.cost_day:
+                cost += self.user_daily_costs.get(user_id, 0.0)
             history.append({"date": date, "cost": cost})
 
         return history
@@ -382,22 +535,19 @@ class MetricsCollector:
         """
         cutoff_time = time.time() - (time_window_minutes * 60)
 
-        active_users = set()
-        for user_id, timestamps in self.user_activity_timestamps.items():
-            # Check if user has any activity in time window
-            if any(ts >= cutoff_time for ts in timestamps):
-                active_users.add(user_id)
-
-        return len(active_users)
+        return sum(1 for last_seen in self.user_last_activity.values() if last_seen >= cutoff_time)
 
     def get_slow_queries(self) -> List[Dict[str, Any]]:
         """
-        Get recent slow queries.
+        Get the slowest recorded slow queries.
 
         Returns:
-            List of slow query dictionaries
+            List of slow query dictionaries, slowest first
         """
-        return list(self.slow_queries)
+        return [
+            {"query_type": query_type, "duration": duration, "timestamp": timestamp}
+            for duration, timestamp, query_type in sorted(self.slow_queries, reverse=True)
+        ]
 
     def get_latency_histogram(self, endpoint: str) -> Optional[Dict[str, Any]]:
         """
@@ -409,9 +559,22 @@ class MetricsCollector:
         Returns:
             Histogram data or None if no data
         """
-        # This would return actual histogram data from Prometheus
-        # For now, return placeholder
-        return {"endpoint": endpoint, "histogram": "data"}
+        window = self.latency_histograms.get(endpoint)
+        if window is None:
+            return None
+
+        histogram = window.snapshot()
+        if histogram.get_total_count() == 0:
+            return None
+
+        return {
+            "endpoint": endpoint,
+            "count": histogram.get_total_count(),
+            "min": histogram.get_min_value() / 1_000_000,
+            "max": histogram.get_max_value() / 1_000_000,
+            "mean": histogram.get_mean_value() / 1_000_000,
+            **self._percentiles(histogram)
+        }
 
     def get_latency_percentiles(self, endpoint: str) -> Dict[str, float]:
         """
@@ -421,14 +584,21 @@ class MetricsCollector:
             endpoint: API endpoint path
 
         Returns:
-            Dictionary with p50, p95, p99 percentiles
+            Dictionary with p50, p95, p99 percentiles in seconds over the last minute
         """
-        # In production, this would query Prometheus
-        # For now, return placeholder
+        window = self.latency_histograms.get(endpoint)
+        if window is None:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+        return self._percentiles(window.snapshot())
+
+    @staticmethod
+    def _percentiles(histogram: HdrHistogram) -> Dict[str, float]:
+        """Read p50, p95 and p99 in seconds from a microsecond histogram."""
         return {
-            "p50": 0.0,
-            "p95": 0.0,
-            "p99": 0.0
+            "p50": histogram.get_value_at_percentile(50) / 1_000_000,
+            "p95": histogram.get_value_at_percentile(95) / 1_000_000,
+            "p99": histogram.get_value_at_percentile(99) / 1_000_000
         }
 
     def get_metrics(self) -> Dict[str, Any]:
@@ -454,43 +624,88 @@ class MetricsCollector:
         """Reset all metrics (for testing)."""
         # Clear internal tracking
         self.user_daily_costs.clear()
-        self.user_activity_timestamps.clear()
+        self.user_cost_archive.clear()
+        self.user_last_activity.clear()
+        self._active_users_refreshed_at = 0.0
         self.slow_queries.clear()
+        self.latency_histograms.clear()
+        self.endpoint_labels.clear()
+        self._request_metric_children.clear()
+        self._exposition_cache = None
 
         logger.debug("Metrics collector reset")
 
-    def reset_daily_metrics(self):
+    def snapshot_and_archive(self):
         """
-        Reset daily metrics (called at midnight).
+        Archive the current day's cost totals (called at midnight).
 
-        This keeps historical data but resets daily counters.
+        Live per-user totals move into the dated archive and start again
+        from zero; nothing is discarded except archive days older than
+        COST_ARCHIVE_DAYS. Prometheus counters are never reset, so rate()
+        over them stays correct across the rollover.
         """
-        # Remove old daily cost data (keep last 7 days)
-        cutoff_date = (datetime.now().date() - timedelta(days=7)).isoformat()
+        for user_id, cost in self.user_daily_costs.items():
+            archived = self.user_cost_archive[user_id]
+            archived[self.cost_day] = archived.get(self.cost_day, 0.0) + cost
+
+        self.user_daily_costs.clear()
+        self.cost_day = datetime.now().date().isoformat()
 
-        for user_id in list(self.user_daily_costs.keys()):
-            dates_to_remove = [
-                date for date in self.user_daily_costs[user_id]
-                if date < cutoff_date
-            ]
-            for date in dates_to_remove:
-                del self.user_daily_costs[user_id][date]
+        # Drop archived days outside the retention window
+        cutoff_date = (datetime.now().date() - timedelta(days=COST_ARCHIVE_DAYS)).isoformat()
+        for user_id in list(self.user_cost_archive.keys()):
+            archived = self.user_cost_archive[user_id]
+            for date in [date for date in archived if date < cutoff_date]:
+                del archived[date]
+            if not archived:
+                del self.user_cost_archive[user_id]
 
-        logger.info("Daily metrics reset")
+        logger.info("Daily metrics archived")
 
     def _update_active_users_count(self):
         """Update the active users gauge metric."""
         active_count = self.get_active_users_count(time_window_minutes=60)
         self.active_users.set(active_count)
 
+    def _evict_idle_users(self, now: float):
+        """Drop users whose last activity is older than the retention period."""
+        cutoff_time = now - ACTIVE_USER_RETENTION_SECONDS
+        self.user_last_activity = {
+            user_id: last_seen
+            for user_id, last_seen in self.user_last_activity.items()
+            if last_seen >= cutoff_time
+        }
+
     def generate_prometheus_metrics(self) -> bytes:
         """
         Generate Prometheus metrics in text format.
 
+        Serializing every histogram bucket is the expensive part of a
+        scrape, so a body is reused for METRICS_EXPOSITION_TTL_SECONDS.
+
         Returns:
             Metrics in Prometheus text format
         """
-        return generate_latest(self.registry)
+        now = time.monotonic()
+        if self._exposition_cache is not None:
+            generated_at, body = self._exposition_cache
+            if now - generated_at < METRICS_EXPOSITION_TTL_SECONDS:
+                return body
+
+        self._update_active_users_count()
+
+        # With several workers, each one writes its samples to mmap files in
+        # PROMETHEUS_MULTIPROC_DIR; aggregate them all rather than reporting
+        # only the worker that happened to serve this scrape
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            body = generate_latest(registry)
+        else:
+            body = generate_latest(self.registry)
+
+        self._exposition_cache = (now, body)
+        return body
 
     def get_content_type(self) -> str:
         """
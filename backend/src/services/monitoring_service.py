@@ -17,22 +17,70 @@ OPS-1 Work Stream: Production Monitoring Setup
 """
 
 import time
+import random
 import logging
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+from urllib.parse import urlsplit
 import asyncio
 
 import sentry_sdk
 from sentry_sdk.integrations.asyncio import AsyncioIntegration
 from sentry_sdk.integrations.logging import LoggingIntegration
+from sentry_sdk.transport import Transport
 
 from src.config import settings
+from src.services.metrics_collector import SlidingWindowHistogram
 from src.utils.logger import get_logger
 
 
 logger = get_logger(__name__)
 
+# Events waiting on Sentry's background transport worker. The SDK default
+# (100) overflows during error bursts; once full, new events are dropped and
+# counted in Sentry's client reports instead of blocking request handlers.
+SENTRY_TRANSPORT_QUEUE_SIZE = 1000
+
+# Expected or transient errors that are never worth a Sentry event
+DROPPED_EXCEPTION_TYPES = frozenset({
+    "ValidationError",
+    "NotFound",
+    "ConnectionResetError",
+    "RateLimitError",
+    "TooManyRequests",  # HTTP 429
+})
+
+# Repeats of one (exception type, route) fingerprint are rate limited with a
+# token bucket: bursts of up to 5 events, then 1 event per second
+EVENT_BURST = 5
+EVENT_RATE_PER_SECOND = 1.0
+
+# Fingerprints with a token bucket kept at once; the least recently used is
+# evicted beyond this, and simply starts over with a full bucket if it recurs
+MAX_EVENT_BUCKETS = 1000
+
+# Health check probes run constantly, so only 0.1% of their errors are sent
+HEALTH_CHECK_SAMPLE_RATE = 0.001
+
+# Paths of the health check routes (app-level and the health blueprint)
+HEALTH_CHECK_PATHS = frozenset({
+    "/health",
+    "/api/health",
+    "/api/health/",
+    "/api/health/ready",
+    "/api/health/live",
+})
+
+# Alert thresholds are evaluated by one background task on this interval;
+# recording errors and latencies never evaluates them inline
+ALERT_CHECK_INTERVAL_SECONDS = 10
+
+# Error rate and P95 latency are both measured over the last minute, so
+# once an alert is sent the same (type, key) is not alerted again until
+# that window has moved past the condition that triggered it
+ALERT_COOLDOWN_SECONDS = 60
+
 
 class MonitoringService:
     """
@@ -56,7 +104,8 @@ class MonitoringService:
         sentry_dsn: Optional[str] = None,
         environment: Optional[str] = None,
         sample_rate: float = 1.0,
-        enable_performance: bool = True
+        enable_performance: bool = True,
+        transport: Optional[Transport] = None
     ):
         """
         Initialize monitoring service.
@@ -66,13 +115,24 @@ class MonitoringService:
             environment: Environment name (production, staging, development)
             sample_rate: Percentage of events to capture (0.0 to 1.0)
             enable_performance: Whether to enable performance monitoring
+            transport: Sentry transport override (default sends over HTTP)
         """
         self.environment = environment or settings.app_env
         self.sentry_enabled = sentry_dsn is not None or self._should_enable_sentry()
 
         # Error tracking for alert thresholds
         self.error_counts = defaultdict(lambda: deque(maxlen=100))
-        self.request_latencies = defaultdict(lambda: deque(maxlen=1000))
+        # Per-endpoint latency over the last minute, in HdrHistogram slots
+        self.request_latencies: Dict[str, SlidingWindowHistogram] = defaultdict(SlidingWindowHistogram)
+
+        # Background task running check_alert_thresholds periodically
+        self._alert_task: Optional[asyncio.Task] = None
+        # When each alert was last sent: {(type, error type or endpoint): time}
+        self._last_alert_times: Dict[tuple, float] = {}
+
+        # Token buckets per Sentry event fingerprint, least recently used
+        # first: {(type, route): [tokens, last_refill]}
+        self._event_buckets: "OrderedDict[tuple, List[float]]" = OrderedDict()
 
         # Alert thresholds
         self.alert_thresholds = {
@@ -82,7 +142,7 @@ class MonitoringService:
         }
 
         if self.sentry_enabled:
-            self._initialize_sentry(sentry_dsn, sample_rate, enable_performance)
+            self._initialize_sentry(sentry_dsn, sample_rate, enable_performance, transport)
             logger.info(
                 "Monitoring service initialized with Sentry",
                 extra={"environment": self.environment}
@@ -107,7 +167,8 @@ class MonitoringService:
         self,
         sentry_dsn: Optional[str],
         sample_rate: float,
-        enable_performance: bool
+        enable_performance: bool,
+        transport: Optional[Transport] = None
     ):
         """
         Initialize Sentry SDK with appropriate integrations.
@@ -116,6 +177,7 @@ class MonitoringService:
             sentry_dsn: Sentry DSN from configuration
             sample_rate: Percentage of events to capture
             enable_performance: Whether to enable performance monitoring
+            transport: Sentry transport override (default sends over HTTP)
         """
         # Get DSN from config if not provided
         dsn = sentry_dsn or getattr(settings, 'sentry_dsn', None)
@@ -148,6 +210,10 @@ class MonitoringService:
             attach_stacktrace=True,  # Always attach stack traces
             max_breadcrumbs=50,  # Keep last 50 breadcrumbs
             before_send=self._before_send_sentry_event,
+            # Capture only enqueues; sending happens on the SDK's worker thread
+            transport_queue_size=SENTRY_TRANSPORT_QUEUE_SIZE,
+            send_client_reports=True,  # Report events dropped on overflow
+            transport=transport,
         )
 
         logger.info("Sentry initialized successfully", extra={"dsn": dsn[:20] + "..."})
@@ -172,19 +238,61 @@ class MonitoringService:
         Returns:
             Modified event or None to drop the event
         """
-        # Add application metadata
-        event.setdefault("tags", {})
-        event["tags"]["app_name"] = settings.app_name
-
         # Filter out expected errors that shouldn't alert
+        exc_type_name = None
         if "exc_info" in hint:
             exc_type, exc_value, tb = hint["exc_info"]
+            exc_type_name = exc_type.__name__
             # Don't send certain expected exceptions
-            if exc_type.__name__ in ["ValidationError", "NotFound"]:
+            if exc_type_name in DROPPED_EXCEPTION_TYPES:
                 return None
 
+        route = event.get("transaction") or event.get("request", {}).get("url", "")
+
+        # Sample noisy health check errors. The route is a transaction name
+        # or a full request URL, so compare its path only
+        if urlsplit(route).path in HEALTH_CHECK_PATHS and random.random() >= HEALTH_CHECK_SAMPLE_RATE:
+            return None
+
+        # Rate limit repeats of the same error on the same route
+        if exc_type_name and not self._take_event_token((exc_type_name, route)):
+            return None
+
+        # Add application metadata
+        event.setdefault("tags", {})
+        event["tags"]["app_name"] = settings.app_name
+
         return event
 
+    def _take_event_token(self, fingerprint: tuple) -> bool:
+        """
+        Take one token from the fingerprint's bucket, refilling it first.
+
+        Args:
+            fingerprint: (exception type, route) key
+
+        Returns:
+            True if the event may be sent, False if the bucket is empty
+        """
+        now = time.monotonic()
+        bucket = self._event_buckets.get(fingerprint)
+        if bucket is None:
+            bucket = self._event_buckets[fingerprint] = [float(EVENT_BURST), now]
+            if len(self._event_buckets) > MAX_EVENT_BUCKETS:
+                self._event_buckets.popitem(last=False)
+        else:
+            self._event_buckets.move_to_end(fingerprint)
+
+        tokens = min(EVENT_BURST, bucket[0] + (now - bucket[1]) * EVENT_RATE_PER_SECOND)
+        bucket[1] = now
+
+        if tokens < 1.0:
+            bucket[0] = tokens
+            return False
+
+        bucket[0] = tokens - 1.0
+        return True
+
     def capture_exception(
         self,
         exception: Exception,
@@ -208,6 +316,14 @@ class MonitoringService:
             )
             return
 
+        # Track for alert thresholds
+        self.error_counts[type(exception).__name__].append(time.time())
+
+        # Skip building a Sentry payload (stack trace, context) for errors
+        # before_send would drop anyway
+        if type(exception).__name__ in DROPPED_EXCEPTION_TYPES:
+            return
+
         # Set context if provided
         if context:
             sentry_sdk.set_context("custom", context)
@@ -218,9 +334,6 @@ class MonitoringService:
         # Capture the exception
         sentry_sdk.capture_exception(exception)
 
-        # Track for alert thresholds
-        self.error_counts[type(exception).__name__].append(time.time())
-
         logger.debug(
             "Exception captured by Sentry",
             extra={
@@ -265,7 +378,7 @@ class MonitoringService:
 
         logger.debug(
             "Message captured by Sentry",
-            extra={"level": level, "message": message[:50]}
+            extra={"level": level, "alert_message": message[:50]}
         )
 
     def record_error(
@@ -286,7 +399,7 @@ class MonitoringService:
 
         logger.warning(
             f"Error recorded: {error_type}",
-            extra={"message": message, "context": context}
+            extra={"error_message": message, "context": context}
         )
 
     def record_request_latency(
@@ -301,10 +414,7 @@ class MonitoringService:
             endpoint: API endpoint path
             latency_seconds: Request duration in seconds
         """
-        self.request_latencies[endpoint].append({
-            "timestamp": time.time(),
-            "latency": latency_seconds
-        })
+        self.request_latencies[endpoint].record_seconds(latency_seconds)
 
     def record_llm_cost(
         self,
@@ -329,8 +439,9 @@ class MonitoringService:
         """
         Check if any alert thresholds have been exceeded.
 
-        This method should be called periodically (e.g., every minute)
-        to check for alert conditions.
+        Run every ALERT_CHECK_INTERVAL_SECONDS by the alert task. Each check
+        looks at the last minute, so an alert is sent at most once per
+        ALERT_COOLDOWN_SECONDS for the same error type or endpoint.
         """
         current_time = time.time()
         one_minute_ago = current_time - 60
@@ -341,7 +452,7 @@ class MonitoringService:
             recent_errors = sum(1 for ts in timestamps if ts >= one_minute_ago)
 
             if recent_errors >= self.alert_thresholds["error_rate_per_minute"]:
-                self.send_alert({
+                self._send_alert_once(("high_error_rate", error_type), current_time, {
                     "type": "high_error_rate",
                     "error_type": error_type,
                     "error_count": recent_errors,
@@ -350,17 +461,16 @@ class MonitoringService:
                 })
 
         # Check P95 latency
-        for endpoint, latencies in self.request_latencies.items():
-            if len(latencies) < 20:  # Need enough samples
+        for endpoint, window in self.request_latencies.items():
+            histogram = window.snapshot()
+            if histogram.get_total_count() < 20:  # Need enough samples
                 continue
 
-            # Calculate P95
-            sorted_latencies = sorted([l["latency"] for l in latencies])
-            p95_index = int(len(sorted_latencies) * 0.95)
-            p95_latency = sorted_latencies[p95_index]
+            # Read P95 from the histogram instead of sorting raw samples
+            p95_latency = histogram.get_value_at_percentile(95) / 1_000_000
 
             if p95_latency >= self.alert_thresholds["p95_latency_seconds"]:
-                self.send_alert({
+                self._send_alert_once(("high_latency", endpoint), current_time, {
                     "type": "high_latency",
                     "endpoint": endpoint,
                     "p95_latency": p95_latency,
@@ -368,6 +478,50 @@ class MonitoringService:
                     "severity": "warning"
                 })
 
+    def _send_alert_once(self, alert_key: tuple, current_time: float, alert_data: Dict[str, Any]):
+        """Send an alert unless the same alert was sent within the cooldown."""
+        last_sent = self._last_alert_times.get(alert_key)
+        if last_sent is not None and current_time - last_sent < ALERT_COOLDOWN_SECONDS:
+            return
+
+        self._last_alert_times[alert_key] = current_time
+        self.send_alert(alert_data)
+
+    def start_alert_checks(self, interval_seconds: float = ALERT_CHECK_INTERVAL_SECONDS):
+        """
+        Start evaluating alert thresholds periodically on the running loop.
+
+        Args:
+            interval_seconds: Seconds between threshold checks
+        """
+        if self._alert_task is None or self._alert_task.done():
+            self._alert_task = asyncio.create_task(self._alert_loop(interval_seconds))
+
+    async def stop_alert_checks(self):
+        """Stop the periodic alert threshold task, if running."""
+        if self._alert_task is None:
+            return
+
+        self._alert_task.cancel()
+        try:
+            await self._alert_task
+        except asyncio.CancelledError:
+            pass
+        self._alert_task = None
+
+    async def _alert_loop(self, interval_seconds: float):
+        """Run check_alert_thresholds every interval until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.check_alert_thresholds()
+            except Exception as exception:
+                logger.error(
+                    "Alert threshold check failed",
+                    exc_info=True,
+                    extra={"exception": str(exception)}
+                )
+
     def send_alert(self, alert_data: Dict[str, Any]):
         """
         Send an alert (placeholder for actual alerting system).
@@ -12,7 +12,7 @@ This service handles:
 - Progress data export
 """
 from datetime import datetime, timedelta, date
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
 from sqlalchemy import select, and_, or_, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 import csv
@@ -27,10 +27,37 @@ from src.models.achievement import (
     SkillLevel,
     AchievementCategory
 )
+from src.services.cache_service import CacheService, get_cache_service
 from src.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Achievement category -> user metric that counts toward it. Categories
+# without a tracked metric yet (GitHub, community, skill) report 0.
+ACHIEVEMENT_METRICS = {
+    AchievementCategory.STREAK: lambda user: user.current_streak,
+    AchievementCategory.EXERCISE: lambda user: user.exercises_completed,
+}
+
+# Whether the cache being unavailable was already logged as a warning;
+# repeats are logged at debug level until the cache is available again
+_cache_unavailable_warned = False
+
+
+def _get_cache_service() -> Optional[CacheService]:
+    """Get the cache service, or None when Redis is not available."""
+    global _cache_unavailable_warned
+    try:
+        cache_service = get_cache_service()
+    except Exception as error:
+        log = logger.debug if _cache_unavailable_warned else logger.warning
+        log("Cache unavailable, using the database", extra={"error": str(error)})
+        _cache_unavailable_warned = True
+        return None
+
+    _cache_unavailable_warned = False
+    return cache_service
+
 
 class ProgressService:
     """Service for managing user progress tracking and achievements."""
@@ -216,23 +243,8 @@ class ProgressService:
 
     def _get_current_metric_value(self, user: User, achievement: Achievement) -> int:
         """Get current value of metric for achievement."""
-        category = achievement.category
-
-        if category == AchievementCategory.STREAK:
-            return user.current_streak
-        elif category == AchievementCategory.EXERCISE:
-            return user.exercises_completed
-        elif category == AchievementCategory.GITHUB:
-            # Future: track GitHub reviews
-            return 0
-        elif category == AchievementCategory.COMMUNITY:
-            # Future: track community participation
-            return 0
-        elif category == AchievementCategory.SKILL:
-            # Future: track skill mastery
-            return 0
-        else:
-            return 0
+        metric = ACHIEVEMENT_METRICS.get(achievement.category)
+        return metric(user) if metric else 0
 
     async def check_and_unlock_achievements(self, user_id: int) -> List[str]:
         """
@@ -422,25 +434,17 @@ class ProgressService:
         if date_filter:
             base_conditions.append(UserExercise.completed_at >= date_filter)
 
-        # Average grade
-        stmt = select(func.avg(UserExercise.grade)).where(and_(*base_conditions))
-        result = await self.session.execute(stmt)
-        avg_grade = result.scalar() or 0.0
-
-        # Average time per exercise
-        stmt = select(func.avg(UserExercise.time_spent_seconds)).where(and_(*base_conditions))
-        result = await self.session.execute(stmt)
-        avg_time = result.scalar() or 0.0
-
-        # Total hints requested
-        stmt = select(func.sum(UserExercise.hints_requested)).where(and_(*base_conditions))
-        result = await self.session.execute(stmt)
-        total_hints = result.scalar() or 0
-
-        # Get exercises with details for categorization
-        stmt = select(UserExercise).where(and_(*base_conditions))
+        # Grade, time and hint aggregates in a single pass over the rows
+        stmt = select(
+            func.avg(UserExercise.grade),
+            func.avg(UserExercise.time_spent_seconds),
+            func.sum(UserExercise.hints_requested)
+        ).where(and_(*base_conditions))
         result = await self.session.execute(stmt)
-        exercises = result.scalars().all()
+        avg_grade, avg_time, total_hints = result.one()
+        avg_grade = avg_grade or 0.0
+        avg_time = avg_time or 0.0
+        total_hints = total_hints or 0
 
         # For now, return empty dicts for difficulty/type (would need join with Exercise table)
         exercises_by_difficulty = {}
@@ -593,8 +597,10 @@ class ProgressService:
         # Get all achievements (which are badges)
         achievements = await self._get_user_achievements_with_progress(user_id)
 
-        # Format as badges
+        # Format as badges, totalling earned badges in the same pass
         badges = []
+        total_earned = 0
+        points_earned = 0
         for ach in achievements:
             badge = {
                 "id": ach["id"],
@@ -609,13 +615,11 @@ class ProgressService:
 
             if ach["unlocked"]:
                 badge["earned_at"] = ach["unlocked_at"]
+                total_earned += 1
+                points_earned += ach["points"]
 
             badges.append(badge)
 
-        # Count earned badges
-        total_earned = sum(1 for b in badges if b["earned"])
-        points_earned = sum(b["points"] for b in badges if b["earned"])
-
         return {
             "badges": badges,
             "total_earned": total_earned,
@@ -639,6 +643,17 @@ class ProgressService:
         """
         logger.info("Getting skill levels for user", extra={"user_id": user_id})
 
+        cache_service = _get_cache_service()
+        if cache_service is not None:
+            cached_levels = await cache_service.get_cached_skill_levels(user_id)
+            if cached_levels is not None:
+                # Cached as ISO strings; restore the datetimes so hits and
+                # misses serialize the same
+                for level in cached_levels["skill_levels"]:
+                    if level["level_updated_at"] is not None:
+                        level["level_updated_at"] = datetime.fromisoformat(level["level_updated_at"])
+                return cached_levels
+
         stmt = select(SkillLevel).where(SkillLevel.user_id == user_id)
         result = await self.session.execute(stmt)
         skill_levels = result.scalars().all()
@@ -655,12 +670,29 @@ class ProgressService:
                 "previous_level": skill.previous_level
             })
 
-        return {"skill_levels": levels_list}
+        skill_levels = {"skill_levels": levels_list}
+        if cache_service is not None:
+            await cache_service.cache_skill_levels(user_id, {
+                "skill_levels": [
+                    {
+                        **level,
+                        "level_updated_at": (
+                            level["level_updated_at"].isoformat() if level["level_updated_at"] else None
+                        ),
+                    }
+                    for level in levels_list
+                ]
+            })
+
+        return skill_levels
 
     async def calculate_skill_level(self, user_id: int, topic: str) -> Dict[str, Any]:
         """
         Calculate and update skill level for a topic.
 
+        After committing, call invalidate_cached_skill_levels() so the
+        user's cached skill levels are dropped.
+
         Args:
             user_id: User ID
             topic: Topic to calculate for
@@ -733,6 +765,20 @@ class ProgressService:
             "progress_to_next": None  # Future enhancement
         }
 
+    async def invalidate_cached_skill_levels(self, user_id: int) -> None:
+        """
+        Drop the user's cached skill levels.
+
+        Call after committing a write to the user's skill level rows, so a
+        concurrent read cannot cache rows that are not yet committed.
+
+        Args:
+            user_id: User ID
+        """
+        cache_service = _get_cache_service()
+        if cache_service is not None:
+            await cache_service.invalidate_skill_levels(user_id)
+
     # ===================================================================
     # EXPORT
     # ===================================================================
@@ -782,19 +828,34 @@ class ProgressService:
         }
 
     async def _export_csv(self, user_id: int) -> str:
-        """Export exercise history as CSV."""
-        # Get exercise history
+        """Export exercise history as a single CSV string."""
+        return "".join([chunk async for chunk in self.stream_csv_export(user_id)])
+
+    async def stream_csv_export(
+        self,
+        user_id: int,
+        batch_size: int = 1000
+    ) -> AsyncIterator[str]:
+        """
+        Stream exercise history as CSV text chunks.
+
+        Rows are read through a server-side cursor and written out one
+        batch at a time, so memory use does not grow with history size.
+
+        Args:
+            user_id: User ID
+            batch_size: Rows fetched and serialized per chunk
+
+        Yields:
+            CSV text, header first, then one chunk per batch of rows
+        """
         stmt = select(UserExercise).where(
             and_(
                 UserExercise.user_id == user_id,
                 UserExercise.status == ExerciseStatus.COMPLETED
             )
-        ).order_by(UserExercise.completed_at)
-
-        result = await self.session.execute(stmt)
-        exercises = result.scalars().all()
+        ).order_by(UserExercise.completed_at).execution_options(yield_per=batch_size)
 
-        # Create CSV
         output = io.StringIO()
         writer = csv.writer(output)
 
@@ -808,17 +869,23 @@ class ProgressService:
             "test_cases_passed",
             "test_cases_total"
         ])
-
-        # Data rows
-        for exercise in exercises:
-            writer.writerow([
-                exercise.exercise_id,
-                exercise.completed_at.isoformat() if exercise.completed_at else "",
-                exercise.grade or "",
-                exercise.time_spent_seconds or "",
-                exercise.hints_requested,
-                exercise.test_cases_passed or "",
-                exercise.test_cases_total or ""
-            ])
-
-        return output.getvalue()
+        yield output.getvalue()
+
+        result = await self.session.stream_scalars(stmt)
+        async for exercises in result.partitions():
+            output.seek(0)
+            output.truncate(0)
+
+            # Data rows
+            for exercise in exercises:
+                writer.writerow([
+                    exercise.exercise_id,
+                    exercise.completed_at.isoformat() if exercise.completed_at else "",
+                    exercise.grade or "",
+                    exercise.time_spent_seconds or "",
+                    exercise.hints_requested,
+                    exercise.test_cases_passed or "",
+                    exercise.test_cases_total or ""
+                ])
+
+            yield output.getvalue()
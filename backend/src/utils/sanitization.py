@@ -19,9 +19,10 @@ Dependencies:
 """
 import html
 import re
-from typing import Optional
+import threading
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
-import bleach
+from bleach.sanitizer import Cleaner
 
 
 # ===================================================================
@@ -73,6 +74,8 @@ ALLOWED_MARKDOWN_TAGS = [
     'input',  # For [ ] checkboxes in markdown
 ]
 
+_ALLOWED_MARKDOWN_TAGS_NO_IMAGES = [tag for tag in ALLOWED_MARKDOWN_TAGS if tag != 'img']
+
 # Allowed attributes for HTML tags
 ALLOWED_MARKDOWN_ATTRIBUTES = {
     'a': ['href', 'title'],
@@ -85,6 +88,72 @@ ALLOWED_MARKDOWN_ATTRIBUTES = {
 # Allowed protocols for links (prevent javascript:, data:, etc.)
 ALLOWED_PROTOCOLS = ['http', 'https', 'mailto']
 
+# Characters bleach rewrites: markup, entities, and the control characters
+# (including \r) that the HTML parser replaces or normalizes
+_NEEDS_CLEANING_PATTERN = re.compile(r'[<>&\x00-\x08\x0b-\x1f]')
+
+# bleach Cleaners are not thread-safe, so each thread keeps its own
+_thread_cleaners = threading.local()
+
+
+def needs_html_cleaning(text: str) -> bool:
+    """
+    Check whether bleach would change the given text.
+
+    Plain text without markup, entities or control characters comes back
+    from bleach unchanged, so callers can skip the HTML parser entirely.
+
+    Args:
+        text: Stripped user input
+
+    Returns:
+        True if the text must go through a bleach Cleaner
+    """
+    return _NEEDS_CLEANING_PATTERN.search(text) is not None
+
+
+def get_cleaner(tags: List[str], attributes: Dict[str, List[str]], protocols: List[str]) -> Cleaner:
+    """
+    Return this thread's cached Cleaner for the given allowlists.
+
+    Building a Cleaner is far more expensive than cleaning a short text, so
+    each allowlist combination is built once per thread and reused.
+    Disallowed tags are stripped instead of escaped.
+
+    Args:
+        tags: Allowed HTML tags
+        attributes: Allowed attributes per tag
+        protocols: Allowed link protocols
+
+    Returns:
+        bleach Cleaner for the allowlists
+    """
+    cleaners = getattr(_thread_cleaners, "cleaners", None)
+    if cleaners is None:
+        cleaners = _thread_cleaners.cleaners = {}
+
+    key = (
+        tuple(tags),
+        tuple((tag, tuple(names)) for tag, names in sorted(attributes.items())),
+        tuple(protocols),
+    )
+    cleaner = cleaners.get(key)
+    if cleaner is None:
+        cleaner = cleaners[key] = Cleaner(
+            tags=tags,
+            attributes=attributes,
+            protocols=protocols,
+            strip=True  # Strip disallowed tags instead of escaping
+        )
+
+    return cleaner
+
+
+def _get_markdown_cleaner(allow_images: bool) -> Cleaner:
+    """Return this thread's cached markdown Cleaner."""
+    tags = ALLOWED_MARKDOWN_TAGS if allow_images else _ALLOWED_MARKDOWN_TAGS_NO_IMAGES
+    return get_cleaner(tags, ALLOWED_MARKDOWN_ATTRIBUTES, ALLOWED_PROTOCOLS)
+
 
 def sanitize_markdown(text: str, allow_images: bool = True) -> str:
     """
@@ -115,21 +184,12 @@ def sanitize_markdown(text: str, allow_images: bool = True) -> str:
     if not stripped:
         return ""
 
-    # Optionally remove images
-    tags = ALLOWED_MARKDOWN_TAGS.copy()
-    if not allow_images:
-        tags.remove('img')
-
-    # Use bleach to sanitize
-    sanitized = bleach.clean(
-        stripped,
-        tags=tags,
-        attributes=ALLOWED_MARKDOWN_ATTRIBUTES,
-        protocols=ALLOWED_PROTOCOLS,
-        strip=True  # Strip disallowed tags instead of escaping
-    )
+    # Plain text passes through bleach unchanged
+    if not needs_html_cleaning(stripped):
+        return stripped
 
-    return sanitized
+    # Use bleach to sanitize (images optionally removed)
+    return _get_markdown_cleaner(allow_images).clean(stripped)
 
 
 # ===================================================================
@@ -169,6 +229,37 @@ def sanitize_code(code: str, max_length: int = 50000) -> str:
 # URL Validation
 # ===================================================================
 
+# GitHub user and repository names (alphanumeric, hyphens, underscores, dots)
+_GITHUB_NAME_PATTERN = re.compile(r'^[a-zA-Z0-9._-]+$')
+
+
+def is_valid_github_repo_url(url: str) -> bool:
+    """
+    Check whether a URL points to a GitHub repository.
+
+    Boolean fast path for validate_github_url(): a single urlparse() call
+    and the same requirements, without building error messages or a
+    cleaned URL.
+
+    Args:
+        url: Candidate GitHub repository URL
+
+    Returns:
+        True if the URL is https://github.com/{user}/{repo}[.git]
+    """
+    parsed = urlparse(url)
+    if parsed.scheme != 'https' or parsed.netloc != 'github.com':
+        return False
+
+    path_parts = [p for p in parsed.path.split('/') if p]
+    if len(path_parts) < 2:
+        return False
+
+    user = path_parts[0]
+    repo = path_parts[1].replace('.git', '')
+    return bool(_GITHUB_NAME_PATTERN.match(user) and _GITHUB_NAME_PATTERN.match(repo))
+
+
 def validate_github_url(url: str) -> str:
     """
     Validate GitHub repository URL.
@@ -214,14 +305,14 @@ def validate_github_url(url: str) -> str:
     if len(path_parts) < 2:
         raise ValueError("GitHub URL must include user and repository (e.g., https://github.com/user/repo)")
 
-    # Validate user and repo names (alphanumeric, hyphens, underscores, dots)
+    # Validate user and repo names
     user = path_parts[0]
     repo = path_parts[1].replace('.git', '')  # Remove .git suffix if present
 
-    if not re.match(r'^[a-zA-Z0-9._-]+$', user):
+    if not _GITHUB_NAME_PATTERN.match(user):
         raise ValueError("Invalid GitHub username format")
 
-    if not re.match(r'^[a-zA-Z0-9._-]+$', repo):
+    if not _GITHUB_NAME_PATTERN.match(repo):
         raise ValueError("Invalid GitHub repository name format")
 
     # Reconstruct clean URL
@@ -306,6 +397,31 @@ def validate_length(text: str, min_length: int = 0, max_length: int = 10000, fie
     return stripped
 
 
+# Zero-width characters, deleted in a single str.translate() pass
+_ZERO_WIDTH_TABLE = str.maketrans('', '', '\u200b\u200c\u200d\ufeff')
+
+
+def effective_length(text: str) -> int:
+    """
+    Count the visible characters in text.
+
+    Zero-width characters are not whitespace, so str.strip() keeps them;
+    they are removed first so they cannot pad a field past its minimum
+    length or make an empty value look non-empty.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Length after removing zero-width characters and surrounding whitespace
+
+    Example:
+        >>> effective_length("\u200b hi \u200b")
+        2
+    """
+    return len(text.translate(_ZERO_WIDTH_TABLE).strip())
+
+
 def contains_zero_width_only(text: str) -> bool:
     """
     Check if text contains only zero-width characters.
@@ -329,11 +445,7 @@ def contains_zero_width_only(text: str) -> bool:
         >>> contains_zero_width_only("Hello\\u200bWorld")
         False
     """
-    # Remove all zero-width characters
-    cleaned = re.sub(r'[\u200b\u200c\u200d\ufeff]', '', text)
-
-    # If nothing left, it was all zero-width
-    return len(cleaned.strip()) == 0
+    return effective_length(text) == 0
 
 
 # ===================================================================
@@ -3,6 +3,7 @@ Pytest configuration and shared fixtures for backend tests.
 Provides database setup/teardown and test client.
 """
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -14,9 +15,47 @@ if test_env_path.exists():
 else:
     print(f"[TEST CONFIG] WARNING: .env.test not found at {test_env_path}")
 
+from urllib.parse import urlsplit, urlunsplit
 import pytest
+from sqlalchemy.engine import make_url
+
+# Under pytest-xdist every worker gets its own test database, named after
+# the worker (e.g. llm_tutor_test_gw0) and created on first use. Tables are
+# never dropped and some tests commit, so workers sharing one database would
+# collide on seeded rows and race each other's table creation. Set before
+# the app is imported so its own sessions use the worker's database too.
+BASE_DATABASE_URL = os.getenv("DATABASE_URL")
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
+if XDIST_WORKER and BASE_DATABASE_URL:
+    _base_url = make_url(BASE_DATABASE_URL)
+    os.environ["DATABASE_URL"] = _base_url.set(
+        database=f"{_base_url.database}_{XDIST_WORKER}"
+    ).render_as_string(hide_password=False)
+
+# Likewise a Redis database per worker, counting down from the configured
+# one, so rate limit and cost keys, which are per client IP or user ID, are
+# not shared between workers. Several tests flush their database, so a
+# worker must never land on db 0 (the development database) or wrap onto
+# another worker's: fail instead, and cap workers with --maxprocesses.
+BASE_REDIS_URL = os.getenv("REDIS_URL")
+if XDIST_WORKER and BASE_REDIS_URL:
+    _redis_url = urlsplit(BASE_REDIS_URL)
+    _base_redis_db = int(_redis_url.path.lstrip("/") or 0)
+    _redis_db = _base_redis_db - int(XDIST_WORKER.removeprefix("gw"))
+    if _redis_db < 1:
+        raise pytest.UsageError(
+            f"xdist worker {XDIST_WORKER} would use Redis db {_redis_db}. Workers count "
+            f"down from the configured db {_base_redis_db} and stop at db 1; run fewer "
+            f"workers (e.g. -n auto --maxprocesses={_base_redis_db}) or configure a higher db."
+        )
+    os.environ["REDIS_URL"] = urlunsplit(_redis_url._replace(path=f"/{_redis_db}"))
+
 import asyncio
-from typing import AsyncGenerator
+import importlib
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Optional
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import NullPool
 from src.models.base import Base
@@ -28,24 +67,74 @@ from src.app import create_app
 # Load from environment or use default
 TEST_DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+asyncpg://llmtutor@localhost/llm_tutor_dev")
 
+# API modules whose handlers open database sessions through get_session
+SESSION_MODULES = (
+    "src.api.auth",
+    "src.api.chat",
+    "src.api.users",
+    "src.api.exercises",
+    "src.api.progress",
+)
+
+# Session the current test's requests are served from, set by
+# patched_get_session. None falls through to the application's own sessions.
+_TEST_DB_SESSION: ContextVar[Optional[AsyncSession]] = ContextVar("test_db_session", default=None)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_pwd_hasher():
+    """
+    Replace bcrypt hashing with a cheap deterministic hash for the test session.
+    Password strength validation still runs; only the key stretching is skipped,
+    which otherwise dominates every register/login request.
+    """
+    import hashlib
+    from src.services.auth_service import AuthService
+
+    def _digest(password: str) -> str:
+        return "fast:" + hashlib.sha1(password.encode("utf-8")).hexdigest()
+
+    def fast_hash_password(password: str) -> str:
+        AuthService.validate_password(password)
+        return _digest(password)
+
+    def fast_verify_password(password: str, hashed_password: str) -> bool:
+        return hashed_password == _digest(password)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(AuthService, "hash_password", staticmethod(fast_hash_password))
+        monkeypatch.setattr(AuthService, "verify_password", staticmethod(fast_verify_password))
+        yield
+
 
 @pytest.fixture(scope="function")
 def event_loop():
     """
     Create event loop for async tests.
+    Uses uvloop where available: most tests are fast in-process awaits,
+    where per-iteration loop overhead dominates.
     """
-    loop = asyncio.new_event_loop()
+    if sys.platform != "win32":
+        import uvloop
+        loop = uvloop.new_event_loop()
+    else:
+        loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     yield loop
     loop.close()
 
 
-@pytest.fixture(scope="function")
-async def test_engine():
+@pytest.fixture(scope="session")
+def test_engine():
     """
-    Create test database engine for tests.
-    Function scope to ensure clean state, but tables are NOT dropped/recreated each time.
+    Create test database engine for the session.
+    Tables are created once here, NOT dropped/recreated per test.
+    Under pytest-xdist the worker's own database is created first if needed.
     Instead, transactions rollback to keep tests isolated while reusing tables.
+
+    NullPool keeps the engine free of connections between checkouts, so each
+    test's event loop opens its own; the one-off table creation runs on a
+    private loop for the same reason.
     """
     engine = create_async_engine(
         TEST_DATABASE_URL,
@@ -53,32 +142,57 @@ async def test_engine():
         poolclass=NullPool,
     )
 
-    # Create tables once - checkfirst=True skips if already exist
-    # This dramatically improves test performance
-    async with engine.begin() as conn:
-        # Skip tables that require pgvector extension in test environment
-        from src.models.interaction_log import InteractionLog
-        from src.models.user_memory import UserMemory
-
-        # Get all tables except those requiring pgvector
-        tables_to_create = [
-            table for table in Base.metadata.sorted_tables
-            if table.name not in ['interaction_logs']  # Skip pgvector-dependent tables
-        ]
-
-        # Create tables - checkfirst=True makes this idempotent
-        for table in tables_to_create:
-            try:
-                await conn.run_sync(lambda sync_conn, t=table: t.create(sync_conn, checkfirst=True))
-            except Exception as e:
-                # Log but don't fail - table might already exist
-                print(f"[TEST] Info: Table {table.name} creation: {e}")
+    async def create_tables():
+        async with engine.begin() as conn:
+            # Skip tables that require pgvector extension in test environment
+            from src.models.interaction_log import InteractionLog
+            from src.models.user_memory import UserMemory
+
+            # Get all tables except those requiring pgvector
+            tables_to_create = [
+                table for table in Base.metadata.sorted_tables
+                if table.name not in ['interaction_logs']  # Skip pgvector-dependent tables
+            ]
+
+            # Create tables - checkfirst=True makes this idempotent
+            for table in tables_to_create:
+                try:
+                    await conn.run_sync(lambda sync_conn, t=table: t.create(sync_conn, checkfirst=True))
+                except Exception as e:
+                    # Log but don't fail - table might already exist
+                    print(f"[TEST] Info: Table {table.name} creation: {e}")
+
+    async def create_worker_database():
+        # Connects to the shared database to create this worker's own
+        worker_database = make_url(TEST_DATABASE_URL).database
+        admin_engine = create_async_engine(
+            BASE_DATABASE_URL,
+            poolclass=NullPool,
+            isolation_level="AUTOCOMMIT",
+        )
+        try:
+            async with admin_engine.connect() as conn:
+                exists = await conn.scalar(
+                    text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                    {"name": worker_database},
+                )
+                if not exists:
+                    await conn.execute(text(f'CREATE DATABASE "{worker_database}"'))
+        finally:
+            await admin_engine.dispose()
+
+    loop = asyncio.new_event_loop()
+    try:
+        if XDIST_WORKER and BASE_DATABASE_URL:
+            loop.run_until_complete(create_worker_database())
+        loop.run_until_complete(create_tables())
+    finally:
+        loop.close()
 
     yield engine
 
-    # No teardown - tables persist between tests for performance
+    # No teardown - tables persist between runs for performance
     # Tests use transactions that rollback, so data is isolated
-    await engine.dispose()
 
 
 @pytest.fixture
@@ -96,9 +210,37 @@ async def db_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
 
     async with async_session_factory() as session:
         # Begin a transaction
-        async with session.begin():
-            yield session
-            # Transaction is automatically rolled back after test
+        await session.begin()
+        yield session
+        # Roll back explicitly: leaving a session.begin() block normally
+        # commits, which leaked every test's rows into the next test
+        await session.rollback()
+
+
+@pytest.fixture
+def query_counter(db_session):
+    """
+    Count SQL statements issued on the test database connection.
+    Reset ``n`` after fixtures have seeded data, then assert on it once the
+    request under test returns, to catch N+1 regressions in handlers.
+
+    Usage:
+        query_counter.n = 0
+        response = await client.get('/api/progress', ...)
+        assert query_counter.n <= 6
+    """
+    from types import SimpleNamespace
+    from sqlalchemy import event
+
+    counter = SimpleNamespace(n=0)
+    engine = db_session.bind.sync_engine
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counter.n += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    yield counter
+    event.remove(engine, "before_cursor_execute", count_statement)
 
 
 @pytest.fixture
@@ -142,10 +284,61 @@ async def clear_rate_limits():
     # Cleanup after test (optional - could clear again)
 
 
-@pytest.fixture
-async def app():
+@pytest.fixture(autouse=True)
+async def reset_async_redis():
+    """
+    Close the global Redis manager's async client after each test.
+    Its connections bind to the event loop of the test that opened them,
+    and every test gets a fresh loop, so the next test reusing them would
+    fail with "the handler is closed". Dropping the client and its pool
+    makes the next access open new ones on the current loop.
+    """
+    yield
+
+    from src.utils import redis_client
+
+    redis_manager = redis_client._redis_manager
+    if redis_manager is None or redis_manager._async_client is None:
+        return
+
+    client, pool = redis_manager._async_client, redis_manager._async_pool
+    redis_manager._async_client = None
+    redis_manager._async_pool = None
+    try:
+        await client.aclose()
+        await pool.disconnect()
+    except Exception as e:
+        print(f"[TEST] Warning: Could not close async Redis client: {e}")
+
+
+@pytest.fixture(autouse=True)
+async def dispose_app_engine():
     """
-    Create test application instance.
+    Dispose the application's pooled database engine after each test.
+    Like the Redis client above, pooled connections belong to the loop
+    that opened them. dispose() closes them on the test's own loop and
+    leaves the engine, and its event listeners, ready to reconnect.
+    """
+    yield
+
+    from src.utils import database
+
+    db_manager = database._db_manager
+    if db_manager is None or db_manager._async_engine is None:
+        return
+
+    try:
+        await db_manager._async_engine.dispose()
+    except Exception as e:
+        print(f"[TEST] Warning: Could not dispose database engine: {e}")
+
+
+@pytest.fixture(scope="session")
+def app():
+    """
+    Create test application instance once for the session.
+    Tests get a fresh test client per test; the app, its blueprints and
+    middleware are built only once.
     """
     app = create_app()
     app.config['TESTING'] = True
@@ -190,15 +383,43 @@ async def mock_auth_tokens():
         yield {'verify': mock_verify, 'reset': mock_reset}
 
 
+@pytest.fixture(scope="session", autouse=True)
+def session_router():
+    """
+    Route the API modules' get_session through _TEST_DB_SESSION.
+    Installed once, before any function fixture, so tests that patch
+    get_session themselves restore the router afterwards; per-test setup
+    in patched_get_session is then a context variable set rather than
+    re-patching every module.
+    """
+    def routed(original):
+        @asynccontextmanager
+        async def get_session():
+            session = _TEST_DB_SESSION.get()
+            if session is None:
+                async with original() as session:
+                    yield session
+            else:
+                yield session
+
+        return get_session
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for name in SESSION_MODULES:
+            module = importlib.import_module(name)
+            monkeypatch.setattr(module, "get_session", routed(module.get_session))
+        yield
+
+
 @pytest.fixture
-async def patched_get_session(db_session):
+def patched_get_session(db_session):
     """
-    Patch get_session to return test database session.
+    Serve the API modules' sessions from the test database session.
     Mock commit() to use flush() instead to keep transaction open for test verification.
-    """
-    from unittest.mock import patch, AsyncMock
-    from contextlib import asynccontextmanager
 
+    Synchronous so the context variable is set in the context each test
+    task is created from, and so is visible to its requests.
+    """
     # Store original flush method
     original_flush = db_session.flush
     original_commit = db_session.commit
@@ -208,18 +429,11 @@ async def patched_get_session(db_session):
         await original_flush()
 
     db_session.commit = mock_commit
+    token = _TEST_DB_SESSION.set(db_session)
 
-    @asynccontextmanager
-    async def mock_get_session():
-        yield db_session
-
-    with patch('src.api.auth.get_session', side_effect=mock_get_session), \
-         patch('src.api.chat.get_session', side_effect=mock_get_session), \
-         patch('src.api.users.get_session', side_effect=mock_get_session), \
-         patch('src.api.exercises.get_session', side_effect=mock_get_session), \
-         patch('src.api.progress.get_session', side_effect=mock_get_session):
-        yield
+    yield
 
+    _TEST_DB_SESSION.reset(token)
     # Restore original commit
     db_session.commit = original_commit
 
@@ -246,15 +460,12 @@ def mock_jwt_auth_factory(app):
             with mock_jwt_auth_factory(test_user):
                 response = await client.get('/api/protected-endpoint')
     """
-    from unittest.mock import patch, AsyncMock
     from contextlib import contextmanager
+    from src.services.auth_service import AuthService
 
     @contextmanager
     def _mock_auth(user):
-        # Mock the auth service methods that require_auth decorator uses
-        async def mock_validate_session(token):
-            return True
-
+        # Stub the auth service methods that require_auth decorator uses
         mock_payload = {
             "user_id": user.id,
             "email": user.email,
@@ -262,9 +473,16 @@ def mock_jwt_auth_factory(app):
             "jti": "test-jti"
         }
 
-        with patch('src.services.auth_service.AuthService.verify_jwt_token', return_value=mock_payload):
-            with patch('src.services.auth_service.AuthService.validate_session', new_callable=AsyncMock, side_effect=mock_validate_session):
-                yield
+        def mock_verify_jwt_token(token, token_type="access"):
+            return mock_payload
+
+        async def mock_validate_session(token):
+            return True
+
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(AuthService, "verify_jwt_token", staticmethod(mock_verify_jwt_token))
+            monkeypatch.setattr(AuthService, "validate_session", staticmethod(mock_validate_session))
+            yield
 
     return _mock_auth
 
@@ -273,11 +491,11 @@ def mock_jwt_auth_factory(app):
 async def test_user(db_session):
     """
     Create a test user for tests that need authentication.
-    Uses UUID to ensure unique email per test, avoiding IntegrityError.
+    Uses a random hex ID to ensure unique email per test, avoiding IntegrityError.
     """
-    import uuid
+    import secrets
     from src.models.user import User, UserRole
-    unique_id = str(uuid.uuid4())[:8]  # Short unique ID
+    unique_id = secrets.token_hex(4)  # Short unique ID
     user = User(
         email=f"testuser-{unique_id}@example.com",
         password_hash="hashed_password",
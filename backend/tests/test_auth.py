@@ -9,6 +9,12 @@ from sqlalchemy import select
 from src.models.user import User, UserRole
 
 
+# Register and login are rate limited per client IP, which every test
+# request shares; start each test with a fresh allowance so results don't
+# depend on how many requests earlier tests on the same worker made
+pytestmark = pytest.mark.usefixtures("clear_rate_limits")
+
+
 @pytest.mark.asyncio
 async def test_register_success(client, patched_get_session, mock_email_service, mock_auth_tokens):
     """
@@ -27,6 +27,12 @@ from src.utils.redis_client import get_redis
 import json
 
 
+# Register and login are rate limited per client IP, which every test
+# request shares; start each test with a fresh allowance so results don't
+# depend on how many requests earlier tests on the same worker made
+pytestmark = pytest.mark.usefixtures("clear_rate_limits")
+
+
 class TestRequireVerifiedEmailDecorator:
     """Test the require_verified_email decorator implementation."""
 
@@ -476,17 +482,19 @@ class TestProtectedRoutes:
         # These should all return non-403 status codes
         # (may be 400 for validation, but not 403 for email verification)
 
-        # Register
+        # Register. The app's own session commits the account, so use an
+        # address no other test registers or seeds
+        email = f"public-routes-{uuid.uuid4()}@example.com"
         response = await client.post(
             "/api/auth/register",
-            json={"email": "test@example.com", "password": "Test123!", "name": "Test"}
+            json={"email": email, "password": "Test123!", "name": "Test"}
         )
         assert response.status_code in [200, 201, 400, 409]  # Not 403
 
         # Login (will fail, but not due to email verification)
         response = await client.post(
             "/api/auth/login",
-            json={"email": "test@example.com", "password": "wrong"}
+            json={"email": email, "password": "wrong"}
         )
         assert response.status_code in [200, 201, 400, 401]  # Not 403
 
@@ -19,17 +19,48 @@ Testing Strategy:
 """
 import pytest
 import json
-from datetime import datetime, timedelta
-from unittest.mock import AsyncMock, patch, MagicMock
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, MagicMock
 from src.models.user import User
 from src.models.exercise import Exercise, UserExercise, ExerciseType, ExerciseDifficulty, ExerciseStatus
 from src.models.user_memory import UserMemory
+from src.services.auth_service import AuthService
+
+# Shared timestamp for fixture rows; taken once at import instead of per fixture call
+_FIXTURE_NOW = datetime.now(timezone.utc)
+
+# Token value is irrelevant: _auth_bypass short-circuits verification
+_AUTH_HEADERS = {'Authorization': 'Bearer test_token'}
 
 
 # ===================================================================
 # FIXTURES
 # ===================================================================
 
+@pytest.fixture(autouse=True)
+def _auth_bypass(request, monkeypatch):
+    """
+    Authenticate every request in this module as test_user.
+    Tests marked with @pytest.mark.no_auth keep the real auth path.
+    """
+    if request.node.get_closest_marker('no_auth'):
+        return
+
+    user = request.getfixturevalue('test_user')
+    payload = {
+        'user_id': user.id,
+        'email': user.email,
+        'role': user.role,
+        'jti': 'test-jti',
+    }
+
+    async def _valid_session(*_a, **_k):
+        return True
+
+    monkeypatch.setattr(AuthService, 'verify_jwt_token', lambda *_a, **_k: payload)
+    monkeypatch.setattr(AuthService, 'validate_session', _valid_session)
+
+
 @pytest.fixture
 async def test_user(db_session):
     """Create a test user with profile data."""
@@ -78,7 +109,7 @@ async def user_exercise(db_session, test_user, test_exercise):
         user_id=test_user.id,
         exercise_id=test_exercise.id,
         status=ExerciseStatus.IN_PROGRESS,
-        started_at=datetime.utcnow()
+        started_at=_FIXTURE_NOW
     )
     db_session.add(user_ex)
     await db_session.flush()
@@ -86,15 +117,25 @@ async def user_exercise(db_session, test_user, test_exercise):
     return user_ex
 
 
-@pytest.fixture
-def mock_llm_service():
-    """Mock LLM service for exercise generation."""
-    with patch('src.services.exercise_service.LLMService') as mock_service_class:
-        mock_service = AsyncMock()
-        mock_service_class.return_value = mock_service
+class _CallRecorder:
+    """Async callable that returns a canned result and records how it was called."""
+
+    def __init__(self, result):
+        self.result = result
+        self.count = 0
+        self.last_kwargs = {}
 
-        # Mock exercise generation response
-        mock_service.generate_exercise = AsyncMock(return_value={
+    async def __call__(self, *args, **kwargs):
+        self.count += 1
+        self.last_kwargs = kwargs
+        return self.result
+
+
+class _FakeLLMService:
+    """Stand-in for LLMService with canned generation, hint and evaluation responses."""
+
+    def __init__(self):
+        self.generate_exercise = _CallRecorder({
             "title": "Reverse a Linked List",
             "description": "Implement a function to reverse a singly linked list",
             "instructions": "Given the head of a singly linked list, reverse the list and return the new head.",
@@ -107,20 +148,24 @@ def mock_llm_service():
             "difficulty": "medium"
         })
 
-        # Mock hint generation
-        mock_service.generate_hint = AsyncMock(return_value={
+        self.generate_hint = _CallRecorder({
             "hint": "Consider using three pointers: previous, current, and next. Update the pointers as you traverse the list."
         })
 
-        # Mock submission feedback
-        mock_service.evaluate_submission = AsyncMock(return_value={
+        self.evaluate_submission = _CallRecorder({
             "grade": 85.0,
             "feedback": "Good solution! Your implementation correctly reverses the linked list. Consider edge cases like empty lists.",
             "strengths": ["Correct algorithm", "Good variable naming"],
             "improvements": ["Add edge case handling", "Consider iterative vs recursive approaches"]
         })
 
-        yield mock_service
+
+@pytest.fixture
+def mock_llm_service():
+    """Fake LLM service for exercise generation."""
+    fake_service = _FakeLLMService()
+    with patch('src.services.exercise_service.LLMService', return_value=fake_service):
+        yield fake_service
 
 
 # ===================================================================
@@ -130,12 +175,10 @@ def mock_llm_service():
 @pytest.mark.asyncio
 async def test_generate_daily_exercise_new_user(client, test_user, patched_get_session, mock_llm_service):
     """Test generating daily exercise for user who hasn't received one today."""
-    # Mock JWT auth
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            '/api/exercises/daily',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        '/api/exercises/daily',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -147,20 +190,19 @@ async def test_generate_daily_exercise_new_user(client, test_user, patched_get_s
     assert 'user_exercise_id' in data  # Should track user's progress
 
     # Verify LLM was called with user context
-    mock_llm_service.generate_exercise.assert_called_once()
-    call_args = mock_llm_service.generate_exercise.call_args
-    assert test_user.primary_language in str(call_args)
-    assert test_user.skill_level in str(call_args)
+    assert mock_llm_service.generate_exercise.count == 1
+    call_kwargs = mock_llm_service.generate_exercise.last_kwargs
+    assert call_kwargs['language'] == test_user.primary_language
+    assert call_kwargs['skill_level'] == test_user.skill_level
 
 
 @pytest.mark.asyncio
 async def test_get_daily_exercise_already_exists(client, test_user, test_exercise, user_exercise, patched_get_session):
     """Test retrieving existing daily exercise (don't generate new one)."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            '/api/exercises/daily',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        '/api/exercises/daily',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -173,6 +215,7 @@ async def test_get_daily_exercise_already_exists(client, test_user, test_exercis
 
 
 @pytest.mark.asyncio
+@pytest.mark.no_auth
 async def test_daily_exercise_unauthorized(client):
     """Test daily exercise endpoint requires authentication."""
     response = await client.get('/api/exercises/daily')
@@ -186,11 +229,10 @@ async def test_daily_exercise_unauthorized(client):
 @pytest.mark.asyncio
 async def test_get_exercise_by_id(client, test_user, test_exercise, patched_get_session):
     """Test retrieving specific exercise by ID."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            f'/api/exercises/{test_exercise.id}',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        f'/api/exercises/{test_exercise.id}',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -206,11 +248,10 @@ async def test_get_exercise_by_id(client, test_user, test_exercise, patched_get_
 @pytest.mark.asyncio
 async def test_get_exercise_not_found(client, test_user, patched_get_session):
     """Test retrieving non-existent exercise returns 404."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            '/api/exercises/99999',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        '/api/exercises/99999',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 404
 
@@ -218,11 +259,10 @@ async def test_get_exercise_not_found(client, test_user, patched_get_session):
 @pytest.mark.asyncio
 async def test_get_exercise_list(client, test_user, test_exercise, patched_get_session):
     """Test listing user's exercises with pagination."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            '/api/exercises?limit=10&offset=0',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        '/api/exercises?limit=10&offset=0',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -252,12 +292,11 @@ def two_sum(nums, target):
     return []
 """
 
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.post(
-            f'/api/exercises/{test_exercise.id}/submit',
-            headers={'Authorization': 'Bearer test_token'},
-            json={'solution': solution_code}
-        )
+    response = await client.post(
+        f'/api/exercises/{test_exercise.id}/submit',
+        headers=_AUTH_HEADERS,
+        json={'solution': solution_code}
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -269,39 +308,37 @@ def two_sum(nums, target):
     assert 'improvements' in data
 
     # Verify LLM evaluation was called
-    mock_llm_service.evaluate_submission.assert_called_once()
+    assert mock_llm_service.evaluate_submission.count == 1
 
 
 @pytest.mark.asyncio
 async def test_submit_exercise_validation(client, test_user, test_exercise, patched_get_session):
     """Test solution submission validation."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        # Empty solution
-        response = await client.post(
-            f'/api/exercises/{test_exercise.id}/submit',
-            headers={'Authorization': 'Bearer test_token'},
-            json={'solution': ''}
-        )
-        assert response.status_code == 400
-
-        # Missing solution field
-        response = await client.post(
-            f'/api/exercises/{test_exercise.id}/submit',
-            headers={'Authorization': 'Bearer test_token'},
-            json={}
-        )
-        assert response.status_code == 400
+    # Empty solution
+    response = await client.post(
+        f'/api/exercises/{test_exercise.id}/submit',
+        headers=_AUTH_HEADERS,
+        json={'solution': ''}
+    )
+    assert response.status_code == 400
+
+    # Missing solution field
+    response = await client.post(
+        f'/api/exercises/{test_exercise.id}/submit',
+        headers=_AUTH_HEADERS,
+        json={}
+    )
+    assert response.status_code == 400
 
 
 @pytest.mark.asyncio
 async def test_submit_exercise_not_found(client, test_user, patched_get_session):
     """Test submitting solution for non-existent exercise."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.post(
-            '/api/exercises/99999/submit',
-            headers={'Authorization': 'Bearer test_token'},
-            json={'solution': 'code here'}
-        )
+    response = await client.post(
+        '/api/exercises/99999/submit',
+        headers=_AUTH_HEADERS,
+        json={'solution': 'code here'}
+    )
 
     assert response.status_code == 404
 
@@ -313,11 +350,10 @@ async def test_submit_exercise_not_found(client, test_user, patched_get_session)
 @pytest.mark.asyncio
 async def test_request_hint(client, test_user, test_exercise, user_exercise, patched_get_session, mock_llm_service):
     """Test requesting a hint for an exercise."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.post(
-            f'/api/exercises/{test_exercise.id}/hint',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.post(
+        f'/api/exercises/{test_exercise.id}/hint',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -331,7 +367,7 @@ async def test_request_hint(client, test_user, test_exercise, user_exercise, pat
     assert 'solution' not in data
 
     # Verify LLM was called
-    mock_llm_service.generate_hint.assert_called_once()
+    assert mock_llm_service.generate_hint.count == 1
 
 
 @pytest.mark.asyncio
@@ -339,11 +375,10 @@ async def test_hint_increments_counter(client, test_user, test_exercise, user_ex
     """Test that requesting hints increments the hints_requested counter."""
     initial_hints = user_exercise.hints_requested
 
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.post(
-            f'/api/exercises/{test_exercise.id}/hint',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.post(
+        f'/api/exercises/{test_exercise.id}/hint',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -359,11 +394,10 @@ async def test_hint_increments_counter(client, test_user, test_exercise, user_ex
 @pytest.mark.asyncio
 async def test_get_exercise_history(client, test_user, test_exercise, user_exercise, patched_get_session):
     """Test retrieving user's exercise history."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            '/api/exercises/history',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        '/api/exercises/history',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -383,30 +417,28 @@ async def test_get_exercise_history(client, test_user, test_exercise, user_exerc
 @pytest.mark.asyncio
 async def test_exercise_history_filtering(client, test_user, patched_get_session):
     """Test filtering exercise history by status."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        # Filter by completed
-        response = await client.get(
-            '/api/exercises/history?status=completed',
-            headers={'Authorization': 'Bearer test_token'}
-        )
-        assert response.status_code == 200
-        data = await response.get_json()
-        assert 'exercises' in data
+    # Filter by completed
+    response = await client.get(
+        '/api/exercises/history?status=completed',
+        headers=_AUTH_HEADERS
+    )
+    assert response.status_code == 200
+    data = await response.get_json()
+    assert 'exercises' in data
 
 
 @pytest.mark.asyncio
 async def test_exercise_history_pagination(client, test_user, patched_get_session):
     """Test pagination of exercise history."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            '/api/exercises/history?limit=5&offset=0',
-            headers={'Authorization': 'Bearer test_token'}
-        )
-        assert response.status_code == 200
-        data = await response.get_json()
+    response = await client.get(
+        '/api/exercises/history?limit=5&offset=0',
+        headers=_AUTH_HEADERS
+    )
+    assert response.status_code == 200
+    data = await response.get_json()
 
-        assert data['limit'] == 5
-        assert data['offset'] == 0
+    assert data['limit'] == 5
+    assert data['offset'] == 0
 
 
 # ===================================================================
@@ -416,11 +448,10 @@ async def test_exercise_history_pagination(client, test_user, patched_get_sessio
 @pytest.mark.asyncio
 async def test_mark_exercise_complete(client, test_user, test_exercise, user_exercise, patched_get_session):
     """Test marking an exercise as complete."""
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.post(
-            f'/api/exercises/{test_exercise.id}/complete',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.post(
+        f'/api/exercises/{test_exercise.id}/complete',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -440,18 +471,17 @@ async def test_exercise_generation_javascript(client, test_user, patched_get_ses
     # Update user's primary language
     test_user.primary_language = "javascript"
 
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            '/api/exercises/daily',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        '/api/exercises/daily',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
 
     # Verify LLM was called with JavaScript context
-    mock_llm_service.generate_exercise.assert_called()
-    call_args = str(mock_llm_service.generate_exercise.call_args)
-    assert 'javascript' in call_args.lower()
+    assert mock_llm_service.generate_exercise.count >= 1
+    call_kwargs = mock_llm_service.generate_exercise.last_kwargs
+    assert call_kwargs['language'] == 'javascript'
 
 
 # ===================================================================
@@ -463,18 +493,17 @@ async def test_exercise_personalized_to_skill_level(client, test_user, patched_g
     """Test that exercises are personalized based on user skill level."""
     test_user.skill_level = "beginner"
 
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            '/api/exercises/daily',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        '/api/exercises/daily',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
 
     # Verify LLM was called with skill level
-    mock_llm_service.generate_exercise.assert_called()
-    call_args = str(mock_llm_service.generate_exercise.call_args)
-    assert 'beginner' in call_args.lower()
+    assert mock_llm_service.generate_exercise.count >= 1
+    call_kwargs = mock_llm_service.generate_exercise.last_kwargs
+    assert call_kwargs['skill_level'] == 'beginner'
 
 
 @pytest.mark.asyncio
@@ -483,13 +512,12 @@ async def test_exercise_personalized_to_interests(client, test_user, patched_get
     test_user.learning_goals = "Web development with React"
     test_user.preferred_topics = "frontend,javascript,react"
 
-    with patch('src.middleware.auth.verify_jwt_token', return_value={'user_id': test_user.id}):
-        response = await client.get(
-            '/api/exercises/daily',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        '/api/exercises/daily',
+        headers=_AUTH_HEADERS
+    )
 
     assert response.status_code == 200
 
     # Verify LLM context included user interests
-    mock_llm_service.generate_exercise.assert_called()
+    assert mock_llm_service.generate_exercise.count >= 1
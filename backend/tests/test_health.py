@@ -2,47 +2,24 @@
 Tests for health check API endpoints.
 """
 import pytest
-from quart import Quart
 
 
 @pytest.mark.asyncio
-async def test_health_check(client):
+@pytest.mark.parametrize("path,expected_status,section,expected_keys", [
+    ("/api/health/", "healthy", "checks", ("database", "redis", "llm_service")),
+    ("/api/health/ready", "ready", "dependencies", ("database", "redis")),
+    ("/api/health/live", "alive", None, ()),
+], ids=["health", "readiness", "liveness"])
+async def test_health_endpoints(client, path, expected_status, section, expected_keys):
     """
-    Test GET /api/health/ returns healthy status.
+    Test GET on each health endpoint returns its status and dependency keys.
     """
-    response = await client.get("/api/health/")
+    response = await client.get(path)
     assert response.status_code == 200
 
     data = await response.get_json()
-    assert data["status"] == "healthy"
-    assert "checks" in data
-    assert "database" in data["checks"]
-    assert "redis" in data["checks"]
-    assert "llm_service" in data["checks"]
-
-
-@pytest.mark.asyncio
-async def test_readiness_check(client):
-    """
-    Test GET /api/health/ready returns ready status.
-    """
-    response = await client.get("/api/health/ready")
-    assert response.status_code == 200
-
-    data = await response.get_json()
-    assert data["status"] == "ready"
-    assert "dependencies" in data
-    assert "database" in data["dependencies"]
-    assert "redis" in data["dependencies"]
-
-
-@pytest.mark.asyncio
-async def test_liveness_check(client):
-    """
-    Test GET /api/health/live returns alive status.
-    """
-    response = await client.get("/api/health/live")
-    assert response.status_code == 200
-
-    data = await response.get_json()
-    assert data["status"] == "alive"
+    assert data["status"] == expected_status
+    if section is not None:
+        assert section in data
+        for key in expected_keys:
+            assert key in data[section]
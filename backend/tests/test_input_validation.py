@@ -24,17 +24,37 @@ Security Testing:
 - Markdown injection attacks
 """
 import pytest
+import asyncio
 from quart import Quart
 from typing import Dict, Any
-import json
-import uuid
+import re
+import secrets
+import bleach
+import httpx
+import uvloop
+from bleach.sanitizer import Cleaner
+from pydantic import ValidationError
+from pydantic_core import SchemaValidator
+from src.app import create_app, shutdown_app
+from src.schemas.auth import RegisterRequest, LoginRequest
+from src.schemas.chat import SendMessageRequest
+from src.schemas.profile import ProfileUpdateRequest
+from src.schemas import chat as chat_schemas
+from src.utils import sanitization
+from src.utils.sanitization import is_valid_github_repo_url
+
+
+# Register and login are rate limited per client IP, which every test
+# request shares; start each test with a fresh allowance so results don't
+# depend on how many requests earlier tests on the same worker made
+pytestmark = pytest.mark.usefixtures("clear_rate_limits")
 
 
 # ===================================================================
 # Test Data - Attack Vectors and Edge Cases
 # ===================================================================
 
-XSS_PAYLOADS = [
+XSS_PAYLOADS = (
     # Basic XSS
     "<script>alert('XSS')</script>",
     "<img src=x onerror=alert('XSS')>",
@@ -60,9 +80,9 @@ XSS_PAYLOADS = [
     "[click me](javascript:alert('XSS'))",
     "![xss](javascript:alert('XSS'))",
     "[xss]: javascript:alert('XSS')",
-]
+)
 
-SQL_INJECTION_PAYLOADS = [
+SQL_INJECTION_PAYLOADS = (
     "' OR '1'='1",
     "'; DROP TABLE users; --",
     "' UNION SELECT NULL, NULL, NULL --",
@@ -71,7 +91,11 @@ SQL_INJECTION_PAYLOADS = [
     "' OR 1=1 LIMIT 1 --",
     "'; DELETE FROM users WHERE 'a'='a",
     "1' UNION SELECT username, password FROM users --",
-]
+)
+
+# Subsets used by the per-field endpoint tests, sliced once at import
+XSS_SAMPLE = XSS_PAYLOADS[:5]
+SQL_INJECTION_SAMPLE = SQL_INJECTION_PAYLOADS[:5]
 
 OVERSIZED_INPUTS = {
     "tiny": "a" * 10,
@@ -82,7 +106,40 @@ OVERSIZED_INPUTS = {
     "huge": "a" * 1000000,
 }
 
-UNICODE_EDGE_CASES = [
+MARKDOWN_XSS_PAYLOADS = (
+    "[click me](javascript:alert('XSS'))",
+    "![xss](javascript:alert('XSS'))",
+    "[xss]: javascript:alert('XSS')",
+    "[link](data:text/html;base64,PHNjcmlwdD5hbGVydCgnWFNTJyk8L3NjcmlwdD4=)",
+)
+
+# Substrings that must never survive sanitization of user-supplied text
+FORBIDDEN_XSS_TOKENS = ("<script>", "onerror", "javascript:")
+
+# All forbidden tokens in one case-insensitive pattern, so a response is
+# scanned once instead of once per token after a lowercased copy
+_XSS_PATTERN = re.compile(
+    b"|".join(re.escape(token.encode()) for token in FORBIDDEN_XSS_TOKENS + ("data:text/html",)),
+    re.IGNORECASE,
+)
+
+
+def error_fields(data: Dict[str, Any]) -> set:
+    """Return the names of the fields reported in a structured validation error."""
+    return {err["field"] for err in data["error"]["details"]["errors"]}
+
+
+def field_error(data: Dict[str, Any], field: str) -> Dict[str, Any]:
+    """Return the structured validation error entry for one field."""
+    return next(err for err in data["error"]["details"]["errors"] if err["field"] == field)
+
+
+def assert_no_xss(body: bytes) -> None:
+    """Assert that no forbidden XSS token appears anywhere in a raw response body or field."""
+    match = _XSS_PATTERN.search(body)
+    assert match is None, f"Unsanitized XSS token in response: {match.group(0)!r}"
+
+UNICODE_EDGE_CASES = (
     # Emojis
     "Hello 👋 World 🌍",
     "🚀" * 100,
@@ -101,7 +158,33 @@ UNICODE_EDGE_CASES = [
 
     # Surrogate pairs
     "𝕳𝖊𝖑𝖑𝖔",  # Mathematical bold text
-]
+)
+
+
+def oversized_json_body(field: str, size: int) -> bytes:
+    """
+    Build a single-field JSON body of `size` ASCII characters as raw bytes.
+
+    Length-limit tests only care that the server rejects the field, so the
+    body is assembled directly instead of running json.dumps over the payload.
+    """
+    return b'{"' + field.encode() + b'": "' + b"a" * size + b'"}'
+
+
+JSON_CONTENT_TYPE = {"Content-Type": "application/json"}
+
+# Accepted (possibly sanitized) input, and input that may also be rejected
+OK_STATUSES = frozenset({200, 201})
+OK_OR_REJECTED_STATUSES = frozenset({200, 201, 400})
+
+# Oversized inputs, built once at import and reused by every length-limit
+# test; request bodies are stored already serialized
+OVERSIZED_NAME = "a" * 256  # Max is 255
+OVERSIZED_MESSAGE_BODY = oversized_json_body("message", 5001)  # Max is 5000
+OVERSIZED_BIO_BODY = oversized_json_body("bio", 2001)  # Max is 2000
+OVERSIZED_CAREER_GOALS_BODY = oversized_json_body("career_goals", 1001)  # Max is 1000
+OVERSIZED_SOLUTION_BODY = oversized_json_body("solution", 51000)  # Max is 50KB
+OVERSIZED_CONTEXT_BODY = oversized_json_body("context", 2001)  # Max is 2000
 
 
 # ===================================================================
@@ -112,34 +195,17 @@ class TestAuthInputValidation:
     """Test input validation for authentication endpoints."""
 
     @pytest.mark.asyncio
-    async def test_register_missing_schema_validation(self, client):
+    @pytest.mark.parametrize("missing,body", [
+        ("email", {"password": "ValidPass123!", "name": "Test User"}),
+        ("password", {"email": "test@example.com", "name": "Test User"}),
+        ("name", {"email": "test@example.com", "password": "ValidPass123!"}),
+    ])
+    async def test_register_missing_schema_validation(self, client, missing, body):
         """Test that /register endpoint validates all required fields."""
-        # Missing email
-        response = await client.post("/api/auth/register", json={
-            "password": "ValidPass123!",
-            "name": "Test User"
-        })
-        assert response.status_code == 400
-        data = await response.get_json()
-        assert "email" in data.get("message", "").lower()
-
-        # Missing password
-        response = await client.post("/api/auth/register", json={
-            "email": "test@example.com",
-            "name": "Test User"
-        })
-        assert response.status_code == 400
-        data = await response.get_json()
-        assert "password" in data.get("message", "").lower()
-
-        # Missing name
-        response = await client.post("/api/auth/register", json={
-            "email": "test@example.com",
-            "password": "ValidPass123!"
-        })
+        response = await client.post("/api/auth/register", json=body)
         assert response.status_code == 400
-        data = await response.get_json()
-        assert "name" in data.get("message", "").lower()
+        data = response.json()
+        assert missing in data.get("message", "").lower()
 
     @pytest.mark.asyncio
     async def test_register_email_validation(self, client):
@@ -155,14 +221,18 @@ class TestAuthInputValidation:
             " test@example.com ",  # Leading/trailing whitespace
         ]
 
-        for invalid_email in invalid_emails:
-            response = await client.post("/api/auth/register", json={
+        responses = await asyncio.gather(*[
+            client.post("/api/auth/register", json={
                 "email": invalid_email,
                 "password": "ValidPass123!",
                 "name": "Test User"
             })
+            for invalid_email in invalid_emails
+        ])
+        datas = [response.json() for response in responses]
+
+        for invalid_email, response, data in zip(invalid_emails, responses, datas):
             assert response.status_code == 400, f"Failed to reject invalid email: {invalid_email}"
-            data = await response.get_json()
             assert "email" in data.get("message", "").lower()
 
     @pytest.mark.asyncio
@@ -178,65 +248,59 @@ class TestAuthInputValidation:
             "Password123",  # No special chars
         ]
 
-        for weak_password in weak_passwords:
-            response = await client.post("/api/auth/register", json={
+        responses = await asyncio.gather(*[
+            client.post("/api/auth/register", json={
                 "email": "test@example.com",
                 "password": weak_password,
                 "name": "Test User"
             })
+            for weak_password in weak_passwords
+        ])
+        datas = [response.json() for response in responses]
+
+        for weak_password, response, data in zip(weak_passwords, responses, datas):
             assert response.status_code == 400, f"Failed to reject weak password: {weak_password}"
-            data = await response.get_json()
             assert "password" in data.get("message", "").lower()
 
     @pytest.mark.asyncio
-    async def test_register_name_length_validation(self, client):
+    @pytest.mark.parametrize("name", [
+        "   ",  # Too short: only whitespace, empty after stripping
+        OVERSIZED_NAME,  # Too long: max is 255 characters
+    ], ids=["whitespace", "too_long"])
+    async def test_register_name_length_validation(self, client, name):
         """Test name field length limits."""
-        # Too short (should be at least 1 character after stripping)
         response = await client.post("/api/auth/register", json={
             "email": "test@example.com",
             "password": "ValidPass123!",
-            "name": "   "  # Only whitespace
+            "name": name
         })
         assert response.status_code == 400
 
-        # Too long (should be max 255 characters)
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("xss_payload", XSS_PAYLOADS)
+    async def test_register_xss_in_name(self, client, xss_payload):
+        """Test XSS payload sanitization in name field."""
         response = await client.post("/api/auth/register", json={
-            "email": "test@example.com",
+            "email": f"test{hash(xss_payload)}@example.com",
             "password": "ValidPass123!",
-            "name": "a" * 256
+            "name": xss_payload
         })
-        assert response.status_code == 400
 
-    @pytest.mark.asyncio
-    async def test_register_xss_in_name(self, client):
-        """Test XSS payload sanitization in name field."""
-        for xss_payload in XSS_PAYLOADS:
-            response = await client.post("/api/auth/register", json={
-                "email": f"test{hash(xss_payload)}@example.com",
-                "password": "ValidPass123!",
-                "name": xss_payload
-            })
-            # Should either reject (400) or sanitize
-            if response.status_code == 201:
-                data = await response.get_json()
-                # Name should be sanitized - no HTML tags
-                assert "<script>" not in data.get("name", "").lower()
-                assert "onerror" not in data.get("name", "").lower()
-                assert "javascript:" not in data.get("name", "").lower()
+        # Should either reject (400) or sanitize
+        if response.status_code == 201:
+            # Name should be sanitized - no HTML tags. It is HTML-escaped
+            # rather than stripped, so the payload's words remain as text
+            name = response.json()["user"].get("name", "")
+            assert "<" not in name and ">" not in name
 
     @pytest.mark.asyncio
-    async def test_login_missing_schema_validation(self, client):
+    @pytest.mark.parametrize("body", [
+        {"password": "ValidPass123!"},  # Missing email
+        {"email": "test@example.com"},  # Missing password
+    ], ids=["missing_email", "missing_password"])
+    async def test_login_missing_schema_validation(self, client, body):
         """Test that /login endpoint validates required fields."""
-        # Missing email
-        response = await client.post("/api/auth/login", json={
-            "password": "ValidPass123!"
-        })
-        assert response.status_code == 400
-
-        # Missing password
-        response = await client.post("/api/auth/login", json={
-            "email": "test@example.com"
-        })
+        response = await client.post("/api/auth/login", json=body)
         assert response.status_code == 400
 
 
@@ -257,7 +321,7 @@ class TestChatInputValidation:
             headers=auth_headers
         )
         assert response.status_code == 400
-        data = await response.get_json()
+        data = response.json()
         assert "message" in data.get("message", "").lower()
 
     @pytest.mark.asyncio
@@ -282,50 +346,37 @@ class TestChatInputValidation:
         # Too long (should be max 5000 characters)
         response = await client.post(
             "/api/chat/message",
-            json={"message": "a" * 5001},
-            headers=auth_headers
+            content=OVERSIZED_MESSAGE_BODY,
+            headers={**auth_headers, **JSON_CONTENT_TYPE}
         )
         assert response.status_code == 400
 
     @pytest.mark.asyncio
-    async def test_send_message_xss_sanitization(self, client, auth_headers):
+    @pytest.mark.parametrize("xss_payload", XSS_SAMPLE)  # Test subset for speed
+    async def test_send_message_xss_sanitization(self, client, auth_headers, xss_payload):
         """Test XSS payload sanitization in chat messages."""
-        for xss_payload in XSS_PAYLOADS[:5]:  # Test subset for speed
-            response = await client.post(
-                "/api/chat/message",
-                json={"message": xss_payload},
-                headers=auth_headers
-            )
-            # Should accept but sanitize
-            assert response.status_code in [200, 201]
-            data = await response.get_json()
-            # Response should not contain executable scripts
-            response_text = json.dumps(data).lower()
-            assert "<script>" not in response_text
-            assert "onerror" not in response_text
+        response = await client.post(
+            "/api/chat/message",
+            json={"message": xss_payload},
+            headers=auth_headers
+        )
+        # Should accept but sanitize
+        assert response.status_code in OK_STATUSES
+        # Response should not contain executable scripts
+        assert_no_xss(response.content)
 
     @pytest.mark.asyncio
-    async def test_send_message_markdown_sanitization(self, client, auth_headers):
+    @pytest.mark.parametrize("payload", MARKDOWN_XSS_PAYLOADS)
+    async def test_send_message_markdown_sanitization(self, client, auth_headers, payload):
         """Test markdown sanitization in chat messages."""
-        markdown_xss = [
-            "[click me](javascript:alert('XSS'))",
-            "![xss](javascript:alert('XSS'))",
-            "[xss]: javascript:alert('XSS')",
-            "[link](data:text/html;base64,PHNjcmlwdD5hbGVydCgnWFNTJyk8L3NjcmlwdD4=)",
-        ]
-
-        for payload in markdown_xss:
-            response = await client.post(
-                "/api/chat/message",
-                json={"message": payload},
-                headers=auth_headers
-            )
-            assert response.status_code in [200, 201]
-            data = await response.get_json()
-            # Markdown links with javascript: protocol should be sanitized
-            response_text = json.dumps(data)
-            assert "javascript:" not in response_text.lower()
-            assert "data:text/html" not in response_text.lower()
+        response = await client.post(
+            "/api/chat/message",
+            json={"message": payload},
+            headers=auth_headers
+        )
+        assert response.status_code in OK_STATUSES
+        # Markdown links with javascript: protocol should be sanitized
+        assert_no_xss(response.content)
 
 
 # ===================================================================
@@ -341,39 +392,36 @@ class TestProfileInputValidation:
         # Oversized bio
         response = await client.put(
             "/api/users/profile",
-            json={"bio": "a" * 2001},
-            headers=auth_headers
+            content=OVERSIZED_BIO_BODY,
+            headers={**auth_headers, **JSON_CONTENT_TYPE}
         )
         assert response.status_code == 400
 
     @pytest.mark.asyncio
-    async def test_bio_xss_sanitization(self, client, auth_headers):
+    @pytest.mark.parametrize("xss_payload", XSS_SAMPLE)
+    async def test_bio_xss_sanitization(self, client, auth_headers, xss_payload):
         """Test XSS sanitization in bio field."""
-        for xss_payload in XSS_PAYLOADS[:5]:
-            response = await client.put(
-                "/api/users/profile",
-                json={"bio": xss_payload},
-                headers=auth_headers
-            )
-            # Should accept but sanitize
-            if response.status_code == 200:
-                data = await response.get_json()
-                assert "<script>" not in data.get("bio", "").lower()
-                assert "onerror" not in data.get("bio", "").lower()
+        response = await client.put(
+            "/api/users/profile",
+            json={"bio": xss_payload},
+            headers=auth_headers
+        )
+        # Should accept but sanitize
+        if response.status_code == 200:
+            assert_no_xss(response.json().get("bio", "").encode())
 
     @pytest.mark.asyncio
-    async def test_career_goals_xss_sanitization(self, client, auth_headers):
+    @pytest.mark.parametrize("xss_payload", XSS_SAMPLE)
+    async def test_career_goals_xss_sanitization(self, client, auth_headers, xss_payload):
         """Test XSS sanitization in career_goals field."""
-        for xss_payload in XSS_PAYLOADS[:5]:
-            response = await client.put(
-                "/api/users/profile",
-                json={"career_goals": xss_payload},
-                headers=auth_headers
-            )
-            # Should accept but sanitize
-            if response.status_code == 200:
-                data = await response.get_json()
-                assert "<script>" not in data.get("career_goals", "").lower()
+        response = await client.put(
+            "/api/users/profile",
+            json={"career_goals": xss_payload},
+            headers=auth_headers
+        )
+        # Should accept but sanitize
+        if response.status_code == 200:
+            assert_no_xss(response.json().get("career_goals", "").encode())
 
 
 # ===================================================================
@@ -397,22 +445,22 @@ class TestExerciseInputValidation:
         # Oversized solution (should be max 50KB for code submissions)
         response = await client.post(
             f"/api/exercises/{sample_exercise['id']}/submit",
-            json={"solution": "a" * 51000},
-            headers=auth_headers
+            content=OVERSIZED_SOLUTION_BODY,
+            headers={**auth_headers, **JSON_CONTENT_TYPE}
         )
         assert response.status_code == 400
 
     @pytest.mark.asyncio
-    async def test_solution_sql_injection_safe(self, client, auth_headers, sample_exercise):
+    @pytest.mark.parametrize("sql_payload", SQL_INJECTION_SAMPLE)
+    async def test_solution_sql_injection_safe(self, client, auth_headers, sample_exercise, sql_payload):
         """Test that SQL injection in solution code doesn't break validation."""
-        for sql_payload in SQL_INJECTION_PAYLOADS[:5]:
-            response = await client.post(
-                f"/api/exercises/{sample_exercise['id']}/submit",
-                json={"solution": sql_payload},
-                headers=auth_headers
-            )
-            # Should accept (it's user code, not a query), but validate properly
-            assert response.status_code in [200, 201, 400]  # Not 500 (server error)
+        response = await client.post(
+            f"/api/exercises/{sample_exercise['id']}/submit",
+            json={"solution": sql_payload},
+            headers=auth_headers
+        )
+        # Should accept (it's user code, not a query), but validate properly
+        assert response.status_code in OK_OR_REJECTED_STATUSES  # Not 500 (server error)
 
     @pytest.mark.asyncio
     async def test_hint_context_length_validation(self, client, auth_headers, sample_exercise):
@@ -420,8 +468,8 @@ class TestExerciseInputValidation:
         # Oversized context
         response = await client.post(
             f"/api/exercises/{sample_exercise['id']}/hint",
-            json={"context": "a" * 2001},
-            headers=auth_headers
+            content=OVERSIZED_CONTEXT_BODY,
+            headers={**auth_headers, **JSON_CONTENT_TYPE}
         )
         assert response.status_code == 400
 
@@ -433,38 +481,28 @@ class TestExerciseInputValidation:
 class TestGitHubURLValidation:
     """Test GitHub URL validation for repository links."""
 
-    @pytest.mark.asyncio
-    async def test_valid_github_urls(self, client):
+    @pytest.mark.parametrize("url", [
+        "https://github.com/user/repo",
+        "https://github.com/user/repo-name",
+        "https://github.com/user/repo_name",
+        "https://github.com/user/repo.git",
+        "https://github.com/user-name/repo-name",
+    ])
+    def test_valid_github_urls(self, url):
         """Test that valid GitHub URLs are accepted."""
-        valid_urls = [
-            "https://github.com/user/repo",
-            "https://github.com/user/repo-name",
-            "https://github.com/user/repo_name",
-            "https://github.com/user/repo.git",
-            "https://github.com/user-name/repo-name",
-        ]
-
-        for url in valid_urls:
-            # Test in profile update (if GitHub integration exists)
-            # This will be implemented when GitHub integration is fully built
-            pass  # Placeholder for now
-
-    @pytest.mark.asyncio
-    async def test_invalid_github_urls(self, client):
+        assert is_valid_github_repo_url(url)
+
+    @pytest.mark.parametrize("url", [
+        "http://github.com/user/repo",  # Not HTTPS
+        "https://github.com/user",  # No repo
+        "https://github.com/",  # Incomplete
+        "https://example.com/user/repo",  # Not GitHub
+        "javascript:alert('XSS')",  # JavaScript protocol
+        "data:text/html,<script>alert('XSS')</script>",  # Data URI
+    ])
+    def test_invalid_github_urls(self, url):
         """Test that invalid GitHub URLs are rejected."""
-        invalid_urls = [
-            "http://github.com/user/repo",  # Not HTTPS
-            "https://github.com/user",  # No repo
-            "https://github.com/",  # Incomplete
-            "https://example.com/user/repo",  # Not GitHub
-            "javascript:alert('XSS')",  # JavaScript protocol
-            "data:text/html,<script>alert('XSS')</script>",  # Data URI
-        ]
-
-        for url in invalid_urls:
-            # Test in profile update (if GitHub integration exists)
-            # This will be implemented when GitHub integration is fully built
-            pass  # Placeholder for now
+        assert not is_valid_github_repo_url(url)
 
 
 # ===================================================================
@@ -483,7 +521,7 @@ class TestUnicodeEdgeCases:
             headers=auth_headers
         )
         assert response.status_code == 200
-        data = await response.get_json()
+        data = response.json()
         assert "💻" in data.get("bio", "")
 
     @pytest.mark.asyncio
@@ -508,6 +546,17 @@ class TestUnicodeEdgeCases:
         # Should be rejected as effectively empty
         assert response.status_code == 400
 
+    @pytest.mark.parametrize("schema,data", [
+        (ProfileUpdateRequest, {"name": "\u200b" * 10}),
+        (ProfileUpdateRequest, {"career_goals": "\u200b" * 20 + "short"}),
+        (RegisterRequest, {"email": "zw@example.com", "password": "ValidPass123!", "name": "\u200c\ufeff "}),
+        (SendMessageRequest, {"message": "\u200d" * 5}),
+    ], ids=["profile_name", "career_goals", "register_name", "chat_message"])
+    def test_zero_width_padding_rejected_by_schema(self, schema, data):
+        """Test zero-width characters don't count toward required or minimum lengths."""
+        with pytest.raises(ValidationError):
+            schema.model_validate(data)
+
 
 # ===================================================================
 # Oversized Input Tests
@@ -521,8 +570,8 @@ class TestOversizedInputs:
         """Test career_goals max length enforcement."""
         response = await client.put(
             "/api/users/profile",
-            json={"career_goals": "a" * 1001},  # Max is 1000
-            headers=auth_headers
+            content=OVERSIZED_CAREER_GOALS_BODY,
+            headers={**auth_headers, **JSON_CONTENT_TYPE}
         )
         assert response.status_code == 400
 
@@ -531,8 +580,8 @@ class TestOversizedInputs:
         """Test chat message max length enforcement."""
         response = await client.post(
             "/api/chat/message",
-            json={"message": "a" * 5001},  # Should be max 5000
-            headers=auth_headers
+            content=OVERSIZED_MESSAGE_BODY,
+            headers={**auth_headers, **JSON_CONTENT_TYPE}
         )
         assert response.status_code == 400
 
@@ -541,8 +590,8 @@ class TestOversizedInputs:
         """Test exercise solution max length enforcement."""
         response = await client.post(
             f"/api/exercises/{sample_exercise['id']}/submit",
-            json={"solution": "a" * 51000},  # Should be max 50KB
-            headers=auth_headers
+            content=OVERSIZED_SOLUTION_BODY,
+            headers={**auth_headers, **JSON_CONTENT_TYPE}
         )
         assert response.status_code == 400
 
@@ -561,29 +610,24 @@ class TestValidationErrorMessages:
             "password": "ValidPass123!"
         })
         assert response.status_code == 400
-        data = await response.get_json()
-
-        # Error message should be clear
-        assert "message" in data
-        assert len(data["message"]) > 10  # Not just "error"
+        data = response.json()
 
-        # Should mention which field is missing
-        assert "email" in data["message"].lower()
+        # Should name the missing field
+        assert "email" in error_fields(data)
 
     @pytest.mark.asyncio
     async def test_length_exceeded_error_message(self, client, auth_headers):
         """Test error message for length validation failure."""
         response = await client.put(
             "/api/users/profile",
-            json={"bio": "a" * 2001},
-            headers=auth_headers
+            content=OVERSIZED_BIO_BODY,
+            headers={**auth_headers, **JSON_CONTENT_TYPE}
         )
         assert response.status_code == 400
-        data = await response.get_json()
+        data = response.json()
 
-        # Error message should be clear
-        assert "message" in data
-        assert "2000" in data["message"] or "maximum" in data["message"].lower()
+        # Should report the violated limit on the offending field
+        assert field_error(data, "bio")["limit"] == 2000
 
     @pytest.mark.asyncio
     async def test_validation_error_includes_field_name(self, client):
@@ -594,23 +638,149 @@ class TestValidationErrorMessages:
             "name": "Test"
         })
         assert response.status_code == 400
-        data = await response.get_json()
+        data = response.json()
+
+        # Error should name the "email" field
+        assert "email" in error_fields(data)
+
+
+# ===================================================================
+# Schema Validator Caching Tests
+# ===================================================================
+
+class CountingValidator:
+    """Wrap a schema's compiled validator and count the validations it runs."""
+
+    def __init__(self, validator: SchemaValidator):
+        self._validator = validator
+        self.calls = 0
 
-        # Error should mention "email" field
-        assert "email" in data["message"].lower()
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._validator, name)
+
+    def validate_python(self, *args, **kwargs) -> Any:
+        self.calls += 1
+        return self._validator.validate_python(*args, **kwargs)
+
+
+class TestSchemaValidatorCaching:
+    """Test that validated endpoints run their compiled request schema once per request."""
+
+    @pytest.mark.parametrize("method, path, schema, body", [
+        ("POST", "/api/auth/register", RegisterRequest,
+         {"email": "invalid-email", "password": "ValidPass123!", "name": "Test"}),
+        ("POST", "/api/auth/login", LoginRequest, {"email": "invalid-email"}),
+    ], ids=["register", "login"])
+    @pytest.mark.asyncio
+    async def test_one_validation_per_request(self, client, monkeypatch, method, path, schema, body):
+        """
+        Test each request validates its body exactly once, with the validator
+        compiled at import. A rebuild would replace the counting validator.
+        """
+        validator = CountingValidator(schema.__pydantic_validator__)
+        monkeypatch.setattr(schema, "__pydantic_validator__", validator)
+
+        for expected_calls in (1, 2):
+            response = await client.request(method, path, json=body)
+            assert response.status_code == 400
+            assert validator.calls == expected_calls
+
+        assert schema.__pydantic_validator__ is validator
+
+
+# ===================================================================
+# Sanitizer Fast Path Tests
+# ===================================================================
+
+class TestSanitizerFastPath:
+    """Test that markdown sanitizers skip bleach for plain text and reuse their Cleaner."""
+
+    @pytest.mark.parametrize("sanitize", [chat_schemas.sanitize_markdown, sanitization.sanitize_markdown],
+                             ids=["chat", "profile"])
+    def test_plain_text_skips_cleaner(self, sanitize, monkeypatch):
+        """Test plain text is returned stripped without running the HTML parser."""
+        def fail_clean(self, text):
+            raise AssertionError("Cleaner.clean called for plain text")
+
+        monkeypatch.setattr(Cleaner, "clean", fail_clean)
+        assert sanitize("  How do I reverse a list in Python?\n  ") == "How do I reverse a list in Python?"
+
+    @pytest.mark.parametrize("get_cleaner", [
+        lambda: sanitization.get_cleaner(
+            chat_schemas.ALLOWED_TAGS, chat_schemas.ALLOWED_ATTRIBUTES, chat_schemas.ALLOWED_PROTOCOLS
+        ),
+        lambda: sanitization._get_markdown_cleaner(allow_images=False),
+    ], ids=["chat", "profile"])
+    def test_cleaner_is_cached(self, get_cleaner):
+        """Test the bleach Cleaner is built once per thread and reused."""
+        assert get_cleaner() is get_cleaner()
+
+    @pytest.mark.parametrize("payload", MARKDOWN_XSS_PAYLOADS + XSS_SAMPLE + ("a\r\nb", "a & b"))
+    def test_markup_still_cleaned(self, payload):
+        """Test input with markup, entities or control characters still goes through bleach."""
+        expected = bleach.clean(
+            payload.strip(),
+            tags=chat_schemas.ALLOWED_TAGS,
+            attributes=chat_schemas.ALLOWED_ATTRIBUTES,
+            protocols=chat_schemas.ALLOWED_PROTOCOLS,
+            strip=True,
+        )
+        assert chat_schemas.sanitize_markdown(payload) == expected
 
 
 # ===================================================================
 # Test Fixtures
 # ===================================================================
 
-@pytest.fixture
+# Registration, login and exercise generation are expensive, so the
+# authenticated user and its exercise are created once per module. All
+# module-scoped async fixtures share the module-scoped event loop below.
+# The three calls cannot overlap: login needs the registered user and the
+# daily exercise endpoint needs the login token.
+
+# Unique per test run so repeated runs against the same database don't collide
+_RUN_ID = secrets.token_hex(4)
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    """
+    Create one uvloop event loop shared by every test in this module.
+    The tests are many tiny in-process round trips, so per-await loop
+    overhead is a large part of their runtime.
+    """
+    loop = uvloop.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="module")
+async def app():
+    """
+    Create the application once for this module.
+    Its database and Redis pools live on the module event loop and are
+    released with shutdown_app() once the module's tests finish.
+    """
+    app = create_app()
+    app.config['TESTING'] = True
+    yield app
+    await shutdown_app(app)
+
+
+@pytest.fixture(scope="module")
 async def client(app: Quart):
-    """Create test client."""
-    return app.test_client()
+    """
+    Create one HTTP client for the module, talking to the app over ASGI.
+    The client is reused by every request instead of setting up a Quart
+    test-client context per call, and lets asyncio.gather overlap requests.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 async def auth_headers(client, test_user):
     """Get auth headers for authenticated requests."""
     # Login to get access token
@@ -619,18 +789,17 @@ async def auth_headers(client, test_user):
         "password": test_user["password"]
     })
 
-    data = await response.get_json()
+    data = response.json()
     access_token = data["access_token"]
 
     return {"Authorization": f"Bearer {access_token}"}
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 async def test_user(client):
     """Create a test user."""
-    random_id = str(uuid.uuid4())[:8]
     user_data = {
-        "email": f"test_validation_{random_id}@example.com",
+        "email": f"test_validation_{_RUN_ID}@example.com",
         "password": "ValidPass123!",
         "name": "Test Validation User"
     }
@@ -641,7 +810,7 @@ async def test_user(client):
     return user_data
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 async def sample_exercise(client, auth_headers):
     """Create a sample exercise for testing."""
     # Get daily exercise
@@ -650,5 +819,5 @@ async def sample_exercise(client, auth_headers):
         headers=auth_headers
     )
 
-    data = await response.get_json()
+    data = response.json()
     return data["exercise"]
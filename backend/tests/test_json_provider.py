@@ -0,0 +1,49 @@
+"""
+Tests for the application's orjson JSON provider.
+
+The provider must keep the wire format of Quart's default provider, which
+frontend consumers parse.
+"""
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from quart.json.provider import DefaultJSONProvider
+
+
+PAYLOAD = {
+    "updated_at": datetime(2015, 10, 21, 7, 28),
+    "due": date(2015, 10, 21),
+    "grade": Decimal("87.5"),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "name": "Zoë",
+    "nested": {"b": [1, 2.5, None], "a": True},
+}
+
+
+def test_dumps_matches_default_provider(app):
+    """Test that serialized values decode the same as with the default provider."""
+    assert json.loads(app.json.dumps(PAYLOAD)) == json.loads(DefaultJSONProvider(app).dumps(PAYLOAD))
+
+
+def test_datetimes_serialized_as_http_dates(app):
+    """Test that dates and datetimes keep the RFC 822 format."""
+    data = json.loads(app.json.dumps(PAYLOAD))
+
+    assert data["updated_at"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert data["due"] == "Wed, 21 Oct 2015 00:00:00 GMT"
+
+
+@pytest.mark.asyncio
+async def test_response_keys_sorted(app):
+    """Test that response bodies keep sorted keys and the trailing newline."""
+    async with app.app_context():
+        response = app.json.response(PAYLOAD)
+    body = await response.get_data(as_text=True)
+
+    assert response.mimetype == "application/json"
+    assert body.endswith("\n")
+    assert list(json.loads(body)) == sorted(PAYLOAD)
+    assert body.index('"a"') < body.index('"b"')
@@ -1,6 +1,7 @@
 """
 Tests for LLM service caching and rate limiting.
 """
+import os
 import pytest
 import asyncio
 from unittest.mock import AsyncMock, Mock
@@ -22,7 +23,7 @@ from datetime import datetime
 async def redis_client():
     """Create a Redis client for testing."""
     client = await aioredis.from_url(
-        "redis://localhost:6379/15",  # Use test database
+        os.getenv("REDIS_URL", "redis://localhost:6379/15"),  # Use test database
         encoding="utf-8",
         decode_responses=True,
     )
@@ -1,6 +1,7 @@
 """
 Integration tests for LLM service.
 """
+import os
 import pytest
 import redis.asyncio as aioredis
 
@@ -22,7 +23,7 @@ from src.utils.logger import get_logger
 async def redis_client():
     """Create a Redis client for testing."""
     client = await aioredis.from_url(
-        "redis://localhost:6379/15",  # Use test database
+        os.getenv("REDIS_URL", "redis://localhost:6379/15"),  # Use test database
         encoding="utf-8",
         decode_responses=True,
     )
@@ -26,24 +26,58 @@ Test Coverage:
 8. Alert thresholds trigger correctly
 """
 
-import pytest
 import asyncio
-
-# Skip all tests in this file - monitoring infrastructure requires external services (Sentry)
-# These tests should be run in staging/production environment with proper monitoring setup
-# See: devlog/workstream-qa1-phase3-test-failure-analysis.md for rationale
-pytestmark = pytest.mark.skip(reason="Monitoring tests require external infrastructure (Sentry, Prometheus). Defer to staging environment testing.")
 import time
+
+import pytest
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
 from typing import Dict, Any
 import json
 
+import sentry_sdk
+from sentry_sdk.transport import Transport
+
 # Test fixtures will use actual application code, not mocks
 # This ensures we test real integration points
 
 
+# DSN that is never contacted: events go to the in-memory FakeTransport
+FAKE_SENTRY_DSN = "http://public@localhost/1"
+
+
+class FakeTransport(Transport):
+    """Sentry transport that records envelopes instead of sending them."""
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.envelopes = []
+
+    def capture_envelope(self, envelope):
+        self.envelopes.append(envelope)
+
+    def events(self):
+        """Error and message events captured so far."""
+        return [
+            envelope.get_event()
+            for envelope in self.envelopes
+            if envelope.get_event() is not None
+        ]
+
+
+@pytest.fixture(scope="module")
+def sentry_transport():
+    """
+    Fixture providing one in-memory Sentry transport for the module.
+    Tests assert on recorded events instead of patching sentry_sdk.
+    """
+    transport = FakeTransport()
+    yield transport
+    # Leave no client pointing at the fake transport for later modules
+    sentry_sdk.init()
+
+
 @pytest.fixture
-def monitoring_service():
+def monitoring_service(sentry_transport):
     """
     Fixture providing a monitoring service instance.
 
@@ -53,7 +87,13 @@ def monitoring_service():
     - Prometheus metrics
     """
     from src.services.monitoring_service import MonitoringService
-    service = MonitoringService()
+    service = MonitoringService(
+        sentry_dsn=FAKE_SENTRY_DSN,
+        environment="testing",
+        enable_performance=False,  # No tracing or profiler threads in tests
+        transport=sentry_transport
+    )
+    sentry_transport.envelopes.clear()
     yield service
     # Cleanup after test
     service.shutdown()
@@ -76,11 +116,29 @@ def metrics_collector():
     collector.reset()
 
 
+class FakeClock:
+    """Manually advanced clock, so latency can be simulated without sleeping."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    """Fixture providing a fake clock for synthetic request durations."""
+    return FakeClock()
+
+
 class TestErrorTracking:
     """Test suite for error tracking with Sentry integration."""
 
-    @pytest.mark.asyncio
-    async def test_capture_exception_sends_to_sentry(self, monitoring_service):
+    def test_capture_exception_sends_to_sentry(self, monitoring_service, sentry_transport):
         """
         Test that exceptions are captured and sent to Sentry.
 
@@ -92,22 +150,19 @@ class TestErrorTracking:
         # Arrange: Create a test exception
         test_error = ValueError("Test error for monitoring")
 
-        # Mock Sentry to avoid actual API calls
-        with patch('sentry_sdk.capture_exception') as mock_capture:
-            # Act: Capture the exception
-            monitoring_service.capture_exception(
-                test_error,
-                context={"user_id": 123, "endpoint": "/api/test"}
-            )
+        # Act: Capture the exception
+        monitoring_service.capture_exception(
+            test_error,
+            context={"user_id": 123, "endpoint": "/api/test"}
+        )
 
-            # Assert: Verify Sentry was called
-            mock_capture.assert_called_once()
-            # Verify the exception was passed correctly
-            call_args = mock_capture.call_args
-            assert call_args is not None
+        # Assert: One event with the exception and its context was sent
+        events = sentry_transport.events()
+        assert len(events) == 1
+        assert events[0]["exception"]["values"][-1]["type"] == "ValueError"
+        assert events[0]["contexts"]["custom"]["user_id"] == 123
 
-    @pytest.mark.asyncio
-    async def test_capture_message_with_severity(self, monitoring_service):
+    def test_capture_message_with_severity(self, monitoring_service, sentry_transport):
         """
         Test capturing log messages with different severity levels.
 
@@ -116,26 +171,25 @@ class TestErrorTracking:
         - Message content preserved
         - Context attached correctly
         """
-        with patch('sentry_sdk.capture_message') as mock_capture:
-            # Test different severity levels
-            test_cases = [
-                ("info", "Test info message"),
-                ("warning", "Test warning message"),
-                ("error", "Test error message"),
-            ]
-
-            for severity, message in test_cases:
-                monitoring_service.capture_message(
-                    message,
-                    level=severity,
-                    context={"test": True}
-                )
+        # Test different severity levels
+        test_cases = [
+            ("info", "Test info message"),
+            ("warning", "Test warning message"),
+            ("error", "Test error message"),
+        ]
 
-            # Assert: Verify all messages were captured
-            assert mock_capture.call_count == 3
+        for severity, message in test_cases:
+            monitoring_service.capture_message(
+                message,
+                level=severity,
+                context={"test": True}
+            )
 
-    @pytest.mark.asyncio
-    async def test_exception_includes_request_context(self, monitoring_service):
+        # Assert: Verify all messages were captured with their levels
+        events = sentry_transport.events()
+        assert [(event["level"], event["message"]) for event in events] == test_cases
+
+    def test_exception_includes_request_context(self, monitoring_service, sentry_transport):
         """
         Test that exception capture includes HTTP request context.
 
@@ -144,28 +198,25 @@ class TestErrorTracking:
         - Headers included (PII-safe)
         - User information attached
         """
-        with patch('sentry_sdk.capture_exception') as mock_capture, \
-             patch('sentry_sdk.set_context') as mock_set_context:
-
-            # Simulate exception during request handling
-            request_context = {
-                "method": "POST",
-                "url": "/api/exercises/generate",
-                "user_id": 456,
-                "user_email": "test@example.com",
-            }
-
-            monitoring_service.capture_exception(
-                Exception("Request failed"),
-                request_context=request_context
-            )
+        # Simulate exception during request handling
+        request_context = {
+            "method": "POST",
+            "url": "/api/exercises/generate",
+            "user_id": 456,
+            "user_email": "test@example.com",
+        }
+
+        monitoring_service.capture_exception(
+            Exception("Request failed"),
+            request_context=request_context
+        )
 
-            # Assert: Context was set
-            mock_set_context.assert_called()
-            mock_capture.assert_called_once()
+        # Assert: Event sent with the request context attached
+        events = sentry_transport.events()
+        assert len(events) == 1
+        assert events[0]["contexts"]["request"]["url"] == "/api/exercises/generate"
 
-    @pytest.mark.asyncio
-    async def test_error_tracking_disabled_in_development(self, monitoring_service):
+    def test_error_tracking_disabled_in_development(self, monitoring_service, sentry_transport):
         """
         Test that error tracking can be disabled in development.
 
@@ -173,22 +224,81 @@ class TestErrorTracking:
         - Respects environment configuration
         - No Sentry calls when disabled
         """
-        # Mock settings to simulate development environment
-        with patch('src.config.settings.app_env', 'development'), \
-             patch('src.config.settings.sentry_enabled', False), \
-             patch('sentry_sdk.capture_exception') as mock_capture:
+        from src.services.monitoring_service import MonitoringService
+
+        development_service = MonitoringService(environment="development")
+        development_service.capture_exception(Exception("Dev error"))
+
+        # Assert: Sentry not called in development. The exception is only
+        # logged, which the logging integration reports as a logger event
+        assert not development_service.sentry_enabled
+        assert [event for event in sentry_transport.events() if "logger" not in event] == []
+
+    def test_before_send_filters_noisy_errors(self, monitoring_service):
+        """
+        Test that before_send drops transient errors and rate limits repeats.
+
+        Validates:
+        - Transient exception types are never sent
+        - Repeats of one (type, route) are capped at the bucket burst
+        - Other routes keep their own budget
+        """
+        from src.services.monitoring_service import EVENT_BURST
+
+        def send(exc_type, route="/api/chat/message"):
+            event = {"transaction": route}
+            hint = {"exc_info": (exc_type, exc_type(), None)}
+            return monitoring_service._before_send_sentry_event(event, hint)
+
+        assert send(ConnectionResetError) is None
+
+        sent = [send(ValueError) for _ in range(EVENT_BURST + 3)]
+        assert sum(event is not None for event in sent) == EVENT_BURST
+
+        assert send(ValueError, route="/api/users/me") is not None
+
+    def test_before_send_samples_only_health_routes(self, monitoring_service):
+        """
+        Test that health check sampling matches the health routes exactly.
+
+        Validates:
+        - Errors on health routes are sampled, by transaction or full URL
+        - Routes that merely contain "/health" are not sampled
+        """
+        def send(route):
+            event = {"transaction": route}
+            hint = {"exc_info": (ValueError, ValueError(), None)}
+            return monitoring_service._before_send_sentry_event(event, hint)
+
+        with patch("src.services.monitoring_service.random.random", return_value=0.5):
+            assert send("/health") is None
+            assert send("http://localhost/api/health/ready") is None
+            assert send("/api/users/healthcheck-foo") is not None
+
+    def test_event_buckets_capped(self, monitoring_service, monkeypatch):
+        """
+        Test that per-fingerprint token buckets are evicted least recently used first.
+
+        Validates:
+        - The bucket count never exceeds the cap
+        - A recently used fingerprint survives eviction
+        """
+        monkeypatch.setattr("src.services.monitoring_service.MAX_EVENT_BUCKETS", 3)
 
-            monitoring_service.capture_exception(Exception("Dev error"))
+        for route in ("/a", "/b", "/c"):
+            monitoring_service._take_event_token(("ValueError", route))
+        monitoring_service._take_event_token(("ValueError", "/a"))
+        monitoring_service._take_event_token(("ValueError", "/d"))
 
-            # Assert: Sentry not called in development
-            mock_capture.assert_not_called()
+        assert list(monitoring_service._event_buckets) == [
+            ("ValueError", "/c"), ("ValueError", "/a"), ("ValueError", "/d")
+        ]
 
 
 class TestCustomMetrics:
     """Test suite for custom metrics collection."""
 
-    @pytest.mark.asyncio
-    async def test_track_request_latency(self, metrics_collector):
+    def test_track_request_latency(self, metrics_collector, fake_clock):
         """
         Test tracking HTTP request latency.
 
@@ -201,9 +311,9 @@ class TestCustomMetrics:
         endpoint = "/api/exercises/daily"
 
         # Start timing
-        start_time = time.time()
-        await asyncio.sleep(0.1)  # Simulate 100ms request
-        duration = time.time() - start_time
+        start_time = fake_clock.time()
+        fake_clock.advance(0.1)  # Simulate 100ms request
+        duration = fake_clock.time() - start_time
 
         # Record metric
         metrics_collector.record_request_latency(
@@ -217,10 +327,11 @@ class TestCustomMetrics:
         metrics = metrics_collector.get_metrics()
         assert "http_request_duration_seconds" in metrics
         # Verify histogram has data
-        assert len(metrics["http_request_duration_seconds"]) > 0
+        histogram = metrics_collector.latency_histograms[endpoint].snapshot()
+        assert histogram.get_total_count() > 0
+        assert metrics_collector.get_latency_percentiles(endpoint)["p50"] == pytest.approx(duration, rel=0.02)
 
-    @pytest.mark.asyncio
-    async def test_track_llm_api_cost(self, metrics_collector):
+    def test_track_llm_api_cost(self, metrics_collector):
         """
         Test tracking LLM API costs per request.
 
@@ -246,8 +357,7 @@ class TestCustomMetrics:
         total_cost = metrics_collector.get_user_daily_cost(user_id)
         assert total_cost == pytest.approx(0.15, abs=0.01)
 
-    @pytest.mark.asyncio
-    async def test_track_database_query_performance(self, metrics_collector):
+    def test_track_database_query_performance(self, metrics_collector):
         """
         Test tracking database query performance.
 
@@ -279,8 +389,25 @@ class TestCustomMetrics:
         assert len(slow_queries) == 1
         assert slow_queries[0]["duration"] == pytest.approx(0.150)
 
-    @pytest.mark.asyncio
-    async def test_track_active_users(self, metrics_collector):
+    def test_slow_queries_keep_slowest_top_k(self, metrics_collector):
+        """
+        Test that slow query tracking keeps only the slowest K queries.
+        """
+        from src.services.metrics_collector import SLOW_QUERY_TOP_K
+
+        for i in range(SLOW_QUERY_TOP_K * 2):
+            metrics_collector.record_database_query(
+                query_type="SELECT",
+                duration_seconds=0.1 + i / 1000,
+                is_slow=True
+            )
+
+        slow_queries = metrics_collector.get_slow_queries()
+        assert len(slow_queries) == SLOW_QUERY_TOP_K
+        assert slow_queries[0]["duration"] == pytest.approx(0.1 + (SLOW_QUERY_TOP_K * 2 - 1) / 1000)
+        assert slow_queries[-1]["duration"] == pytest.approx(0.1 + SLOW_QUERY_TOP_K / 1000)
+
+    def test_track_active_users(self, metrics_collector):
         """
         Test tracking active users count.
 
@@ -304,8 +431,20 @@ class TestCustomMetrics:
         )
         assert active_count == 5
 
-    @pytest.mark.asyncio
-    async def test_metrics_reset_daily(self, metrics_collector):
+    def test_idle_users_evicted_after_retention(self, metrics_collector, fake_clock):
+        """
+        Test that users idle past the retention period stop being tracked.
+        """
+        from src.services.metrics_collector import ACTIVE_USER_RETENTION_SECONDS
+
+        with patch('src.services.metrics_collector.time.time', fake_clock.time):
+            metrics_collector.record_user_activity(user_id=1, activity_type="login")
+            fake_clock.advance(ACTIVE_USER_RETENTION_SECONDS + 1)
+            metrics_collector.record_user_activity(user_id=2, activity_type="login")
+
+        assert set(metrics_collector.user_last_activity) == {2}
+
+    def test_metrics_reset_daily(self, metrics_collector):
         """
         Test that certain metrics reset daily (like cost tracking).
 
@@ -326,7 +465,7 @@ class TestCustomMetrics:
         )
 
         # Simulate day rollover
-        metrics_collector.reset_daily_metrics()
+        metrics_collector.snapshot_and_archive()
 
         # Assert: Daily cost reset
         current_cost = metrics_collector.get_user_daily_cost(user_id)
@@ -360,6 +499,7 @@ class TestPrometheusMetrics:
         assert "# HELP" in body  # Prometheus metric help text
         assert "# TYPE" in body  # Prometheus metric type declaration
 
+    @pytest.mark.skip(reason="Process and GC collectors are registered by the deployed exporter, not the test app")
     @pytest.mark.asyncio
     async def test_default_metrics_included(self, client):
         """
@@ -427,10 +567,61 @@ class TestPrometheusMetrics:
         assert 'method="POST"' in body
         assert 'status=' in body  # Status code label
 
+    def test_endpoint_labels_capped(self, metrics_collector):
+        """
+        Test that endpoint labels beyond the cap collapse into one label.
+        """
+        from src.services.metrics_collector import MAX_ENDPOINT_LABELS, OTHER_ENDPOINT_LABEL
+
+        for i in range(MAX_ENDPOINT_LABELS + 10):
+            metrics_collector.record_request_latency(f"/api/route-{i}", "GET", 200, 0.01)
+
+        assert len(metrics_collector.endpoint_labels) == MAX_ENDPOINT_LABELS
+        body = metrics_collector.generate_prometheus_metrics()
+        assert f'endpoint="{OTHER_ENDPOINT_LABEL}"'.encode() in body
+
+        # A reset clears the label set and the cached children together, so
+        # routes past the cap before the reset get their own label again
+        metrics_collector.reset()
+        metrics_collector.record_request_latency(f"/api/route-{MAX_ENDPOINT_LABELS}", "GET", 200, 0.01)
+
+        assert metrics_collector.endpoint_labels == {f"/api/route-{MAX_ENDPOINT_LABELS}"}
+        assert list(metrics_collector._request_metric_children) == [
+            ("GET", f"/api/route-{MAX_ENDPOINT_LABELS}", 200)
+        ]
+
+    async def test_route_parameters_share_endpoint_label(self, client):
+        """
+        Test that requests to parameterized routes are labelled by route template.
+        """
+        await client.get("/api/exercises/101")
+        await client.get("/api/exercises/102")
+
+        response = await client.get("/metrics")
+        body = await response.get_data(as_text=True)
+
+        assert 'endpoint="/api/exercises/101"' not in body
+        assert 'endpoint="/api/exercises/<int:exercise_id>"' in body
+
+    def test_exposition_cached_between_close_scrapes(self, metrics_collector, fake_clock):
+        """
+        Test that scrapes within the TTL reuse one serialized body.
+        """
+        from src.services.metrics_collector import METRICS_EXPOSITION_TTL_SECONDS
+
+        with patch('src.services.metrics_collector.time.monotonic', fake_clock.time):
+            first = metrics_collector.generate_prometheus_metrics()
+            metrics_collector.record_request_latency("/api/cached", "GET", 200, 0.1)
+            assert metrics_collector.generate_prometheus_metrics() is first
+
+            fake_clock.advance(METRICS_EXPOSITION_TTL_SECONDS)
+            assert b'endpoint="/api/cached"' in metrics_collector.generate_prometheus_metrics()
+
 
 class TestHealthChecksWithMonitoring:
     """Test suite for health checks including monitoring status."""
 
+    @pytest.mark.skip(reason="Monitoring status needs the staging Sentry and Prometheus setup")
     @pytest.mark.asyncio
     async def test_health_check_includes_monitoring_status(self, client):
         """
@@ -475,8 +666,7 @@ class TestHealthChecksWithMonitoring:
 class TestAlertConfiguration:
     """Test suite for alert thresholds and routing."""
 
-    @pytest.mark.asyncio
-    async def test_alert_triggered_on_high_error_rate(self, monitoring_service):
+    def test_alert_triggered_on_high_error_rate(self, monitoring_service):
         """
         Test that alerts trigger when error rate exceeds threshold.
 
@@ -497,15 +687,41 @@ class TestAlertConfiguration:
             # Check if alert was triggered
             monitoring_service.check_alert_thresholds()
 
-            # Assert: Alert sent if threshold exceeded
-            # Threshold: 5 errors per minute
-            if mock_alert.call_count > 0:
-                alert_data = mock_alert.call_args[0][0]
-                assert "error_rate" in alert_data
-                assert alert_data["severity"] in ["warning", "critical"]
+            # Assert: 10 errors exceed the 5 errors per minute threshold
+            mock_alert.assert_called_once()
+            alert_data = mock_alert.call_args[0][0]
+            assert alert_data["type"] == "high_error_rate"
+            assert alert_data["error_count"] == 10
+            assert alert_data["severity"] in ["warning", "critical"]
 
-    @pytest.mark.asyncio
-    async def test_alert_triggered_on_high_latency(self, monitoring_service):
+    def test_error_burst_alerts_once_across_checks(self, monitoring_service):
+        """
+        Test that consecutive checks over one error burst send a single alert.
+
+        Validates:
+        - The next periodic check still sees the burst in its one-minute window
+        - The repeated alert is suppressed by the cooldown
+        """
+        from src.services.monitoring_service import ALERT_CHECK_INTERVAL_SECONDS
+
+        for i in range(10):
+            monitoring_service.record_error(
+                error_type="DATABASE_CONNECTION",
+                message=f"Connection failed {i}"
+            )
+
+        with patch('src.services.monitoring_service.MonitoringService.send_alert') as mock_alert:
+            monitoring_service.check_alert_thresholds()
+
+            # The alert task runs the next check one interval later
+            next_check = time.time() + ALERT_CHECK_INTERVAL_SECONDS
+            with patch('src.services.monitoring_service.time.time', return_value=next_check):
+                monitoring_service.check_alert_thresholds()
+
+            mock_alert.assert_called_once()
+            assert mock_alert.call_args[0][0]["type"] == "high_error_rate"
+
+    def test_alert_triggered_on_high_latency(self, monitoring_service):
         """
         Test alert when P95 latency exceeds threshold.
 
@@ -525,11 +741,14 @@ class TestAlertConfiguration:
 
             monitoring_service.check_alert_thresholds()
 
-            # May trigger latency alert
-            # Verification done by checking mock was potentially called
+            # Assert: P95 falls in the slow 20%, so the latency alert fires
+            mock_alert.assert_called_once()
+            alert_data = mock_alert.call_args[0][0]
+            assert alert_data["type"] == "high_latency"
+            assert alert_data["endpoint"] == "/api/exercises/generate"
+            assert alert_data["p95_latency"] == pytest.approx(3.0, rel=0.01)
 
-    @pytest.mark.asyncio
-    async def test_alert_triggered_on_cost_limit(self, monitoring_service):
+    def test_alert_triggered_on_cost_limit(self, monitoring_service):
         """
         Test alert when user exceeds daily cost limit.
 
@@ -555,12 +774,25 @@ class TestAlertConfiguration:
                 alert_data = mock_alert.call_args[0][0]
                 assert alert_data["severity"] == "warning"
 
+    @pytest.mark.asyncio
+    async def test_alert_thresholds_checked_in_background(self, monitoring_service):
+        """
+        Test that the background alert task evaluates thresholds on its own.
+        """
+        with patch('src.services.monitoring_service.MonitoringService.check_alert_thresholds') as mock_check:
+            monitoring_service.start_alert_checks(interval_seconds=0)
+            for _ in range(3):
+                await asyncio.sleep(0)
+            await monitoring_service.stop_alert_checks()
+
+        assert mock_check.call_count >= 1
+        assert monitoring_service._alert_task is None
+
 
 class TestPerformanceMetrics:
     """Test suite for performance metrics collection."""
 
-    @pytest.mark.asyncio
-    async def test_request_latency_histogram(self, metrics_collector):
+    def test_request_latency_histogram(self, metrics_collector):
         """
         Test request latency histogram buckets.
 
@@ -590,8 +822,31 @@ class TestPerformanceMetrics:
         assert "p95" in percentiles
         assert "p99" in percentiles
 
-    @pytest.mark.asyncio
-    async def test_database_connection_pool_metrics(self, metrics_collector):
+    def test_latency_window_drops_old_samples(self):
+        """
+        Test latency percentiles only reflect the sliding window.
+
+        Validates:
+        - Samples inside the window are merged across slots
+        - Samples age out slot by slot without a reset
+        """
+        from src.services.metrics_collector import SlidingWindowHistogram
+
+        now = [0.0]
+        window = SlidingWindowHistogram(window_seconds=60, slots=6, clock=lambda: now[0])
+
+        window.record_value(2_000_000)  # 2s outlier at t=0
+        now[0] = 30.0
+        window.record_value(10_000)  # 10ms at t=30
+        assert window.snapshot().get_total_count() == 2
+
+        # Outlier's slot leaves the window; the recent sample stays
+        now[0] = 65.0
+        snapshot = window.snapshot()
+        assert snapshot.get_total_count() == 1
+        assert snapshot.get_max_value() == pytest.approx(10_000, rel=0.01)
+
+    def test_database_connection_pool_metrics(self, metrics_collector):
         """
         Test database connection pool metrics.
 
@@ -617,8 +872,7 @@ class TestPerformanceMetrics:
 class TestMonitoringServiceIntegration:
     """Integration tests for monitoring service with actual app."""
 
-    @pytest.mark.asyncio
-    async def test_monitoring_initialized_with_app(self, app):
+    def test_monitoring_initialized_with_app(self, fresh_app):
         """
         Test monitoring service initializes with Quart app.
 
@@ -628,7 +882,7 @@ class TestMonitoringServiceIntegration:
         - Request hooks installed
         """
         # Assert: Monitoring service is attached to app
-        assert hasattr(app, 'monitoring_service') or 'monitoring_service' in app.extensions
+        assert hasattr(fresh_app, 'monitoring_service') or 'monitoring_service' in fresh_app.extensions
 
     @pytest.mark.asyncio
     async def test_exception_in_route_captured(self, client):
@@ -669,10 +923,23 @@ class TestMonitoringServiceIntegration:
 
 
 # Fixtures for test client
-@pytest.fixture
-async def app():
-    """Create test app instance with monitoring enabled."""
+@pytest.fixture(scope="module", autouse=True)
+def metrics_enabled():
+    """
+    Serve /metrics for this module regardless of the environment.
+    .env.test.example turns metrics off, and the endpoint reads the setting per request.
+    """
+    from src.config import settings
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(settings, "metrics_enabled", True)
+        yield
+
+
+def _create_monitored_app():
+    """Create an app with a monitoring service attached (no real Sentry)."""
     from src.app import create_app
+    from src.services.monitoring_service import MonitoringService
 
     # Test configuration with monitoring enabled
     test_config = {
@@ -682,21 +949,44 @@ async def app():
 
     app = create_app(config_override=test_config)
 
-    # Initialize monitoring service
-    from src.services.monitoring_service import MonitoringService
     monitoring_service = MonitoringService(
         sentry_dsn=None,  # No real Sentry in tests
         environment="testing"
     )
     app.extensions['monitoring_service'] = monitoring_service
 
-    yield app
+    return app
 
-    # Cleanup
-    await monitoring_service.shutdown()
+
+@pytest.fixture(scope="module")
+def app():
+    """
+    Create the test app once for this module.
+    Most tests only read the metrics endpoint, so they share one app
+    instead of paying create_app() each; reset_metrics clears state between them.
+    """
+    app = _create_monitored_app()
+    yield app
+    app.extensions['monitoring_service'].shutdown()
 
 
 @pytest.fixture
-async def client(app):
-    """Create test client."""
+def fresh_app():
+    """Create a dedicated app for tests that inspect app initialization."""
+    app = _create_monitored_app()
+    yield app
+    app.extensions['monitoring_service'].shutdown()
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    """Create one test client shared by the module."""
     return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Clear the shared metrics collector's internal state after each test."""
+    yield
+    from src.services.metrics_collector import get_metrics_collector
+    get_metrics_collector().reset()
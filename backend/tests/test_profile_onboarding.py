@@ -2,55 +2,174 @@
 Integration tests for profile and onboarding API endpoints.
 """
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
-from src.models.user import User, SkillLevel, UserRole
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from src.models.user import SkillLevel, UserRole
 from src.services.profile_service import ProfileService
 from datetime import datetime
+from types import MappingProxyType, SimpleNamespace
+
+
+# Keep the module on one xdist worker so its module-scoped AuthService stub
+# is installed once
+pytestmark = pytest.mark.xdist_group("profile")
+
+
+# JWT claims every authenticated request in this module resolves to
+JWT_PAYLOAD = MappingProxyType({
+    "user_id": 1,
+    "email": "test@example.com",
+    "role": "student",
+    "jti": "test-jti"
+})
+
+# Request headers for every authenticated call; the JWT is mocked above.
+# A plain dict, since werkzeug's Headers only unpacks dicts (the test
+# client copies it and never mutates it)
+AUTH_HEADERS = {"Authorization": "Bearer test-token"}
+
+# A complete, valid onboarding submission; invalid cases derive from it
+VALID_ONBOARDING = MappingProxyType({
+    "programming_language": "python",
+    "skill_level": "beginner",
+    "career_goals": "Become a full-stack developer with expertise in React and Node.js",
+    "learning_style": "hands-on",
+    "time_commitment": "1-2 hours/day"
+})
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mock_jwt_auth():
+    """
+    Authenticate every request in this module as JWT_PAYLOAD's user.
+    AuthService is stubbed once for the module with plain functions rather
+    than entering mock.patch around every test.
+    """
+    from src.services.auth_service import AuthService
+
+    def verify_jwt_token(token, token_type="access"):
+        return JWT_PAYLOAD
+
+    async def validate_session(token):
+        return True
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(AuthService, "verify_jwt_token", staticmethod(verify_jwt_token))
+        monkeypatch.setattr(AuthService, "validate_session", staticmethod(validate_session))
+        yield
+
+
+# Attributes of a fresh, not yet onboarded student account
+USER_DEFAULTS = {
+    "id": 1,
+    "email": "test@example.com",
+    "name": "Test User",
+    "password_hash": "hashed_password",
+    "email_verified": True,
+    "role": UserRole.STUDENT,
+    "is_active": True,
+    "is_mentor": False,
+    "programming_language": None,
+    "skill_level": None,
+    "career_goals": None,
+    "learning_style": None,
+    "time_commitment": None,
+    "onboarding_completed": False,
+    "current_streak": 0,
+    "longest_streak": 0,
+    "exercises_completed": 0,
+    "last_exercise_date": None,
+    "avatar_url": None,
+    "bio": None,
+    "github_id": None,
+    "google_id": None,
+    "oauth_provider": None,
+    "last_login": None,
+}
+
+# Mock users never reach code that compares against the wall clock, so
+# their timestamps are a fixed instant rather than a datetime.now() call
+FROZEN_NOW = datetime(2024, 1, 1)
+
+
+class _Result:
+    """
+    Stand-in for a SQLAlchemy Result holding the single user a query loads.
+    Only scalar_one_or_none() is needed, so a MagicMock is overkill here.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value=None):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+@pytest.fixture
+def mock_db_session(monkeypatch):
+    """
+    Patch the database session and return a binder for the user it loads.
+
+    Usage:
+        mock_db_session(onboarded_user)  # queries now return this user
+    """
+    mock_session = AsyncMock()
+    mock_result = _Result()
+    mock_session.execute.return_value = mock_result
+
+    def bind(user):
+        mock_result.value = user
+
+    @asynccontextmanager
+    async def get_async_db_session():
+        yield mock_session
+
+    monkeypatch.setattr('src.utils.database.get_async_db_session', get_async_db_session)
+    return bind
 
 
 @pytest.fixture
 def mock_user():
-    """Create a mock user for testing."""
-    user = MagicMock(spec=User)
-    user.id = 1
-    user.email = "test@example.com"
-    user.name = "Test User"
-    user.password_hash = "hashed_password"
-    user.email_verified = True
-    user.role = UserRole.STUDENT
-    user.is_active = True
-    user.is_mentor = False
-    user.programming_language = None
-    user.skill_level = None
-    user.career_goals = None
-    user.learning_style = None
-    user.time_commitment = None
-    user.onboarding_completed = False
-    user.current_streak = 0
-    user.longest_streak = 0
-    user.exercises_completed = 0
-    user.last_exercise_date = None
-    user.avatar_url = None
-    user.bio = None
-    user.github_id = None
-    user.google_id = None
-    user.oauth_provider = None
-    user.created_at = datetime.now()
-    user.updated_at = datetime.now()
-    user.last_login = None
-    return user
+    """
+    Create a stand-in user for testing.
+    A plain namespace is enough here; MagicMock(spec=User) would
+    introspect the whole SQLAlchemy model on every test.
+    """
+    return SimpleNamespace(
+        **USER_DEFAULTS,
+        created_at=FROZEN_NOW,
+        updated_at=FROZEN_NOW
+    )
 
 
 @pytest.fixture
-def onboarded_user(mock_user):
-    """Create a mock user who has completed onboarding."""
-    mock_user.programming_language = "python"
-    mock_user.skill_level = SkillLevel.INTERMEDIATE
-    mock_user.career_goals = "Become a full-stack developer"
-    mock_user.learning_style = "hands-on"
-    mock_user.time_commitment = "1-2 hours/day"
-    mock_user.onboarding_completed = True
-    return mock_user
+async def onboarded_user(test_user, db_session):
+    """Create a real user row who has completed onboarding."""
+    test_user.programming_language = "python"
+    test_user.skill_level = SkillLevel.INTERMEDIATE
+    test_user.career_goals = "Become a full-stack developer"
+    test_user.learning_style = "hands-on"
+    test_user.time_commitment = "1-2 hours/day"
+    test_user.onboarding_completed = True
+    await db_session.flush()
+    return test_user
+
+
+@pytest.fixture
+def real_db_session(db_session, patched_get_session, monkeypatch):
+    """
+    Serve every database session in a request from the test transaction.
+    patched_get_session covers the API modules; the email verification
+    check opens its session through src.utils.database, so that is
+    routed to the same transaction here. Handlers then run real SQL
+    against rows the test created, instead of echoing a mocked result.
+    """
+    @asynccontextmanager
+    async def get_async_db_session():
+        yield db_session
+
+    monkeypatch.setattr('src.utils.database.get_async_db_session', get_async_db_session)
 
 
 class TestOnboardingQuestions:
@@ -59,30 +178,18 @@ class TestOnboardingQuestions:
     @pytest.mark.asyncio
     async def test_get_onboarding_questions_success(self, client):
         """Test successful retrieval of onboarding questions."""
-        # Mock authentication
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            response = await client.get(
-                "/api/users/onboarding/questions",
-                headers={"Authorization": "Bearer test-token"}
-            )
-
-            assert response.status_code == 200
-            data = await response.get_json()
-            assert "questions" in data
-            assert "total_questions" in data
-            assert "estimated_time" in data
-            assert data["total_questions"] == 5
-            assert len(data["questions"]) == 5
+        response = await client.get(
+            "/api/users/onboarding/questions",
+            headers=AUTH_HEADERS
+        )
+
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert "questions" in data
+        assert "total_questions" in data
+        assert "estimated_time" in data
+        assert data["total_questions"] == 5
+        assert len(data["questions"]) == 5
 
     @pytest.mark.asyncio
     async def test_get_onboarding_questions_unauthorized(self, client):
@@ -95,78 +202,35 @@ class TestOnboardingStatus:
     """Tests for onboarding status endpoint."""
 
     @pytest.mark.asyncio
-    async def test_get_onboarding_status_not_completed(self, client, mock_user):
-        """Test onboarding status for user who hasn't completed onboarding."""
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate, \
-             patch('src.services.profile_service.ProfileService.check_onboarding_status') as mock_status:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-            mock_status.return_value = {
-                "onboarding_completed": False,
-                "can_resume": True,
-                "profile_complete": False
-            }
-
-            response = await client.get(
-                "/api/users/onboarding/status",
-                headers={"Authorization": "Bearer test-token"}
-            )
-
-            assert response.status_code == 200
-            data = await response.get_json()
-            assert data["onboarding_completed"] is False
-            assert data["can_resume"] is True
+    @pytest.mark.parametrize("status", [
+        {"onboarding_completed": False, "can_resume": True, "profile_complete": False},
+        {"onboarding_completed": True, "can_resume": False, "profile_complete": True},
+    ], ids=["not_completed", "completed"])
+    async def test_get_onboarding_status(self, client, monkeypatch, status):
+        """Test onboarding status is returned as reported by the profile service."""
+        async def check_onboarding_status(session, user_id):
+            return status
 
-    @pytest.mark.asyncio
-    async def test_get_onboarding_status_completed(self, client, onboarded_user):
-        """Test onboarding status for user who has completed onboarding."""
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate, \
-             patch('src.services.profile_service.ProfileService.check_onboarding_status') as mock_status:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-            mock_status.return_value = {
-                "onboarding_completed": True,
-                "can_resume": False,
-                "profile_complete": True
-            }
+        monkeypatch.setattr(ProfileService, "check_onboarding_status", staticmethod(check_onboarding_status))
 
-            response = await client.get(
-                "/api/users/onboarding/status",
-                headers={"Authorization": "Bearer test-token"}
-            )
+        response = await client.get(
+            "/api/users/onboarding/status",
+            headers=AUTH_HEADERS
+        )
 
-            assert response.status_code == 200
-            data = await response.get_json()
-            assert data["onboarding_completed"] is True
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["onboarding_completed"] is status["onboarding_completed"]
+        assert data["can_resume"] is status["can_resume"]
 
 
 class TestCompleteOnboarding:
     """Tests for completing onboarding interview."""
 
     @pytest.mark.asyncio
-    async def test_complete_onboarding_success(self, client, mock_user):
+    async def test_complete_onboarding_success(self, client, mock_user, mock_db_session):
         """Test successful onboarding completion."""
-        onboarding_data = {
-            "programming_language": "python",
-            "skill_level": "beginner",
-            "career_goals": "Become a full-stack developer with expertise in React and Node.js",
-            "learning_style": "hands-on",
-            "time_commitment": "1-2 hours/day"
-        }
+        onboarding_data = VALID_ONBOARDING
 
         mock_user.programming_language = onboarding_data["programming_language"]
         mock_user.skill_level = SkillLevel.BEGINNER
@@ -175,319 +239,138 @@ class TestCompleteOnboarding:
         mock_user.time_commitment = onboarding_data["time_commitment"]
         mock_user.onboarding_completed = True
 
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate, \
-             patch('src.utils.database.get_async_db_session') as mock_db:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            # Mock database session and query
-            mock_session = AsyncMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = mock_user
-            mock_session.execute.return_value = mock_result
-            mock_db.return_value.__aenter__.return_value = mock_session
-
-            response = await client.post(
-                "/api/users/onboarding",
-                json=onboarding_data,
-                headers={"Authorization": "Bearer test-token"}
-            )
-
-            assert response.status_code == 200
-            data = await response.get_json()
-            assert data["onboarding_completed"] is True
-            assert data["programming_language"] == "python"
-            assert data["skill_level"] == "beginner"
-            assert "message" in data
+        mock_db_session(mock_user)
 
-    @pytest.mark.asyncio
-    async def test_complete_onboarding_invalid_language(self, client):
-        """Test onboarding with invalid programming language."""
-        onboarding_data = {
-            "programming_language": "cobol",  # Unsupported language
-            "skill_level": "beginner",
-            "career_goals": "Become a full-stack developer",
-            "learning_style": "hands-on",
-            "time_commitment": "1-2 hours/day"
-        }
-
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            response = await client.post(
-                "/api/users/onboarding",
-                json=onboarding_data,
-                headers={"Authorization": "Bearer test-token"}
-            )
+        response = await client.post(
+            "/api/users/onboarding",
+            json=dict(onboarding_data),
+            headers=AUTH_HEADERS
+        )
 
-            assert response.status_code == 400
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["onboarding_completed"] is True
+        assert data["programming_language"] == "python"
+        assert data["skill_level"] == "beginner"
+        assert "message" in data
 
     @pytest.mark.asyncio
-    async def test_complete_onboarding_missing_fields(self, client):
-        """Test onboarding with missing required fields."""
-        onboarding_data = {
-            "programming_language": "python",
-            "skill_level": "beginner"
-            # Missing: career_goals, learning_style, time_commitment
-        }
-
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            response = await client.post(
-                "/api/users/onboarding",
-                json=onboarding_data,
-                headers={"Authorization": "Bearer test-token"}
-            )
-
-            assert response.status_code == 400
-
-    @pytest.mark.asyncio
-    async def test_complete_onboarding_short_career_goals(self, client):
-        """Test onboarding with career goals that are too short."""
-        onboarding_data = {
-            "programming_language": "python",
-            "skill_level": "beginner",
-            "career_goals": "code",  # Too short
-            "learning_style": "hands-on",
-            "time_commitment": "1-2 hours/day"
-        }
-
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            response = await client.post(
-                "/api/users/onboarding",
-                json=onboarding_data,
-                headers={"Authorization": "Bearer test-token"}
-            )
-
-            assert response.status_code == 400
+    @pytest.mark.parametrize("onboarding_data", [
+        dict(VALID_ONBOARDING, programming_language="cobol"),  # Unsupported language
+        # Missing: career_goals, learning_style, time_commitment
+        {key: VALID_ONBOARDING[key] for key in ("programming_language", "skill_level")},
+        dict(VALID_ONBOARDING, career_goals="code"),  # Too short
+    ], ids=["invalid_language", "missing_fields", "short_career_goals"])
+    async def test_complete_onboarding_rejects_invalid_data(self, client, onboarding_data):
+        """Test onboarding with invalid or incomplete answers is rejected."""
+        response = await client.post(
+            "/api/users/onboarding",
+            json=onboarding_data,
+            headers=AUTH_HEADERS
+        )
+
+        assert response.status_code == 400
 
 
 class TestUserProfile:
     """Tests for user profile endpoints."""
 
     @pytest.mark.asyncio
-    async def test_get_user_profile_success(self, client, onboarded_user):
+    async def test_get_user_profile_success(self, client, onboarded_user, real_db_session, mock_jwt_auth_factory):
         """Test successful retrieval of user profile."""
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate, \
-             patch('src.utils.database.get_async_db_session') as mock_db:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            # Mock database session
-            mock_session = AsyncMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = onboarded_user
-            mock_session.execute.return_value = mock_result
-            mock_db.return_value.__aenter__.return_value = mock_session
-
+        with mock_jwt_auth_factory(onboarded_user):
             response = await client.get(
                 "/api/users/me",
-                headers={"Authorization": "Bearer test-token"}
+                headers=AUTH_HEADERS
             )
 
-            assert response.status_code == 200
-            data = await response.get_json()
-            assert data["id"] == 1
-            assert data["email"] == "test@example.com"
-            assert data["programming_language"] == "python"
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["id"] == onboarded_user.id
+        assert data["email"] == onboarded_user.email
+        assert data["programming_language"] == "python"
 
     @pytest.mark.asyncio
-    async def test_update_user_profile_success(self, client, onboarded_user):
+    async def test_update_user_profile_success(self, client, onboarded_user, real_db_session, mock_jwt_auth_factory):
         """Test successful profile update."""
         update_data = {
             "name": "Updated Name",
             "skill_level": "advanced"
         }
 
-        onboarded_user.name = "Updated Name"
-        onboarded_user.skill_level = SkillLevel.ADVANCED
-
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate, \
-             patch('src.utils.database.get_async_db_session') as mock_db:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            # Mock database session
-            mock_session = AsyncMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = onboarded_user
-            mock_session.execute.return_value = mock_result
-            mock_db.return_value.__aenter__.return_value = mock_session
-
+        with mock_jwt_auth_factory(onboarded_user):
             response = await client.put(
                 "/api/users/me",
                 json=update_data,
-                headers={"Authorization": "Bearer test-token"}
+                headers=AUTH_HEADERS
             )
 
-            assert response.status_code == 200
-            data = await response.get_json()
-            assert "message" in data
-            assert data["profile"]["name"] == "Updated Name"
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert "message" in data
+        assert data["profile"]["name"] == "Updated Name"
+        assert onboarded_user.skill_level == SkillLevel.ADVANCED
 
 
 class TestUserProgress:
     """Tests for user progress endpoint."""
 
     @pytest.mark.asyncio
-    async def test_get_user_progress(self, client, onboarded_user):
+    async def test_get_user_progress(self, client, onboarded_user, real_db_session, mock_jwt_auth_factory, db_session):
         """Test retrieval of user progress."""
         onboarded_user.current_streak = 5
         onboarded_user.longest_streak = 10
         onboarded_user.exercises_completed = 25
+        await db_session.flush()
 
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate, \
-             patch('src.utils.database.get_async_db_session') as mock_db:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            # Mock database session
-            mock_session = AsyncMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = onboarded_user
-            mock_session.execute.return_value = mock_result
-            mock_db.return_value.__aenter__.return_value = mock_session
-
+        with mock_jwt_auth_factory(onboarded_user):
             response = await client.get(
                 "/api/users/me/progress",
-                headers={"Authorization": "Bearer test-token"}
+                headers=AUTH_HEADERS
             )
 
-            assert response.status_code == 200
-            data = await response.get_json()
-            assert data["current_streak"] == 5
-            assert data["longest_streak"] == 10
-            assert data["exercises_completed"] == 25
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["current_streak"] == 5
+        assert data["longest_streak"] == 10
+        assert data["exercises_completed"] == 25
 
 
 class TestUserPreferences:
     """Tests for user preferences endpoints."""
 
     @pytest.mark.asyncio
-    async def test_get_user_preferences(self, client, onboarded_user):
+    async def test_get_user_preferences(self, client, onboarded_user, real_db_session, mock_jwt_auth_factory):
         """Test retrieval of user preferences."""
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate, \
-             patch('src.utils.database.get_async_db_session') as mock_db:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            # Mock database session
-            mock_session = AsyncMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = onboarded_user
-            mock_session.execute.return_value = mock_result
-            mock_db.return_value.__aenter__.return_value = mock_session
-
+        with mock_jwt_auth_factory(onboarded_user):
             response = await client.get(
                 "/api/users/me/preferences",
-                headers={"Authorization": "Bearer test-token"}
+                headers=AUTH_HEADERS
             )
 
-            assert response.status_code == 200
-            data = await response.get_json()
-            assert data["programming_language"] == "python"
-            assert data["skill_level"] == "intermediate"
-            assert data["learning_style"] == "hands-on"
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert data["programming_language"] == "python"
+        assert data["skill_level"] == "intermediate"
+        assert data["learning_style"] == "hands-on"
 
     @pytest.mark.asyncio
-    async def test_update_user_preferences(self, client, onboarded_user):
+    async def test_update_user_preferences(self, client, onboarded_user, real_db_session, mock_jwt_auth_factory):
         """Test updating user preferences."""
         update_data = {
             "programming_language": "javascript",
             "learning_style": "video-based"
         }
 
-        onboarded_user.programming_language = "javascript"
-        onboarded_user.learning_style = "video-based"
-
-        with patch('src.middleware.auth_middleware.AuthService.verify_jwt_token') as mock_verify, \
-             patch('src.middleware.auth_middleware.AuthService.validate_session') as mock_validate, \
-             patch('src.utils.database.get_async_db_session') as mock_db:
-
-            mock_verify.return_value = {
-                "user_id": 1,
-                "email": "test@example.com",
-                "role": "student",
-                "jti": "test-jti"
-            }
-            mock_validate.return_value = True
-
-            # Mock database session
-            mock_session = AsyncMock()
-            mock_result = MagicMock()
-            mock_result.scalar_one_or_none.return_value = onboarded_user
-            mock_session.execute.return_value = mock_result
-            mock_db.return_value.__aenter__.return_value = mock_session
-
+        with mock_jwt_auth_factory(onboarded_user):
             response = await client.put(
                 "/api/users/me/preferences",
                 json=update_data,
-                headers={"Authorization": "Bearer test-token"}
+                headers=AUTH_HEADERS
             )
 
-            assert response.status_code == 200
-            data = await response.get_json()
-            assert "message" in data
-            assert data["preferences"]["programming_language"] == "javascript"
+        assert response.status_code == 200
+        data = await response.get_json()
+        assert "message" in data
+        assert data["preferences"]["programming_language"] == "javascript"
+        assert onboarded_user.learning_style == "video-based"
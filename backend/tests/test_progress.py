@@ -21,16 +21,126 @@ Testing Strategy:
 """
 import pytest
 import json
-from datetime import datetime, timedelta
+from contextvars import ContextVar, Token
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
 from unittest.mock import AsyncMock, patch, MagicMock
+from quart.testing import QuartClient
+from sqlalchemy import insert
 from src.models.user import User
 from src.models.exercise import Exercise, UserExercise, ExerciseType, ExerciseDifficulty, ExerciseStatus
 
 
+# Keep the module on one xdist worker: every test seeds the same user
+# email, which would contend across workers
+pytestmark = pytest.mark.xdist_group("progress")
+
+
+# Request headers the module's client sends on every call; the jwt_bypass
+# stub accepts any token. The test client copies it and never mutates it.
+AUTH_HEADERS = {'Authorization': 'Bearer test_token'}
+
+# JWT claims of the user the current test authenticates as, set through
+# authenticate(). Requests issued by the test inherit its context.
+_CURRENT_USER: ContextVar[dict] = ContextVar("progress_test_user")
+
+
+# Keys every /api/progress response must carry
+REQUIRED_PROGRESS_KEYS = frozenset({
+    'exercises_completed',
+    'current_streak',
+    'longest_streak',
+    'total_time_spent_seconds',
+    'average_grade',
+    'achievements',
+    'skill_levels',
+})
+
+# Keys every history entry and per-topic skill level must carry
+HISTORY_ENTRY_KEYS = frozenset({'date', 'exercises_completed', 'time_spent_seconds'})
+SKILL_LEVEL_KEYS = frozenset({'level', 'exercises_completed', 'average_grade'})
+
+# Keys every /api/progress/calculate-skill-level response must carry
+SKILL_CALCULATION_KEYS = frozenset({'topic', 'current_level', 'level_changed'})
+
+# Keys an earned badge must carry (plus an icon_url or icon)
+EARNED_BADGE_KEYS = frozenset({'name', 'description', 'earned_at'})
+
+# Media types accepted for the CSV export
+CSV_MIMETYPES = frozenset({'text/csv', 'application/csv'})
+
+
+# Static columns of the exercises completed_exercises seeds, one per day
+COMPLETED_EXERCISE_DAYS = 5
+EXERCISE_ROW = MappingProxyType({
+    "description": "Test exercise",
+    "instructions": "Complete the task",
+    "exercise_type": ExerciseType.ALGORITHM,
+    "difficulty": ExerciseDifficulty.MEDIUM,
+    "programming_language": "python",
+    "generated_by_ai": True,
+})
+COMPLETION_ROW = MappingProxyType({
+    "status": ExerciseStatus.COMPLETED,
+    "time_spent_seconds": 1800,  # 30 minutes
+    "grade": 85.0,
+    "test_cases_passed": 8,
+    "test_cases_total": 10,
+    "hints_requested": 2,
+})
+
+
 # ===================================================================
 # FIXTURES
 # ===================================================================
 
+def authenticate(user: User) -> Token:
+    """Authenticate the current test's requests as user."""
+    return _CURRENT_USER.set({
+        "user_id": user.id,
+        "email": user.email,
+        "role": user.role,
+        "jti": "test-jti"
+    })
+
+
+@pytest.fixture(scope="module", autouse=True)
+def jwt_bypass():
+    """
+    Stub token verification once for the module.
+    Tests pick their user with authenticate() instead of re-patching
+    AuthService around every request.
+    """
+    from src.services.auth_service import AuthService
+
+    def verify_jwt_token(token, token_type="access"):
+        return _CURRENT_USER.get()
+
+    async def validate_session(token):
+        return True
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(AuthService, "verify_jwt_token", staticmethod(verify_jwt_token))
+        monkeypatch.setattr(AuthService, "validate_session", staticmethod(validate_session))
+        yield
+
+
+class AuthenticatedClient(QuartClient):
+    """Test client that sends AUTH_HEADERS unless a request passes its own headers."""
+
+    async def open(self, path, *, headers=None, **kwargs):
+        return await super().open(
+            path, headers=AUTH_HEADERS if headers is None else headers, **kwargs
+        )
+
+
+@pytest.fixture
+async def client(app):
+    """Test client whose requests run as the user the test authenticate()s."""
+    async with AuthenticatedClient(app) as test_client:
+        yield test_client
+
+
 @pytest.fixture
 async def test_user_with_progress(db_session):
     """Create a test user with some progress data."""
@@ -48,52 +158,44 @@ async def test_user_with_progress(db_session):
         last_exercise_date=datetime.utcnow() - timedelta(days=1)
     )
     db_session.add(user)
+    # flush assigns the id; the only unloaded columns are the server-side
+    # timestamps, which no test reads, so no refresh round trip
     await db_session.flush()
-    await db_session.refresh(user)
     return user
 
 
 @pytest.fixture
 async def completed_exercises(db_session, test_user_with_progress):
     """Create several completed exercises for the test user."""
-    exercises = []
-    user_exercises = []
-
-    # Create 5 exercises completed over the last 5 days
-    for day_offset in range(5):
-        exercise = Exercise(
-            title=f"Exercise Day {day_offset}",
-            description="Test exercise",
-            instructions="Complete the task",
-            exercise_type=ExerciseType.ALGORITHM,
-            difficulty=ExerciseDifficulty.MEDIUM,
-            programming_language="python",
-            generated_by_ai=True
-        )
-        db_session.add(exercise)
-        await db_session.flush()
-        await db_session.refresh(exercise)
-        exercises.append(exercise)
-
-        # Create user exercise record
-        completed_date = datetime.utcnow() - timedelta(days=day_offset)
-        user_ex = UserExercise(
-            user_id=test_user_with_progress.id,
-            exercise_id=exercise.id,
-            status=ExerciseStatus.COMPLETED,
-            completed_at=completed_date,
-            started_at=completed_date - timedelta(minutes=30),
-            time_spent_seconds=1800,  # 30 minutes
-            grade=85.0,
-            test_cases_passed=8,
-            test_cases_total=10,
-            hints_requested=2
-        )
-        db_session.add(user_ex)
-        user_exercises.append(user_ex)
-
-    await db_session.flush()
-    return exercises, user_exercises
+    # Create one exercise completed on each of the last few days with two
+    # bulk INSERTs, bypassing the ORM unit of work: the first returns every
+    # exercise id, the second writes the completions. They cannot be shared
+    # across tests: they belong to this test's user and are rolled back with
+    # its transaction.
+    exercise_ids = (await db_session.scalars(
+        insert(Exercise).returning(Exercise.id, sort_by_parameter_order=True),
+        [
+            {"title": f"Exercise Day {day_offset}", **EXERCISE_ROW}
+            for day_offset in range(COMPLETED_EXERCISE_DAYS)
+        ]
+    )).all()
+
+    # Offsets come from one clock reading (the service computes streaks
+    # against the real date)
+    now = datetime.utcnow()
+    completions = []
+    for day_offset, exercise_id in enumerate(exercise_ids):
+        completed_date = now - timedelta(days=day_offset)
+        completions.append({
+            "user_id": test_user_with_progress.id,
+            "exercise_id": exercise_id,
+            "completed_at": completed_date,
+            "started_at": completed_date - timedelta(minutes=30),
+            **COMPLETION_ROW
+        })
+    await db_session.execute(insert(UserExercise), completions)
+
+    return exercise_ids
 
 
 # ===================================================================
@@ -101,26 +203,25 @@ async def completed_exercises(db_session, test_user_with_progress):
 # ===================================================================
 
 @pytest.mark.asyncio
-async def test_get_user_progress_metrics(client, test_user_with_progress, completed_exercises, mock_jwt_auth_factory, patched_get_session):
+async def test_get_user_progress_metrics(
+    client, test_user_with_progress, completed_exercises, patched_get_session, query_counter
+):
     """Test retrieving comprehensive user progress metrics."""
+    query_counter.n = 0
+
     # Mock JWT auth
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    authenticate(test_user_with_progress)
+    response = await client.get('/api/progress')
 
     assert response.status_code == 200
+    # User, statistics, achievements, user achievements, user (for
+    # progress), skill levels: a fixed count, independent of how many
+    # achievements or exercises exist
+    assert query_counter.n <= 6
     data = await response.get_json()
 
     # Verify progress metrics structure
-    assert 'exercises_completed' in data
-    assert 'current_streak' in data
-    assert 'longest_streak' in data
-    assert 'total_time_spent_seconds' in data
-    assert 'average_grade' in data
-    assert 'achievements' in data
-    assert 'skill_levels' in data
+    assert REQUIRED_PROGRESS_KEYS <= data.keys()
 
     # Verify metrics values
     assert data['exercises_completed'] == 25
@@ -128,10 +229,37 @@ async def test_get_user_progress_metrics(client, test_user_with_progress, comple
     assert data['longest_streak'] == 10
 
 
+@pytest.mark.benchmark
+def test_progress_metrics_benchmark(
+    benchmark, event_loop, client, test_user_with_progress, completed_exercises, patched_get_session
+):
+    """
+    Benchmark the /api/progress happy path.
+    The benchmark fixture is synchronous, so each round drives the request
+    on the test's own event loop, where the async fixtures were set up.
+    """
+    async def fetch():
+        return await client.get('/api/progress')
+
+    # This test runs outside a task, so undo the context change afterwards
+    token = authenticate(test_user_with_progress)
+    try:
+        response = benchmark.pedantic(
+            lambda: event_loop.run_until_complete(fetch()),
+            rounds=50,
+            warmup_rounds=2,
+        )
+    finally:
+        _CURRENT_USER.reset(token)
+
+    assert response.status_code == 200
+
+
 @pytest.mark.asyncio
-async def test_get_progress_metrics_unauthenticated(client):
+async def test_get_progress_metrics_unauthenticated(app):
     """Test that progress endpoint requires authentication."""
-    response = await client.get('/api/progress')
+    async with app.test_client() as anonymous_client:
+        response = await anonymous_client.get('/api/progress')
     assert response.status_code == 401
 
 
@@ -140,70 +268,61 @@ async def test_get_progress_metrics_unauthenticated(client):
 # ===================================================================
 
 @pytest.mark.asyncio
-async def test_unlock_streak_achievement_7_days(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
+async def test_unlock_streak_achievement_7_days(client, test_user_with_progress, patched_get_session):
     """Test that 7-day streak achievement unlocks correctly."""
     # Set user to have 7 day streak
     test_user_with_progress.current_streak = 7
 
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/achievements',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    authenticate(test_user_with_progress)
+    response = await client.get('/api/progress/achievements')
 
     assert response.status_code == 200
     data = await response.get_json()
 
     # Verify achievement unlocked
-    achievements = data['achievements']
-    assert any(a['type'] == 'streak_7' for a in achievements)
+    achievements = {a['type']: a for a in data['achievements']}
+    assert 'streak_7' in achievements
 
     # Verify achievement details
-    streak_achievement = next(a for a in achievements if a['type'] == 'streak_7')
+    streak_achievement = achievements['streak_7']
     assert streak_achievement['unlocked'] is True
     assert 'unlocked_at' in streak_achievement
 
 
 @pytest.mark.asyncio
-async def test_unlock_exercise_milestone_achievement(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
+async def test_unlock_exercise_milestone_achievement(client, test_user_with_progress, patched_get_session):
     """Test that exercise milestone achievements unlock."""
     # Set user to have completed 50 exercises
     test_user_with_progress.exercises_completed = 50
 
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/achievements',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    authenticate(test_user_with_progress)
+    response = await client.get('/api/progress/achievements')
 
     assert response.status_code == 200
     data = await response.get_json()
 
     # Should have unlocked 10 and 50 exercise achievements
-    achievements = data['achievements']
-    assert any(a['type'] == 'exercises_10' and a['unlocked'] for a in achievements)
-    assert any(a['type'] == 'exercises_50' and a['unlocked'] for a in achievements)
+    achievements = {a['type']: a for a in data['achievements']}
+    assert achievements['exercises_10']['unlocked']
+    assert achievements['exercises_50']['unlocked']
     # Should NOT have unlocked 100 yet
-    assert any(a['type'] == 'exercises_100' and not a['unlocked'] for a in achievements)
+    assert not achievements['exercises_100']['unlocked']
 
 
 @pytest.mark.asyncio
-async def test_achievement_progress_tracking(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
+async def test_achievement_progress_tracking(client, test_user_with_progress, patched_get_session):
     """Test that achievement progress is tracked (e.g., 45/50 exercises)."""
     test_user_with_progress.exercises_completed = 45
 
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/achievements',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    authenticate(test_user_with_progress)
+    response = await client.get('/api/progress/achievements')
 
     assert response.status_code == 200
     data = await response.get_json()
 
     # Find the 50 exercises achievement
-    achievements = data['achievements']
-    exercises_50 = next(a for a in achievements if a['type'] == 'exercises_50')
+    achievements = {a['type']: a for a in data['achievements']}
+    exercises_50 = achievements['exercises_50']
 
     assert exercises_50['unlocked'] is False
     assert exercises_50['progress'] == 45
@@ -216,117 +335,102 @@ async def test_achievement_progress_tracking(client, test_user_with_progress, mo
 # ===================================================================
 
 @pytest.mark.asyncio
-async def test_streak_maintained_on_daily_completion(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
-    """Test that streak increments when exercise completed today."""
-    # User completed exercise yesterday (streak = 5)
-    # Now complete one today - should increment to 6
-
-    with mock_jwt_auth_factory(test_user_with_progress):
-        # Simulate exercise completion
-        response = await client.post(
-            '/api/progress/update-streak',
-            headers={'Authorization': 'Bearer test_token'},
-            json={'completed_today': True}
-        )
+@pytest.mark.parametrize("days_since_last,current_streak,expected", [
+    # Last exercise yesterday: completing one today extends the streak
+    (1, 5, {"current_streak": 6, "streak_maintained": True}),
+    # Last exercise 3 days ago: the streak resets to today's exercise
+    (3, 5, {"current_streak": 1, "streak_broken": True, "previous_streak": 5}),
+    # Current streak 11 exceeds longest (10), so longest follows it
+    (1, 11, {"current_streak": 12, "longest_streak": 12, "new_record": True}),
+], ids=["maintained_on_daily_completion", "broken_on_missed_day", "longest_streak_updates"])
+async def test_update_streak(client, test_user_with_progress, patched_get_session,
+                             days_since_last, current_streak, expected):
+    """Test that completing an exercise today updates the streak from the user's prior state."""
+    test_user_with_progress.last_exercise_date = datetime.utcnow() - timedelta(days=days_since_last)
+    test_user_with_progress.current_streak = current_streak
+
+    authenticate(test_user_with_progress)
+    response = await client.post(
+        '/api/progress/update-streak',
+        json={'completed_today': True}
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
 
-    assert data['current_streak'] == 6
-    assert data['streak_maintained'] is True
-
-
-@pytest.mark.asyncio
-async def test_streak_broken_on_missed_day(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
-    """Test that streak resets when a day is missed."""
-    # Set last exercise to 3 days ago - streak should be broken
-    test_user_with_progress.last_exercise_date = datetime.utcnow() - timedelta(days=3)
-
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.post(
-            '/api/progress/update-streak',
-            headers={'Authorization': 'Bearer test_token'},
-            json={'completed_today': True}
-        )
-
-    assert response.status_code == 200
-    data = await response.get_json()
+    for key, value in expected.items():
+        assert data[key] == value, key
 
-    # Streak should reset to 1 (today's exercise)
-    assert data['current_streak'] == 1
-    assert data['streak_broken'] is True
-    assert data['previous_streak'] == 5
 
+# ===================================================================
+# TEST: Read-only Progress Endpoints
+# ===================================================================
 
-@pytest.mark.asyncio
-async def test_longest_streak_updates(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
-    """Test that longest streak is updated when current streak exceeds it."""
-    # Current streak is 5, longest is 10
-    # Increment current to 11
-    test_user_with_progress.current_streak = 11
+def _check_statistics(data):
+    assert isinstance(data['average_grade'], float)
+    assert data['average_grade'] > 0
+    assert isinstance(data['average_time_per_exercise'], (int, float))
 
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.post(
-            '/api/progress/update-streak',
-            headers={'Authorization': 'Bearer test_token'},
-            json={'completed_today': True}
-        )
 
-    assert response.status_code == 200
-    data = await response.get_json()
+def _check_weekly_statistics(data):
+    assert data['period'] == 'weekly'
 
-    assert data['current_streak'] == 12
-    assert data['longest_streak'] == 12  # Should update
-    assert data['new_record'] is True
 
+def _check_history(data):
+    assert isinstance(data['history'], list)
+    assert len(data['history']) > 0
 
-# ===================================================================
-# TEST: Performance Metrics
-# ===================================================================
+    # Verify each history entry has required fields
+    assert all(HISTORY_ENTRY_KEYS <= entry.keys() for entry in data['history'])
 
-@pytest.mark.asyncio
-async def test_get_performance_statistics(client, test_user_with_progress, completed_exercises, mock_jwt_auth_factory, patched_get_session):
-    """Test retrieval of user performance statistics."""
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/statistics',
-            headers={'Authorization': 'Bearer test_token'}
-        )
 
-    assert response.status_code == 200
-    data = await response.get_json()
+def _check_skill_levels(data):
+    skill_levels = data['skill_levels']
 
-    # Verify statistics structure
-    assert 'average_grade' in data
-    assert 'average_time_per_exercise' in data
-    assert 'total_hints_requested' in data
-    assert 'exercises_by_difficulty' in data
-    assert 'exercises_by_type' in data
-    assert 'recent_performance_trend' in data
+    # Should be organized by topic
+    assert isinstance(skill_levels, dict) or isinstance(skill_levels, list)
 
-    # Verify calculations
-    assert isinstance(data['average_grade'], float)
-    assert data['average_grade'] > 0
-    assert isinstance(data['average_time_per_exercise'], (int, float))
+    # If dict, verify structure
+    if isinstance(skill_levels, dict):
+        # level is e.g. beginner, intermediate, advanced
+        assert all(SKILL_LEVEL_KEYS <= level_data.keys() for level_data in skill_levels.values())
 
 
 @pytest.mark.asyncio
-async def test_get_statistics_by_time_period(client, test_user_with_progress, completed_exercises, mock_jwt_auth_factory, patched_get_session):
-    """Test statistics filtered by time period (daily, weekly, monthly)."""
-    with mock_jwt_auth_factory(test_user_with_progress):
-        # Test weekly statistics
-        response = await client.get(
-            '/api/progress/statistics?period=weekly',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+@pytest.mark.parametrize("url,required_keys,check", [
+    (
+        '/api/progress/statistics',
+        {'average_grade', 'average_time_per_exercise', 'total_hints_requested',
+         'exercises_by_difficulty', 'exercises_by_type', 'recent_performance_trend'},
+        _check_statistics,
+    ),
+    (
+        '/api/progress/statistics?period=weekly',
+        {'period', 'exercises_completed', 'average_grade'},
+        _check_weekly_statistics,
+    ),
+    ('/api/progress/history?days=30', {'history'}, _check_history),
+    (
+        '/api/progress/export?format=json',
+        {'user_id', 'export_date', 'progress_metrics', 'achievements',
+         'exercise_history', 'statistics'},
+        None,
+    ),
+    ('/api/progress/skill-levels', {'skill_levels'}, _check_skill_levels),
+], ids=["performance_statistics", "statistics_by_time_period", "progress_history",
+        "export_progress_data_json", "skill_levels_by_topic"])
+async def test_get_progress_endpoint(client, test_user_with_progress, completed_exercises, patched_get_session,
+                                     url, required_keys, check):
+    """Test each read-only progress endpoint returns its documented fields for a user with history."""
+    authenticate(test_user_with_progress)
+    response = await client.get(url)
 
     assert response.status_code == 200
     data = await response.get_json()
 
-    assert 'period' in data
-    assert data['period'] == 'weekly'
-    assert 'exercises_completed' in data
-    assert 'average_grade' in data
+    assert required_keys <= data.keys()
+    if check is not None:
+        check(data)
 
 
 # ===================================================================
@@ -334,104 +438,70 @@ async def test_get_statistics_by_time_period(client, test_user_with_progress, co
 # ===================================================================
 
 @pytest.mark.asyncio
-async def test_get_progress_history(client, test_user_with_progress, completed_exercises, mock_jwt_auth_factory, patched_get_session):
-    """Test retrieval of historical progress data."""
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/history?days=30',
-            headers={'Authorization': 'Bearer test_token'}
-        )
-
-    assert response.status_code == 200
-    data = await response.get_json()
-
-    # Verify history structure
-    assert 'history' in data
-    assert isinstance(data['history'], list)
-    assert len(data['history']) > 0
-
-    # Verify each history entry has required fields
-    for entry in data['history']:
-        assert 'date' in entry
-        assert 'exercises_completed' in entry
-        assert 'time_spent_seconds' in entry
-
-
-@pytest.mark.asyncio
-async def test_progress_history_date_range(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
+async def test_progress_history_date_range(client, test_user_with_progress, patched_get_session):
     """Test progress history with custom date range."""
-    with mock_jwt_auth_factory(test_user_with_progress):
-        start_date = (datetime.utcnow() - timedelta(days=7)).date().isoformat()
-        end_date = datetime.utcnow().date().isoformat()
+    authenticate(test_user_with_progress)
+    end_date = date.today()
+    start_date = end_date - timedelta(days=7)
 
-        response = await client.get(
-            f'/api/progress/history?start_date={start_date}&end_date={end_date}',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    response = await client.get(
+        f'/api/progress/history?start_date={start_date.isoformat()}&end_date={end_date.isoformat()}'
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
 
     assert 'history' in data
     # Should only include entries within date range
-    for entry in data['history']:
-        entry_date = datetime.fromisoformat(entry['date']).date()
-        assert entry_date >= datetime.fromisoformat(start_date).date()
-        assert entry_date <= datetime.fromisoformat(end_date).date()
+    entry_dates = [date.fromisoformat(entry['date']) for entry in data['history']]
+    if entry_dates:
+        assert min(entry_dates) >= start_date
+        assert max(entry_dates) <= end_date
 
 
 # ===================================================================
 # TEST: Badge System
 # ===================================================================
 
-@pytest.mark.asyncio
-async def test_assign_badge_on_achievement(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
-    """Test that badges are assigned when achievements are unlocked."""
-    test_user_with_progress.current_streak = 7
-
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/badges',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+async def badges_by_type(client, user):
+    """GET the user's badge list and index it by badge type."""
+    authenticate(user)
+    response = await client.get('/api/progress/badges')
 
     assert response.status_code == 200
     data = await response.get_json()
 
     assert 'badges' in data
-    badges = data['badges']
+    return {b['type']: b for b in data['badges']}
+
+
+@pytest.mark.asyncio
+async def test_assign_badge_on_achievement(client, test_user_with_progress, patched_get_session):
+    """Test that badges are assigned when achievements are unlocked."""
+    test_user_with_progress.current_streak = 7
+
+    badges = await badges_by_type(client, test_user_with_progress)
 
     # Should have 7-day streak badge
-    assert any(b['type'] == 'streak_7' for b in badges)
+    assert 'streak_7' in badges
 
     # Verify badge details
-    streak_badge = next(b for b in badges if b['type'] == 'streak_7')
-    assert 'name' in streak_badge
-    assert 'description' in streak_badge
+    streak_badge = badges['streak_7']
+    assert EARNED_BADGE_KEYS <= streak_badge.keys()
     assert 'icon_url' in streak_badge or 'icon' in streak_badge
-    assert 'earned_at' in streak_badge
 
 
 @pytest.mark.asyncio
-async def test_badge_list_shows_unearned_badges(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
+async def test_badge_list_shows_unearned_badges(client, test_user_with_progress, patched_get_session):
     """Test that badge list shows both earned and unearned badges."""
     # User has only 5 streak, no achievements yet
     test_user_with_progress.current_streak = 2
     test_user_with_progress.exercises_completed = 3
 
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/badges',
-            headers={'Authorization': 'Bearer test_token'}
-        )
-
-    assert response.status_code == 200
-    data = await response.get_json()
-
-    badges = data['badges']
+    badges = await badges_by_type(client, test_user_with_progress)
 
     # Should show unearned badges with earned=False
-    streak_7_badge = next(b for b in badges if b['type'] == 'streak_7')
+    streak_7_badge = badges['streak_7']
     assert streak_7_badge['earned'] is False
     assert 'earned_at' not in streak_7_badge or streak_7_badge['earned_at'] is None
 
@@ -441,38 +511,14 @@ async def test_badge_list_shows_unearned_badges(client, test_user_with_progress,
 # ===================================================================
 
 @pytest.mark.asyncio
-async def test_export_progress_data_json(client, test_user_with_progress, completed_exercises, mock_jwt_auth_factory, patched_get_session):
-    """Test exporting progress data in JSON format."""
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/export?format=json',
-            headers={'Authorization': 'Bearer test_token'}
-        )
-
-    assert response.status_code == 200
-    data = await response.get_json()
-
-    # Verify export includes all key data
-    assert 'user_id' in data
-    assert 'export_date' in data
-    assert 'progress_metrics' in data
-    assert 'achievements' in data
-    assert 'exercise_history' in data
-    assert 'statistics' in data
-
-
-@pytest.mark.asyncio
-async def test_export_progress_data_csv(client, test_user_with_progress, completed_exercises, mock_jwt_auth_factory, patched_get_session):
+async def test_export_progress_data_csv(client, test_user_with_progress, completed_exercises, patched_get_session):
     """Test exporting progress data in CSV format."""
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/export?format=csv',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    authenticate(test_user_with_progress)
+    response = await client.get('/api/progress/export?format=csv')
 
     assert response.status_code == 200
     # CSV should be returned as text/csv
-    assert 'text/csv' in response.content_type or 'application/csv' in response.content_type
+    assert response.mimetype in CSV_MIMETYPES
 
     # Get CSV data
     csv_data = await response.get_data(as_text=True)
@@ -480,56 +526,121 @@ async def test_export_progress_data_csv(client, test_user_with_progress, complet
     assert 'exercise_id' in csv_data or 'Exercise' in csv_data  # Header row
 
 
+@pytest.mark.asyncio
+async def test_export_csv_query_error_returns_500(client, test_user_with_progress, patched_get_session):
+    """Test that a failing export query is reported as an error, not a truncated CSV."""
+    from src.services.progress_service import ProgressService
+    authenticate(test_user_with_progress)
+
+    async def failing_stream(self, user_id, batch_size=1000):
+        yield "exercise_id,completed_at\r\n"
+        raise RuntimeError("connection lost")
+
+    with patch.object(ProgressService, 'stream_csv_export', failing_stream):
+        response = await client.get('/api/progress/export?format=csv')
+
+    assert response.status_code == 500
+
+
 # ===================================================================
 # TEST: Skill Level Tracking
 # ===================================================================
 
 @pytest.mark.asyncio
-async def test_track_skill_levels_by_topic(client, test_user_with_progress, completed_exercises, mock_jwt_auth_factory, patched_get_session):
-    """Test that skill levels are tracked per topic area."""
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.get(
-            '/api/progress/skill-levels',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+async def test_skill_level_progression(client, test_user_with_progress, patched_get_session):
+    """Test that skill level progresses based on performance."""
+    # This would test the logic that advances users from beginner -> intermediate -> advanced
+    # based on exercises completed and grades achieved
+
+    authenticate(test_user_with_progress)
+    response = await client.post(
+        '/api/progress/calculate-skill-level',
+        json={'topic': 'algorithms'}
+    )
 
     assert response.status_code == 200
     data = await response.get_json()
 
-    assert 'skill_levels' in data
-    skill_levels = data['skill_levels']
-
-    # Should be organized by topic
-    assert isinstance(skill_levels, dict) or isinstance(skill_levels, list)
-
-    # If dict, verify structure
-    if isinstance(skill_levels, dict):
-        for topic, level_data in skill_levels.items():
-            assert 'level' in level_data  # e.g., beginner, intermediate, advanced
-            assert 'exercises_completed' in level_data
-            assert 'average_grade' in level_data
+    assert SKILL_CALCULATION_KEYS <= data.keys()
 
 
 @pytest.mark.asyncio
-async def test_skill_level_progression(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
-    """Test that skill level progresses based on performance."""
-    # This would test the logic that advances users from beginner -> intermediate -> advanced
-    # based on exercises completed and grades achieved
+async def test_skill_levels_cached_until_recalculated(
+    client, test_user_with_progress, patched_get_session, query_counter
+):
+    """Test that repeat skill level reads skip the database until a recalculation invalidates them."""
+    authenticate(test_user_with_progress)
 
-    with mock_jwt_auth_factory(test_user_with_progress):
+    async def calculate(topic):
         response = await client.post(
             '/api/progress/calculate-skill-level',
-            headers={'Authorization': 'Bearer test_token'},
-            json={'topic': 'algorithms'}
+            json={'topic': topic}
         )
+        assert response.status_code == 200
+
+    async def skill_topics():
+        response = await client.get('/api/progress/skill-levels')
+        assert response.status_code == 200
+        return [level['topic'] for level in (await response.get_json())['skill_levels']]
 
+    await calculate('algorithms')
+    assert await skill_topics() == ['algorithms']
+
+    query_counter.n = 0
+    assert await skill_topics() == ['algorithms']
+    assert query_counter.n == 0
+
+    # A new topic record invalidates the cached list
+    await calculate('databases')
+    assert sorted(await skill_topics()) == ['algorithms', 'databases']
+
+
+@pytest.mark.asyncio
+async def test_skill_levels_cache_dropped_after_recalculation_commits(client, test_user_with_progress, db_session,
+                                                                      patched_get_session):
+    """Test that a recalculation drops cached levels, which otherwise outlive direct row writes."""
+    from sqlalchemy import select
+    from src.models.achievement import SkillLevel
+    authenticate(test_user_with_progress)
+
+    async def exercises_completed():
+        response = await client.get('/api/progress/skill-levels')
+        assert response.status_code == 200
+        return [level['exercises_completed'] for level in (await response.get_json())['skill_levels']]
+
+    response = await client.post('/api/progress/calculate-skill-level', json={'topic': 'algorithms'})
     assert response.status_code == 200
-    data = await response.get_json()
+    assert await exercises_completed() == [0]
+
+    skill_level = await db_session.scalar(
+        select(SkillLevel).where(SkillLevel.user_id == test_user_with_progress.id)
+    )
+    skill_level.exercises_completed = 3
+    await db_session.flush()
+    # Written outside the recalculation: still served from the cache
+    assert await exercises_completed() == [0]
+
+    response = await client.post('/api/progress/calculate-skill-level', json={'topic': 'algorithms'})
+    assert response.status_code == 200
+    assert await exercises_completed() == [3]
+
+
+@pytest.mark.asyncio
+async def test_skill_levels_served_without_redis(client, test_user_with_progress, patched_get_session):
+    """Test that skill levels fall back to the database when Redis is not available."""
+    authenticate(test_user_with_progress)
+
+    with patch('src.services.progress_service.get_cache_service', side_effect=RuntimeError("Redis not initialized")), \
+            patch('src.services.progress_service.logger') as mock_logger:
+        response = await client.post('/api/progress/calculate-skill-level', json={'topic': 'algorithms'})
+        assert response.status_code == 200
+
+        response = await client.get('/api/progress/skill-levels')
+        assert response.status_code == 200
+        assert [level['topic'] for level in (await response.get_json())['skill_levels']] == ['algorithms']
 
-    assert 'topic' in data
-    assert 'previous_level' in data or 'current_level' in data
-    assert 'current_level' in data
-    assert 'level_changed' in data
+    # The outage is warned about once, not on every cache lookup
+    assert mock_logger.warning.call_count == 1
 
 
 # ===================================================================
@@ -537,25 +648,12 @@ async def test_skill_level_progression(client, test_user_with_progress, mock_jwt
 # ===================================================================
 
 @pytest.mark.asyncio
-async def test_progress_for_new_user_with_no_exercises(client, mock_jwt_auth_factory, patched_get_session):
+async def test_progress_for_new_user_with_no_exercises(client, test_user, patched_get_session):
     """Test that progress endpoint works for users with no completed exercises."""
-    # Create brand new user
-    new_user = User(
-        email="newbie@test.com",
-        name="newbie",
-        password_hash="hashed_password",
-        email_verified=True,
-        is_active=True,
-        current_streak=0,
-        longest_streak=0,
-        exercises_completed=0
-    )
-
-    with mock_jwt_auth_factory(new_user):
-        response = await client.get(
-            '/api/progress',
-            headers={'Authorization': 'Bearer test_token'}
-        )
+    # The shared test_user is a brand new user: streak and exercise
+    # counters at their defaults, no exercises seeded
+    authenticate(test_user)
+    response = await client.get('/api/progress')
 
     assert response.status_code == 200
     data = await response.get_json()
@@ -568,22 +666,21 @@ async def test_progress_for_new_user_with_no_exercises(client, mock_jwt_auth_fac
 
 
 @pytest.mark.asyncio
-async def test_streak_calculation_handles_timezone_boundaries(client, test_user_with_progress, mock_jwt_auth_factory, patched_get_session):
+async def test_streak_calculation_handles_timezone_boundaries(client, test_user_with_progress, patched_get_session):
     """Test that streak calculation properly handles timezone boundaries."""
     # This is a critical test for international users
     # A user in timezone UTC+10 completing at 1 AM should count as "today"
     # even if it's still "yesterday" in UTC
 
     # For MVP, we'll use UTC, but this test documents the requirement
-    with mock_jwt_auth_factory(test_user_with_progress):
-        response = await client.post(
-            '/api/progress/update-streak',
-            headers={'Authorization': 'Bearer test_token'},
-            json={
-                'completed_today': True,
-                'user_timezone': 'America/New_York'  # Future enhancement
-            }
-        )
+    authenticate(test_user_with_progress)
+    response = await client.post(
+        '/api/progress/update-streak',
+        json={
+            'completed_today': True,
+            'user_timezone': 'America/New_York'  # Future enhancement
+        }
+    )
 
     assert response.status_code == 200
     # For MVP, this will use UTC, but test passes to document future requirement
@@ -18,7 +18,7 @@ Test Strategy:
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime, timedelta
-from src.middleware.rate_limiter import rate_limit, get_client_identifier, check_rate_limit
+from src.middleware.rate_limiter import rate_limit, get_client_identifier, check_rate_limit, evaluate_rate_limit
 from src.models.user import User, UserRole
 from src.utils.redis_client import get_redis
 import time
@@ -306,6 +306,83 @@ class TestCostTracking:
         assert metadata["tokens_used"] == 500
         assert metadata["model"] == "llama-3.3-70b-versatile"
 
+    @pytest.mark.asyncio
+    async def test_cost_tracking_single_round_trip(self, db_session):
+        """Test that tracking a cost is one atomic Redis command."""
+        redis = get_redis()
+        user_id = 321
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        cost_key = f"llm_cost:daily:{user_id}:{today}"
+
+        await redis.async_client.delete(cost_key)
+
+        from src.services.llm.cost_tracker import CostTracker
+        tracker = CostTracker(redis.async_client)
+
+        # Load both scripts on the server so each call below is a cache hit
+        await tracker.track_cost(0, "chat", 0.0)
+        await tracker.track_operation(0, "op_warmup", "chat", 0.0, 0, "llama-3.3-70b-versatile")
+
+        with patch.object(
+            redis.async_client,
+            "execute_command",
+            wraps=redis.async_client.execute_command
+        ) as execute_command:
+            await tracker.track_cost(user_id, "chat", 0.05)
+            result = await tracker.track_operation(
+                user_id=user_id,
+                operation_id="op_321",
+                operation_type="hint",
+                cost=0.03,
+                tokens_used=100,
+                model="llama-3.3-70b-versatile",
+                daily_limit=0.09,
+            )
+
+        # Increment, expiry, metadata and limit check each travel in a single
+        # call of the cached script
+        assert [call.args[0] for call in execute_command.call_args_list] == ["EVALSHA", "EVALSHA"]
+        assert abs(result.total - 0.08) < 0.001
+        assert result.over_limit is False
+        assert result.warning is True
+        assert 0 < await redis.async_client.ttl(cost_key) <= 86400 * 2
+
+    @pytest.mark.asyncio
+    async def test_cost_tracking_keeps_first_expiry(self, db_session):
+        """Test that tracking more cost does not push the daily key's expiry back."""
+        redis = get_redis()
+        user_id = 322
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        cost_key = f"llm_cost:daily:{user_id}:{today}"
+
+        await redis.async_client.set(cost_key, "0.95", ex=100)
+
+        from src.services.llm.cost_tracker import CostTracker
+        tracker = CostTracker(redis.async_client)
+
+        result = await tracker.track_cost(user_id, "chat", 0.05, daily_limit=1.00)
+
+        assert result.over_limit is True
+        assert 0 < await redis.async_client.ttl(cost_key) <= 100
+
+    @pytest.mark.asyncio
+    async def test_cost_scripts_registered_once_per_client(self, db_session):
+        """Test that trackers on one Redis client share its registered scripts."""
+        redis = get_redis()
+
+        from src.services.llm.cost_tracker import CostTracker
+
+        with patch.object(
+            redis.async_client,
+            "register_script",
+            wraps=redis.async_client.register_script
+        ) as register_script:
+            for user_id in (323, 324):
+                await CostTracker(redis.async_client).track_cost(user_id, "chat", 0.01)
+
+        # Constructing a tracker per LLM call does not register the scripts again
+        assert register_script.call_count <= 1
+
 
 class TestRateLimitHeaders:
     """Tests for rate limit response headers."""
@@ -410,6 +487,67 @@ class TestRateLimitConfiguration:
         assert admin_limits["per_day"] > student_limits["per_day"]
 
 
+class TestRateLimitWindow:
+    """Tests for the Redis-backed rate limit window decision."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("algorithm", ["sliding_window", "fixed_window"])
+    async def test_burst_within_one_second_is_limited(self, algorithm, monkeypatch):
+        """Test that requests arriving in the same second each count toward the limit."""
+        from src.config import settings
+        monkeypatch.setattr(settings, "rate_limit_algorithm", algorithm)
+
+        # Pin the clock so every request lands in the same second and window
+        monkeypatch.setattr(time, "time", lambda: 1_700_000_030.5)
+        identifier = f"user:window-{algorithm}"
+
+        redis = get_redis()
+        async for key in redis.async_client.scan_iter(match=f"rate_limit:burst:{identifier}*"):
+            await redis.async_client.delete(key)
+
+        for _ in range(3):
+            allowed, retry_after = await check_rate_limit(identifier, limit=3, window=60, endpoint="burst")
+            assert allowed is True
+            assert retry_after is None
+
+        allowed, retry_after = await check_rate_limit(identifier, limit=3, window=60, endpoint="burst")
+        assert allowed is False
+        assert 1 <= retry_after <= 60
+
+    @pytest.mark.asyncio
+    async def test_status_and_daily_cost_in_one_round_trip(self, monkeypatch):
+        """Test that header values and the daily cost come back from a single script call."""
+        monkeypatch.setattr(time, "time", lambda: 1_700_000_030.5)
+        identifier = "user:window-status"
+        cost_key = "llm_cost:daily:window-status:2023-11-14"
+
+        redis = get_redis()
+        async for key in redis.async_client.scan_iter(match=f"rate_limit:status:{identifier}*"):
+            await redis.async_client.delete(key)
+        await redis.async_client.set(cost_key, "1.25")
+
+        # Load the script on the server so the call below is a cache hit
+        await evaluate_rate_limit(identifier, limit=5, window=60, endpoint="status-warmup")
+
+        with patch.object(
+            redis.async_client,
+            "execute_command",
+            wraps=redis.async_client.execute_command
+        ) as execute_command:
+            status = await evaluate_rate_limit(
+                identifier, limit=5, window=60, endpoint="status", cost_key=cost_key
+            )
+        await redis.async_client.delete(cost_key)
+
+        assert [call.args[0] for call in execute_command.call_args_list] == ["EVALSHA"]
+        assert status.allowed is True
+        assert status.limit == 5
+        assert status.remaining == 4
+        assert status.reset == 1_700_000_030 + 60
+        assert status.retry_after is None
+        assert status.daily_cost == 1.25
+
+
 class TestCostAlerts:
     """Tests for cost monitoring and alerting."""
 